@@ -0,0 +1,129 @@
+"""
+Client CPU per request with eager and lazy JSON decoding on the hot
+endpoints, against an in-process stand-in server:
+
+    python -m benchmarks.json_decoding --requests 2000 --notes 50 --transport http.client
+
+"lazy" leaves the LazyResponse untouched as callers checking only the status
+do, "lazy_read" reads response["message"] so the body is decoded with the
+default backend (orjson when installed). A second table compares the JSON
+backends on a GET /notes body alone.
+"""
+import argparse
+import json
+import time
+
+from benchmarks.memory import generate_response
+from rest.lazy_response import BACKENDS, LazyResponse
+from rest.notes_rest import NotesRest
+from rest.stand_in import NotesApiServer
+from rest.transport import TRANSPORTS
+
+EMAIL = "decoding@example.com"
+PASSWORD = "password"
+
+ENDPOINTS = {
+    "GET health-check": lambda service, ids, index: service.get_health_check(),
+    "GET notes": lambda service, ids, index: service.get_notes(),
+    "GET notes/{id}": lambda service, ids, index: service.get_note_by_id(ids[0]),
+    "DELETE notes/{id}": lambda service, ids, index: service.delete_note_by_id(
+        ids[index]
+    ),
+}
+MODES = {"eager": False, "lazy": True, "lazy_read": True}
+
+
+def _post(service, count, title):
+    ids = []
+    for index in range(count):
+        note = service.post_notes(f"{title} {index}", "Decoding benchmark", "Home")
+        ids.append(note["data"]["id"])
+    return ids
+
+
+def measure(base_url, endpoint, mode, requests=1000, transport="requests", warmup=20):
+    """
+    Call one endpoint `requests` times on one client
+    :return: client CPU microseconds per request
+    """
+    call = ENDPOINTS[endpoint]
+    with NotesRest(base_url, transport=transport, lazy=MODES[mode]) as service:
+        service.post_users_login(EMAIL, PASSWORD)
+        deleting = endpoint == "DELETE notes/{id}"
+        ids = _post(service, requests + warmup if deleting else 1, "Target")
+        warm, measured = (ids[:warmup], ids[warmup:]) if deleting else (ids, ids)
+        for index in range(warmup):
+            call(service, warm, index)
+        started = time.thread_time()
+        for index in range(requests):
+            response = call(service, measured, index)
+            if mode == "lazy_read":
+                response["message"]
+        cpu = time.thread_time() - started
+        if not deleting:
+            service.delete_note_by_id(ids[0])
+    return round(cpu / requests * 1e6, 1)
+
+
+def decode_cost(notes=10, repeat=2000):
+    """
+    :return: dictionary backend -> microseconds to decode a GET /notes body
+    """
+    body = generate_response(notes)
+    results = {}
+    for name, loads in BACKENDS.items():
+        started = time.process_time()
+        for _ in range(repeat):
+            LazyResponse(body, 200, loads).json()
+        results[name] = round((time.process_time() - started) / repeat * 1e6, 2)
+    return results
+
+
+def run(requests=1000, notes=10, transport="requests", endpoints=tuple(ENDPOINTS)):
+    """
+    :param notes: notes of the user listed by GET notes
+    :param transport: name of the RestClient transport
+    :return: dictionary endpoint -> mode -> client CPU microseconds per request
+    """
+    with NotesApiServer() as server:
+        server.state.add_user("decoding", EMAIL, PASSWORD)
+        with NotesRest(server.url) as service:
+            service.post_users_login(EMAIL, PASSWORD)
+            _post(service, notes, "Note")
+        return {
+            endpoint: {
+                mode: measure(server.url, endpoint, mode, requests, transport)
+                for mode in MODES
+            }
+            for endpoint in endpoints
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare eager and lazy decoding")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--notes", type=int, default=10, help="notes per list")
+    parser.add_argument("--transport", default="requests", choices=TRANSPORTS)
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args(argv)
+    results = run(args.requests, args.notes, args.transport)
+    decoding = decode_cost(args.notes)
+    if args.json:
+        print(json.dumps({"endpoints": results, "decode_us": decoding}))
+        return
+    print(f"{'endpoint':<20}" + "".join(f"{mode:>12}" for mode in MODES) + "   saved")
+    for endpoint, result in results.items():
+        saved = 1 - result["lazy"] / result["eager"]
+        print(
+            f"{endpoint:<20}"
+            + "".join(f"{result[mode]:>12.1f}" for mode in MODES)
+            + f"{saved:>8.0%}"
+        )
+    print()
+    print(f"decoding GET /notes with {args.notes} notes")
+    for backend, micros in decoding.items():
+        print(f"{backend:<20}{micros:>12.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,612 @@
+"""
+Load generator and benchmark runner for NotesRest.
+
+Drives a weighted mix of operations at a fixed concurrency (closed loop) or
+at a target request rate (open loop) and reports throughput, latency
+percentiles and error rates per endpoint. Workers can be sharded across
+processes to get past the GIL of a single client process; start, stop, the
+request budget and the target rate are coordinated across all of them and
+their latency histograms are merged into one report:
+
+    python -m benchmarks.load --stand-in --mix list=3,get=5,create=2 --duration 10
+    python -m benchmarks.load --base-url https://... --email me@... --password ...
+        --rate 50 --concurrency 16 --processes 4 --json run.json
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import time
+from threading import Thread
+from uuid import uuid4
+
+from rest.adaptive import AdaptiveLimiter
+from rest.metrics import Histogram, RequestMetrics
+from rest.notes_rest import NotesRest
+from rest.stand_in import NotesApiServer
+
+PERCENTILES = (50, 90, 99, 99.9)
+READY_TIMEOUT = 120.0
+DEFAULT_MIX = "login=1,list=3,get=5,create=2,update=2,delete=1"
+
+
+def _login(service, note_ids, credentials, rng):
+    service.post_users_login(*credentials)
+    return "POST users/login"
+
+
+def _list(service, note_ids, credentials, rng):
+    service.get_notes()
+    return "GET notes"
+
+
+def _create(service, note_ids, credentials, rng):
+    response = service.post_notes(
+        f"Load note {rng.random():.6f}",
+        "Created by the load generator",
+        rng.choice(("Home", "Work", "Personal")),
+    )
+    note_ids.append(response["data"]["id"])
+    return "POST notes"
+
+
+def _get(service, note_ids, credentials, rng):
+    if not note_ids:
+        return _create(service, note_ids, credentials, rng)
+    service.get_note_by_id(rng.choice(note_ids))
+    return "GET notes/{id}"
+
+
+def _update(service, note_ids, credentials, rng):
+    if not note_ids:
+        return _create(service, note_ids, credentials, rng)
+    service.put_note_by_id(
+        rng.choice(note_ids),
+        "Updated load note",
+        "Updated by the load generator",
+        rng.random() < 0.5,
+        rng.choice(("Home", "Work", "Personal")),
+    )
+    return "PUT notes/{id}"
+
+
+def _delete(service, note_ids, credentials, rng):
+    if not note_ids:
+        return _create(service, note_ids, credentials, rng)
+    note_id = rng.choice(note_ids)
+    note_ids.remove(note_id)
+    service.delete_note_by_id(note_id)
+    return "DELETE notes/{id}"
+
+
+OPERATIONS = {
+    "login": _login,
+    "list": _list,
+    "get": _get,
+    "create": _create,
+    "update": _update,
+    "delete": _delete,
+}
+
+ENDPOINTS = {
+    "login": "POST users/login",
+    "list": "GET notes",
+    "get": "GET notes/{id}",
+    "create": "POST notes",
+    "update": "PUT notes/{id}",
+    "delete": "DELETE notes/{id}",
+}
+
+
+def parse_mix(mix):
+    """
+    Parse a workload mix like "list=3,get=5"
+    :param mix: comma separated operation=weight pairs
+    :return: dictionary operation -> weight
+    """
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(
+                f"Unknown operation {name!r}, expected one of {', '.join(OPERATIONS)}"
+            )
+        weights[name] = float(weight or 1)
+    return weights
+
+
+class LoadRecorder:
+    """
+    Latency histograms and errors of one worker, merged into the report at the end
+    """
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.queue_wait = Histogram()
+
+    def record(self, endpoint, latency, error=None):
+        histogram = self.latencies.get(endpoint)
+        if histogram is None:
+            histogram = self.latencies[endpoint] = Histogram()
+        histogram.record(latency)
+        if error is not None:
+            errors = self.errors.setdefault(endpoint, {})
+            name = type(error).__name__
+            errors[name] = errors.get(name, 0) + 1
+
+    def merge(self, other):
+        self.queue_wait.merge(other.queue_wait)
+        for endpoint, histogram in other.latencies.items():
+            self.latencies.setdefault(endpoint, Histogram()).merge(histogram)
+        for endpoint, errors in other.errors.items():
+            merged = self.errors.setdefault(endpoint, {})
+            for name, count in errors.items():
+                merged[name] = merged.get(name, 0) + count
+
+
+class RateTicker:
+    """
+    Schedule of request start times for open-loop load at a fixed rate,
+    shared by the worker threads of all processes
+    """
+
+    def __init__(self, rate, context=multiprocessing):
+        self._interval = 1 / rate
+        self._next = context.Value("d", 0.0)
+
+    def reset(self, start):
+        with self._next.get_lock():
+            self._next.value = start
+
+    def next_slot(self):
+        with self._next.get_lock():
+            slot = self._next.value
+            self._next.value += self._interval
+        return slot
+
+
+class RequestBudget:
+    """
+    Countdown of requests left to send shared by the worker threads of all
+    processes, unlimited when None
+    """
+
+    def __init__(self, total=None, context=multiprocessing):
+        self._unlimited = total is None
+        self._left = context.Value("q", total or 0)
+
+    def take(self):
+        if self._unlimited:
+            return True
+        with self._left.get_lock():
+            if self._left.value <= 0:
+                return False
+            self._left.value -= 1
+            return True
+
+
+class StartLine:
+    """
+    Holds the workers of all processes until every one of them logged in
+    and seeded its notes, then releases them with a common start time
+    """
+
+    def __init__(self, workers, context=multiprocessing):
+        """
+        :param workers: number of worker threads in all processes
+        """
+        self._ready = context.Barrier(workers + 1)
+        self._go = context.Barrier(workers + 1)
+        self._start = context.Value("d", 0.0)
+
+    def wait(self):
+        """
+        Called by every worker
+        :return: start time on the time.perf_counter clock
+        """
+        self._ready.wait()
+        self._go.wait()
+        return self._start.value
+
+    def release(self, ticker=None, timeout=None):
+        """
+        Called once by the coordinator
+        :param timeout: seconds to wait for the workers to get ready
+        :return: start time on the time.perf_counter clock
+        """
+        self._ready.wait(timeout)
+        start = time.perf_counter()
+        self._start.value = start
+        if ticker is not None:
+            ticker.reset(start)
+        self._go.wait()
+        return start
+
+    def abort(self):
+        self._ready.abort()
+        self._go.abort()
+
+
+def _worker(
+    base_url,
+    credentials,
+    weights,
+    duration,
+    start_line,
+    budget,
+    ticker,
+    seed_notes,
+    seed,
+    recorder,
+    metrics,
+    limiter=None,
+):
+    rng = random.Random(seed)
+    names = list(weights)
+    name_weights = list(weights.values())
+    note_ids = []
+    hooks = [metrics] if limiter is None else [metrics, limiter]
+    with NotesRest(base_url, hooks=hooks) as service:
+        try:
+            service.post_users_login(*credentials)
+            for _ in range(seed_notes):
+                _create(service, note_ids, credentials, rng)
+        except BaseException:
+            start_line.abort()
+            raise
+        deadline = start_line.wait() + duration
+        while time.perf_counter() < deadline and budget.take():
+            started = time.perf_counter()
+            if ticker is not None:
+                started = ticker.next_slot()
+                delay = started - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            name = rng.choices(names, name_weights)[0]
+            if limiter is not None:
+                queued = time.perf_counter()
+                limiter.acquire()
+                recorder.queue_wait.record(time.perf_counter() - queued)
+                if ticker is None:
+                    # closed loop measures the request alone, the wait is reported
+                    # separately; open loop keeps it as part of the latency
+                    started = time.perf_counter()
+            try:
+                endpoint = OPERATIONS[name](service, note_ids, credentials, rng)
+                error = None
+            except Exception as exception:
+                endpoint, error = ENDPOINTS[name], exception
+            finally:
+                if limiter is not None:
+                    limiter.release()
+            recorder.record(endpoint, time.perf_counter() - started, error)
+
+
+def _run_threads(shard, threads, seed):
+    """
+    Run `threads` workers of the shard in this process
+    :param shard: dictionary with the _worker arguments shared by all workers
+    :return: merged LoadRecorder and RequestMetrics state of the workers
+    """
+    recorders = [LoadRecorder() for _ in range(threads)]
+    metrics = RequestMetrics()
+    workers = [
+        Thread(
+            target=_worker,
+            kwargs={
+                **shard,
+                "seed": seed + index,
+                "recorder": recorder,
+                "metrics": metrics,
+            },
+        )
+        for index, recorder in enumerate(recorders)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    recorder = LoadRecorder()
+    for worker_recorder in recorders:
+        recorder.merge(worker_recorder)
+    return recorder, metrics.to_dict()
+
+
+def _process(results, shard, threads, seed, own_user):
+    logging.basicConfig(level=logging.WARNING)
+    account = None
+    if own_user:
+        email = f"load.{uuid4().hex[:12]}@example.com"
+        password = shard["credentials"][1]
+        account = NotesRest(shard["base_url"])
+        try:
+            account.post_users_register("load_user", email, password)
+            account.post_users_login(email, password)
+        except BaseException:
+            shard["start_line"].abort()
+            raise
+        shard = {**shard, "credentials": (email, password)}
+    try:
+        results.put(_run_threads(shard, threads, seed))
+    finally:
+        if account is not None:
+            account.delete_users_delete_account()
+            account.close()
+
+
+def build_report(recorder, elapsed, config, metrics=None):
+    """
+    Summarize recorded samples
+    :param metrics: optional RequestMetrics of the workers' clients
+    :return: machine-readable report dictionary
+    """
+    endpoints = {}
+    total_requests = total_errors = 0
+    for endpoint in sorted(recorder.latencies):
+        histogram = recorder.latencies[endpoint]
+        errors = recorder.errors.get(endpoint, {})
+        error_count = sum(errors.values())
+        total_requests += histogram.count
+        total_errors += error_count
+        latency = {
+            f"p{p:g}": round(histogram.percentile(p) * 1000, 3) for p in PERCENTILES
+        }
+        latency["mean"] = round(histogram.mean * 1000, 3)
+        latency["max"] = round(histogram.max * 1000, 3)
+        endpoints[endpoint] = {
+            "requests": histogram.count,
+            "errors": error_count,
+            "error_rate": round(error_count / histogram.count, 4),
+            "error_types": errors,
+            "rps": round(histogram.count / elapsed, 2),
+            "latency_ms": latency,
+        }
+    report = {
+        "config": config,
+        "elapsed_s": round(elapsed, 3),
+        "totals": {
+            "requests": total_requests,
+            "errors": total_errors,
+            "error_rate": round(total_errors / total_requests, 4)
+            if total_requests
+            else 0.0,
+            "rps": round(total_requests / elapsed, 2),
+        },
+        "endpoints": endpoints,
+    }
+    if metrics is not None:
+        report["http"] = metrics.snapshot()
+    return report
+
+
+def run_load(
+    base_url,
+    email,
+    password,
+    mix=DEFAULT_MIX,
+    concurrency=8,
+    duration=10.0,
+    rate=None,
+    requests=None,
+    seed_notes=5,
+    seed=None,
+    processes=1,
+    own_users=False,
+    adaptive=False,
+):
+    """
+    Run a workload against the Notes API
+    :param base_url: API address
+    :param email: registered user's email
+    :param password: registered user's password
+    :param mix: workload mix, see parse_mix
+    :param concurrency: number of worker threads in all processes, each with
+    its own client and connection
+    :param duration: seconds to run
+    :param rate: target requests per second for all workers, None runs closed loop.
+    Latency in open loop is measured from the scheduled start time, so server
+    stalls are not hidden by the generator slowing down.
+    :param requests: stop after this many requests
+    :param seed_notes: notes each worker creates before measuring
+    :param seed: random seed for a reproducible operation sequence
+    :param processes: number of processes the workers are sharded across,
+    1 runs them as threads of this process
+    :param own_users: every process registers, and finally deletes, its own
+    account instead of sharing the given one
+    :param adaptive: let an AdaptiveLimiter decide how many of the
+    `concurrency` workers send requests at a time, single process only.
+    The time workers wait for the limiter is reported as queue_wait_ms and
+    only counts towards the latency in open loop.
+    :return: machine-readable report dictionary
+    """
+    weights = parse_mix(mix)
+    if adaptive and (processes > 1 or own_users):
+        raise ValueError("Adaptive concurrency runs in a single process")
+    base_seed = random.randrange(2**32) if seed is None else seed
+    context = multiprocessing.get_context("spawn")
+    processes = max(min(processes, concurrency), 1)
+    threads = [
+        concurrency // processes + (index < concurrency % processes)
+        for index in range(processes)
+    ]
+    start_line = StartLine(concurrency, context)
+    ticker = RateTicker(rate, context) if rate else None
+    shard = {
+        "base_url": base_url,
+        "credentials": (email, password),
+        "weights": weights,
+        "duration": duration,
+        "start_line": start_line,
+        "budget": RequestBudget(requests, context),
+        "ticker": ticker,
+        "seed_notes": seed_notes,
+    }
+    limiter = None
+    if adaptive:
+        limiter = shard["limiter"] = AdaptiveLimiter(
+            initial=max(concurrency // 4, 1), max_limit=concurrency
+        )
+    results = context.Queue()
+    if processes == 1 and not own_users:
+        workers = [
+            Thread(
+                target=lambda: results.put(_run_threads(shard, concurrency, base_seed))
+            )
+        ]
+    else:
+        workers = [
+            context.Process(
+                target=_process,
+                args=(
+                    results,
+                    shard,
+                    count,
+                    base_seed + sum(threads[:index]),
+                    own_users,
+                ),
+            )
+            for index, count in enumerate(threads)
+        ]
+    for worker in workers:
+        worker.start()
+    try:
+        start = start_line.release(ticker, timeout=READY_TIMEOUT)
+    except Exception:
+        for worker in workers:
+            worker.join()
+        raise RuntimeError("Load workers failed to start") from None
+    recorder, metrics = LoadRecorder(), RequestMetrics()
+    for _ in workers:
+        worker_recorder, worker_metrics = results.get()
+        recorder.merge(worker_recorder)
+        metrics.merge(RequestMetrics.from_dict(worker_metrics))
+    elapsed = time.perf_counter() - start
+    for worker in workers:
+        worker.join()
+    config = {
+        "base_url": base_url,
+        "mix": weights,
+        "concurrency": concurrency,
+        "processes": processes,
+        "own_users": own_users,
+        "duration_s": duration,
+        "rate": rate,
+        "requests": requests,
+        "seed": base_seed,
+        "adaptive": adaptive,
+    }
+    report = build_report(recorder, elapsed, config, metrics)
+    if limiter is not None:
+        report["adaptive"] = limiter.snapshot()
+        wait = recorder.queue_wait
+        if wait.count:
+            report["adaptive"]["queue_wait_ms"] = {
+                "p50": round(wait.percentile(50) * 1000, 3),
+                "p99": round(wait.percentile(99) * 1000, 3),
+                "mean": round(wait.mean * 1000, 3),
+                "max": round(wait.max * 1000, 3),
+            }
+    return report
+
+
+def format_report(report):
+    """
+    :return: report as a human-readable table
+    """
+    header = f"{'endpoint':<20}{'requests':>10}{'errors':>8}{'rps':>10}" + "".join(
+        f"{f'p{p:g} ms':>11}" for p in PERCENTILES
+    )
+    lines = [header, "-" * len(header)]
+    for endpoint, stats in report["endpoints"].items():
+        latency = stats["latency_ms"]
+        lines.append(
+            f"{endpoint:<20}{stats['requests']:>10}{stats['errors']:>8}"
+            f"{stats['rps']:>10.1f}"
+            + "".join(f"{latency[f'p{p:g}']:>11.2f}" for p in PERCENTILES)
+        )
+    totals = report["totals"]
+    lines.append("-" * len(header))
+    lines.append(
+        f"{'total':<20}{totals['requests']:>10}{totals['errors']:>8}"
+        f"{totals['rps']:>10.1f}"
+    )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Notes API client")
+    parser.add_argument("--base-url", default=NotesRest.BASE_URL)
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    parser.add_argument(
+        "--stand-in",
+        action="store_true",
+        help="run against an in-process stand-in server with a generated user",
+    )
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--rate", type=float, help="target requests per second")
+    parser.add_argument("--requests", type=int, help="stop after N requests")
+    parser.add_argument("--seed-notes", type=int, default=5)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="shard workers across N processes, 0 uses every core",
+    )
+    parser.add_argument(
+        "--own-users",
+        action="store_true",
+        help="every process registers its own account",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="adapt the number of requests in flight up to --concurrency",
+    )
+    parser.add_argument("--json", help="write the report as JSON to this path")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    server = None
+    base_url, email, password = args.base_url, args.email, args.password
+    if args.stand_in:
+        server = NotesApiServer().start()
+        base_url, email, password = server.url, "load@example.com", "password"
+        server.state.add_user("load_user", email, password)
+    elif not (email and password):
+        parser.error("--email and --password are required without --stand-in")
+    try:
+        report = run_load(
+            base_url,
+            email,
+            password,
+            mix=args.mix,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            rate=args.rate,
+            requests=args.requests,
+            seed_notes=args.seed_notes,
+            seed=args.seed,
+            processes=args.processes or os.cpu_count(),
+            own_users=args.own_users,
+            adaptive=args.adaptive,
+        )
+    finally:
+        if server is not None:
+            server.stop()
+    print(format_report(report))
+    if "adaptive" in report:
+        print(f"adaptive concurrency limit: {report['adaptive']['limit']}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Memory held by a list of notes as dictionaries, Note objects and a NoteCollection:
+
+    python -m benchmarks.memory --notes 100000
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+
+from rest.models import Note, NoteCollection
+
+
+def generate_response(count):
+    """
+    :return: GET /notes response body with `count` notes
+    """
+    notes = [
+        {
+            "id": f"{index:024x}",
+            "title": f"Note title {index}",
+            "description": f"Description of the note number {index}",
+            "completed": index % 3 == 0,
+            "created_at": "2024-03-05T17:32:25.471Z",
+            "updated_at": "2024-03-05T17:32:25.471Z",
+            "category": ("Home", "Work", "Personal")[index % 3],
+            "user_id": "65e764e9d1562c00f725454a",
+        }
+        for index in range(count)
+    ]
+    return json.dumps(
+        {"success": True, "status": 200, "message": "ok", "data": notes}
+    ).encode()
+
+
+def measure(build, raw):
+    """
+    :return: bytes still allocated by the object returned from build(raw)
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = build(raw)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return retained
+
+
+LAYOUTS = {
+    "dicts": lambda raw: json.loads(raw)["data"],
+    "Note objects": lambda raw: [
+        Note.from_json(note) for note in json.loads(raw)["data"]
+    ],
+    "NoteCollection": lambda raw: NoteCollection.from_json(json.loads(raw)["data"]),
+}
+
+
+def run(count):
+    """
+    :return: dictionary layout -> retained bytes
+    """
+    raw = generate_response(count)
+    return {name: measure(build, raw) for name, build in LAYOUTS.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare memory used per note")
+    parser.add_argument("--notes", type=int, default=100_000)
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args(argv)
+    results = run(args.notes)
+    if args.json:
+        print(json.dumps({"notes": args.notes, "retained_bytes": results}))
+        return
+    baseline = results["dicts"]
+    print(f"{'layout':<16}{'MiB':>10}{'bytes/note':>12}{'vs dicts':>10}")
+    for name, retained in results.items():
+        print(
+            f"{name:<16}{retained / 2**20:>10.1f}{retained / args.notes:>12.0f}"
+            f"{retained / baseline:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Per-request client CPU time and throughput of every RestClient transport
+against an in-process stand-in server:
+
+    python -m benchmarks.transports --requests 2000 --concurrency 4
+
+Client CPU is measured with the thread CPU clock of each worker, so the
+stand-in running in the same process does not count against the client.
+"""
+import argparse
+import json
+import time
+from threading import Thread
+
+from rest.notes_rest import NotesRest
+from rest.stand_in import NotesApiServer
+from rest.transport import TRANSPORTS
+
+EMAIL = "transports@example.com"
+PASSWORD = "password"
+
+
+def _worker(service, requests, results, index):
+    cpu_started = time.thread_time()
+    for _ in range(requests):
+        service.get_notes()
+    results[index] = time.thread_time() - cpu_started
+
+
+def measure(base_url, transport, requests=1000, concurrency=1, warmup=50):
+    """
+    Send GET /notes over one client shared by `concurrency` threads
+    :return: dictionary with throughput and client CPU per request
+    """
+    with NotesRest(base_url, pool_maxsize=concurrency, transport=transport) as service:
+        service.post_users_login(EMAIL, PASSWORD)
+        for _ in range(warmup):
+            service.get_notes()
+        per_thread = requests // concurrency
+        cpu = [0.0] * concurrency
+        threads = [
+            Thread(target=_worker, args=(service, per_thread, cpu, index))
+            for index in range(concurrency)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        connections = service.connection_stats["new_connections"]
+    sent = per_thread * concurrency
+    return {
+        "requests": sent,
+        "rps": round(sent / elapsed, 1),
+        "cpu_us_per_request": round(sum(cpu) / sent * 1e6, 1),
+        "new_connections": connections,
+    }
+
+
+def run(requests=1000, concurrency=1, notes=10, transports=tuple(TRANSPORTS)):
+    """
+    :return: dictionary transport -> measurements
+    """
+    with NotesApiServer() as server:
+        server.state.add_user("transports", EMAIL, PASSWORD)
+        with NotesRest(server.url) as service:
+            service.post_users_login(EMAIL, PASSWORD)
+            for index in range(notes):
+                service.post_notes(f"Note {index}", "Transport benchmark", "Home")
+        return {
+            transport: measure(server.url, transport, requests, concurrency)
+            for transport in transports
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare HTTP transports")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--notes", type=int, default=10, help="notes per response")
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args(argv)
+    results = run(args.requests, args.concurrency, args.notes)
+    if args.json:
+        print(json.dumps(results))
+        return
+    baseline = results["requests"]["cpu_us_per_request"]
+    print(f"{'transport':<14}{'rps':>10}{'cpu us/req':>12}{'vs requests':>13}")
+    for transport, result in results.items():
+        print(
+            f"{transport:<14}{result['rps']:>10.0f}"
+            f"{result['cpu_us_per_request']:>12.1f}"
+            f"{result['cpu_us_per_request'] / baseline:>13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
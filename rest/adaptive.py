@@ -0,0 +1,164 @@
+from collections import deque
+from threading import Condition
+from time import perf_counter
+
+from rest.metrics import RequestHook
+
+
+class AdaptiveLimiter(RequestHook):
+    """
+    AIMD limit on the number of requests in flight.
+    The limit grows additively by `increase` after every `limit` healthy
+    responses and is cut multiplicatively by `decrease` on 429 and 5xx
+    responses, connection failures and latency spikes above
+    `latency_tolerance` times the smoothed healthy latency. Responses to
+    requests sent before the last cut do not cut it again.
+    Attach it to a client with RestClient(hooks=[limiter]) to feed it, or
+    pass it as `limiter` to the NotesRest bulk methods to feed it with the
+    responses of one batch.
+    """
+
+    def __init__(
+        self,
+        initial=4,
+        min_limit=1,
+        max_limit=64,
+        increase=1.0,
+        decrease=0.5,
+        latency_tolerance=2.0,
+        smoothing=0.1,
+        history=100,
+        clock=perf_counter,
+    ):
+        """
+        :param initial: starting limit
+        :param min_limit: the limit never drops below this
+        :param max_limit: the limit never grows above this
+        :param increase: amount added to the limit per round of healthy responses
+        :param decrease: factor the limit is multiplied by on overload
+        :param latency_tolerance: latency above this multiple of the healthy
+        latency counts as overload
+        :param smoothing: weight of a new sample in the healthy latency average
+        :param history: number of limit changes kept in decisions
+        :param clock: time source, the same as RequestContext.started
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self._increase = increase
+        self._decrease = decrease
+        self._latency_tolerance = latency_tolerance
+        self._smoothing = smoothing
+        self._clock = clock
+        self._condition = Condition()
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._healthy = 0
+        self._last_decrease = None
+        self.baseline = None
+        self.in_flight = 0
+        self.decisions = deque(maxlen=history)
+
+    @property
+    def limit(self):
+        return int(self._limit)
+
+    def acquire(self):
+        """
+        Wait until fewer than `limit` requests are in flight
+        """
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def after_response(self, context):
+        # time on the network only, rate limiter waits and retry backoff are
+        # the client's own throttling and say nothing about the server
+        latency = context.connect + context.server_wait
+        self.observe(
+            latency or None, context.status_code, context.error, context.started
+        )
+
+    def observe(self, latency, status_code=None, error=None, started=None):
+        """
+        Adjust the limit to the outcome of one request
+        :param latency: seconds the server took, None when the response did
+        not come from the network (e.g. a coalesced or replayed request)
+        :param status_code: response status, None when no response arrived
+        :param error: exception raised by the request
+        :param started: clock time the request was sent
+        """
+        if status_code is not None:
+            overloaded = status_code == 429 or status_code >= 500
+            reason = f"status {status_code}"
+        else:
+            overloaded = error is not None
+            reason = type(error).__name__
+        with self._condition:
+            if not overloaded and (
+                self.baseline is not None
+                and latency is not None
+                and latency > self.baseline * self._latency_tolerance
+            ):
+                overloaded, reason = True, "latency"
+            if overloaded:
+                if (
+                    started is not None
+                    and self._last_decrease is not None
+                    and started < self._last_decrease
+                ):
+                    return
+                self._last_decrease = self._clock()
+                self._healthy = 0
+                self._change(max(self._limit * self._decrease, self.min_limit), reason)
+                return
+            if latency is not None and self.baseline is None:
+                self.baseline = latency
+            elif latency is not None:
+                self.baseline += self._smoothing * (latency - self.baseline)
+            self._healthy += 1
+            if self._healthy >= self.limit and self._limit < self.max_limit:
+                self._healthy = 0
+                self._change(
+                    min(self._limit + self._increase, self.max_limit), "healthy"
+                )
+
+    def _change(self, limit, reason):
+        if limit == self._limit:
+            return
+        self.decisions.append(
+            {
+                "time": self._clock(),
+                "from": self.limit,
+                "to": int(limit),
+                "reason": reason,
+            }
+        )
+        self._limit = limit
+        self._condition.notify_all()
+
+    def snapshot(self):
+        """
+        :return: dictionary with the current limit, requests in flight,
+        healthy latency and the history of limit changes
+        """
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "baseline_ms": None
+                if self.baseline is None
+                else round(self.baseline * 1000, 3),
+                "decisions": list(self.decisions),
+            }
@@ -0,0 +1,279 @@
+import asyncio
+from json import loads
+from logging import getLogger
+
+import aiohttp
+
+from rest.params import drop_none
+from rest.recording import request_key
+
+
+async def gather(*aws, limit=100, return_exceptions=False):
+    """
+    Run awaitables concurrently with at most `limit` of them in flight
+    :param aws: coroutines or futures to await
+    :param limit: maximum number of awaitables running at the same time
+    :param return_exceptions: return exceptions as results instead of raising
+    :return: list of results in the order of `aws`
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(
+        *(bounded(aw) for aw in aws), return_exceptions=return_exceptions
+    )
+
+
+class AsyncRestClient:
+    """
+    Basic asyncio class with logic for REST API
+    """
+
+    BASE_URL: str
+    _headers: dict = {}
+
+    def __init__(
+        self,
+        base_url=None,
+        limit=100,
+        limit_per_host=0,
+        keepalive_timeout=15.0,
+        single_flight=None,
+    ):
+        """
+        :param base_url: API address overriding the class BASE_URL
+        :param limit: maximum number of simultaneously open connections
+        :param limit_per_host: maximum number of connections per host, 0 is unlimited
+        :param keepalive_timeout: seconds an idle connection is kept open
+        :param single_flight: optional AsyncSingleFlight coalescing concurrent
+        identical GET requests into one network call
+        """
+        self._log = getLogger(__name__)
+        if base_url is not None:
+            self.BASE_URL = base_url
+        self._connector_kwargs = {
+            "limit": limit,
+            "limit_per_host": limit_per_host,
+            "keepalive_timeout": keepalive_timeout,
+        }
+        self._session: aiohttp.ClientSession | None = None
+        self._single_flight = single_flight
+
+    @property
+    def session(self):
+        """
+        Connection pool shared by all requests, created on first use
+        inside the running event loop
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(**self._connector_kwargs)
+            )
+        return self._session
+
+    async def close(self):
+        """
+        Close all pooled connections
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _request(
+        self,
+        method,
+        path,
+        params=None,
+        data=None,
+        json=None,
+        headers=None,
+        expected_status_code=200,
+        **kwargs,
+    ):
+        """
+        Send request to REST API over the shared connection pool
+        :param method: HTTP method
+        :param path: str path that will be added to base api address
+        :param params: query params
+        :param data: form data
+        :param json: json data
+        :param headers: dictionary of HTTP Headers
+        :param expected_status_code: expected response code
+        :param kwargs: other params for request
+        :return: Response in JSON format, an empty body raises ValueError
+        like the sync client
+        """
+        headers = drop_none(headers or self._headers)
+        params, data = drop_none(params), drop_none(data)
+        if method == "GET" and self._single_flight is not None:
+            status_code, content = await self._single_flight.do(
+                request_key(method, self.BASE_URL + path, headers, params),
+                lambda: self._send(method, path, params, data, json, headers, **kwargs),
+            )
+        else:
+            status_code, content = await self._send(
+                method, path, params, data, json, headers, **kwargs
+            )
+        assert status_code == expected_status_code
+        return loads(content)
+
+    async def _send(self, method, path, params, data, json, headers, **kwargs):
+        """
+        Perform the HTTP exchange
+        :return: response status code and raw body
+        """
+        async with self.session.request(
+            method,
+            self.BASE_URL + path,
+            params=params,
+            data=data,
+            json=json,
+            headers=headers,
+            **kwargs,
+        ) as response:
+            return response.status, await response.read()
+
+    async def _get(
+        self, path, params=None, headers=None, expected_status_code=200, **kwargs
+    ):
+        """
+        Send GET request to REST API
+        :param path: str path that will be added to base api address
+        :param params: params for GET request
+        :param headers: dictionary of HTTP Headers
+        :param expected_status_code: expected response code
+        :param kwargs: other params for GET request
+        :return: Response in JSON format
+        """
+        self._log.info(f"GET request to {self.BASE_URL + path} with params: {params}")
+        return await self._request(
+            "GET",
+            path,
+            params=params,
+            headers=headers,
+            expected_status_code=expected_status_code,
+            **kwargs,
+        )
+
+    async def _post(
+        self,
+        path,
+        data=None,
+        json=None,
+        headers=None,
+        expected_status_code=200,
+        **kwargs,
+    ):
+        """
+        Send POST request to REST API
+        :param path: str path that will be added to base api address
+        :param data: data for POST request
+        :param json: json data for POST request
+        :param headers: dictionary of HTTP Headers
+        :param expected_status_code: expected response code
+        :param kwargs: other params for POST request
+        :return: Response in JSON format
+        """
+        self._log.info(
+            f"POST request to {self.BASE_URL + path} with data: {data} and json: {json}"
+        )
+        return await self._request(
+            "POST",
+            path,
+            data=data,
+            json=json,
+            headers=headers,
+            expected_status_code=expected_status_code,
+            **kwargs,
+        )
+
+    async def _put(
+        self,
+        path,
+        data=None,
+        json=None,
+        headers=None,
+        expected_status_code=200,
+        **kwargs,
+    ):
+        """
+        Send PUT request to REST API
+        :param path: str path that will be added to base api address
+        :param data: data for PUT request
+        :param json: json data for PUT request
+        :param headers: dictionary of HTTP Headers
+        :param expected_status_code: expected response code
+        :param kwargs: other params for PUT request
+        :return: Response in JSON format
+        """
+        self._log.info(
+            f"PUT request to {self.BASE_URL + path} with data: {data} and json: {json}"
+        )
+        return await self._request(
+            "PUT",
+            path,
+            data=data,
+            json=json,
+            headers=headers,
+            expected_status_code=expected_status_code,
+            **kwargs,
+        )
+
+    async def _patch(
+        self,
+        path,
+        data=None,
+        json=None,
+        headers=None,
+        expected_status_code=200,
+        **kwargs,
+    ):
+        """
+        Send PATCH request to REST API
+        :param path: str path that will be added to base api address
+        :param data: data for PATCH request
+        :param json: json data for PATCH request
+        :param headers: dictionary of HTTP Headers
+        :param expected_status_code: expected response code
+        :param kwargs: other params for PATCH request
+        :return: Response in JSON format
+        """
+        self._log.info(
+            f"PATCH request to {self.BASE_URL + path} with data: {data} and json: {json}"
+        )
+        return await self._request(
+            "PATCH",
+            path,
+            data=data,
+            json=json,
+            headers=headers,
+            expected_status_code=expected_status_code,
+            **kwargs,
+        )
+
+    async def _delete(self, path, headers=None, expected_status_code=200, **kwargs):
+        """
+        Send DELETE request to REST API
+        :param path: str path that will be added to base api address
+        :param headers: dictionary of HTTP Headers
+        :param expected_status_code: expected response code
+        :param kwargs: other params for DELETE request
+        :return: Response in JSON format
+        """
+        self._log.info(f"DELETE request to {self.BASE_URL + path}")
+        return await self._request(
+            "DELETE",
+            path,
+            headers=headers,
+            expected_status_code=expected_status_code,
+            **kwargs,
+        )
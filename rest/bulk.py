@@ -0,0 +1,169 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import Condition, Thread
+
+
+class BulkItemResult:
+    """
+    Outcome of a single item of a bulk operation
+    """
+
+    __slots__ = ("index", "item", "response", "error")
+
+    def __init__(self, index, item, response=None, error=None):
+        """
+        :param index: position of the item in the input iterable
+        :param item: input item (note spec or note id)
+        :param response: response in JSON format when the call succeeded
+        :param error: exception raised by the call when it failed
+        """
+        self.index = index
+        self.item = item
+        self.response = response
+        self.error = error
+
+    @property
+    def success(self):
+        return self.error is None
+
+    def __repr__(self):
+        outcome = "ok" if self.success else f"error={self.error!r}"
+        return f"BulkItemResult(index={self.index}, item={self.item!r}, {outcome})"
+
+
+class BulkReport:
+    """
+    Per-item report of a bulk operation.
+    The batch starts when the report is created and runs to the end on a
+    background daemon thread, whether or not the report is read, unless it
+    is cancelled. Iterating the report streams results in completion order
+    while the batch is still running; the summary properties wait for the
+    whole batch.
+    """
+
+    def __init__(self, results):
+        """
+        :param results: iterator of BulkItemResult, closed on cancel
+        """
+        self.results = []
+        self.cancelled = False
+        self._condition = Condition()
+        self._finished = False
+        self._error = None
+        self._thread = Thread(
+            target=self._drain, args=(results,), name="bulk", daemon=True
+        )
+        self._thread.start()
+
+    def _drain(self, results):
+        try:
+            for result in results:
+                with self._condition:
+                    self.results.append(result)
+                    self._condition.notify_all()
+                if self.cancelled:
+                    close = getattr(results, "close", None)
+                    if close is not None:
+                        close()
+                    break
+        except BaseException as error:
+            self._error = error
+        finally:
+            with self._condition:
+                self._finished = True
+                self._condition.notify_all()
+
+    def __iter__(self):
+        index = 0
+        while True:
+            with self._condition:
+                while index == len(self.results) and not self._finished:
+                    self._condition.wait()
+                if index == len(self.results):
+                    if self._error is not None:
+                        raise self._error
+                    return
+                result = self.results[index]
+            index += 1
+            yield result
+
+    def cancel(self):
+        """
+        Stop submitting items, calls in flight still complete and are reported
+        """
+        self.cancelled = True
+
+    def close(self):
+        """
+        Cancel the batch and wait for the calls in flight
+        """
+        self.cancel()
+        self._thread.join()
+
+    def wait(self):
+        """
+        Block until every item has been processed, or the batch was cancelled
+        :return: the report itself
+        """
+        for _ in self:
+            pass
+        return self
+
+    @property
+    def succeeded(self):
+        return [result for result in self.wait().results if result.success]
+
+    @property
+    def failed(self):
+        return [result for result in self.wait().results if not result.success]
+
+    def __len__(self):
+        return len(self.wait().results)
+
+    def __repr__(self):
+        return f"BulkReport(succeeded={len(self.succeeded)}, failed={len(self.failed)})"
+
+
+def run_bulk(func, items, concurrency=8, limiter=None):
+    """
+    Call `func` for every item over a thread pool with at most `concurrency`
+    calls in flight. Items are pulled lazily, so the input may be a generator
+    of any size. A failing call is reported and does not stop the batch.
+    :param func: callable receiving a single item
+    :param items: iterable of items
+    :param concurrency: maximum number of parallel calls
+    :param limiter: optional AdaptiveLimiter whose current limit is followed
+    as it changes instead of `concurrency`
+    :return: generator of BulkItemResult in completion order
+    """
+    if limiter is None:
+        max_workers, limit, call = concurrency, lambda: concurrency, func
+    else:
+        max_workers, limit = limiter.max_limit, lambda: limiter.limit
+
+        def call(item):
+            with limiter:
+                return func(item)
+
+    items = enumerate(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+
+        def fill():
+            while len(pending) < limit():
+                for index, item in items:
+                    pending[executor.submit(call, item)] = (index, item)
+                    break
+                else:
+                    return
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, item = pending.pop(future)
+                try:
+                    result = BulkItemResult(index, item, response=future.result())
+                except Exception as error:
+                    result = BulkItemResult(index, item, error=error)
+                yield result
+                fill()
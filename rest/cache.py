@@ -0,0 +1,112 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of responses with time-to-live expiration.
+    Cached responses are shared between callers and must not be mutated.
+    Every invalidation bumps `generation`; a reader takes it before fetching
+    and passes it to set, which drops the response when a write invalidated
+    the cache in the meantime, instead of storing data older than the write.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60.0, clock=monotonic):
+        """
+        :param maxsize: maximum number of cached responses
+        :param ttl: seconds a cached response stays valid, None never expires
+        :param clock: monotonic time source
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.generation = 0
+        self.stale = 0
+
+    def get(self, key):
+        """
+        :param key: cache key
+        :return: cached response or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, response, generation=None):
+        """
+        Store a response, evicting the least recently used one when full
+        :param key: cache key
+        :param response: response in JSON format
+        :param generation: value of `generation` taken before the response
+        was fetched, None stores unconditionally
+        :return: False when the response was dropped as stale
+        """
+        expires_at = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                self.stale += 1
+                return False
+            self._entries[key] = (expires_at, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def invalidate(self, *keys):
+        """
+        Drop responses stored under the given keys
+        """
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def invalidate_token(self, token):
+        """
+        Drop every response cached for the given auth token
+        """
+        with self._lock:
+            self.generation += 1
+            for key in [key for key in self._entries if key[0] == token]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self):
+        """
+        :return: dictionary with hit, miss, eviction, expiration and stale
+        store counters
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "stale": self.stale,
+                "size": len(self._entries),
+            }
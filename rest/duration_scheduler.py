@@ -0,0 +1,219 @@
+"""
+pytest-xdist scheduler that balances tests across workers by their recorded
+durations instead of by module.
+
+Enable it with `duration_schedule = true` in pytest.ini or --duration-schedule.
+Durations of every run are kept in the pytest cache (.pytest_cache) and the
+next run hands the longest work units out first, so the slow tests do not all
+end up at the tail of one worker. Tests matching a `duration_groups` line run
+on the same worker, one after another, as a single work unit:
+
+    duration_groups =
+        account: tests/test_users.py::test_*password* tests/test_users.py::test_log*
+"""
+import re
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from statistics import median
+
+import pytest
+
+try:
+    from xdist.scheduler import LoadScopeScheduling
+except ImportError:  # pragma: no cover - pytest-xdist not installed
+    LoadScopeScheduling = None
+
+_GROUP_LINE = re.compile(r"\s*([\w.-]+)\s*:\s+(\S.*)")
+
+CACHE_KEY = "duration_scheduler/durations"
+SMOOTHING = 0.5
+
+
+def parse_groups(lines):
+    """
+    :param lines: duration_groups ini lines like "name: pattern pattern"
+    :return: list of (name, patterns) in the order of the lines
+    """
+    groups = []
+    for line in lines:
+        match = _GROUP_LINE.fullmatch(line)
+        if match is None:
+            raise pytest.UsageError(f"Invalid duration_groups line: {line!r}")
+        groups.append((match.group(1), match.group(2).split()))
+    return groups
+
+
+def group_of(nodeid, groups):
+    """
+    :return: name of the first group with a pattern matching the test id,
+    None when the test runs on its own
+    """
+    for name, patterns in groups:
+        if any(fnmatchcase(nodeid, pattern) for pattern in patterns):
+            return name
+    return None
+
+
+def plan(collection, durations, groups=()):
+    """
+    Split the tests into work units, longest expected duration first.
+    Tests without a recorded duration are expected to take the median one.
+    :param collection: test ids in collection order
+    :param durations: dictionary test id -> seconds
+    :param groups: list of (name, patterns) of tests kept on one worker
+    :return: list of (scope, test ids), a scope is a group name or the test id
+    """
+    known = [durations[nodeid] for nodeid in collection if nodeid in durations]
+    default = median(known) if known else 0.0
+    units = OrderedDict()
+    for nodeid in collection:
+        scope = group_of(nodeid, groups) or nodeid
+        units.setdefault(scope, []).append(nodeid)
+
+    def expected(unit):
+        return sum(durations.get(nodeid, default) for nodeid in unit[1])
+
+    return sorted(units.items(), key=expected, reverse=True)
+
+
+def load_durations(config):
+    """
+    :return: dictionary test id -> seconds, empty when the cache plugin is off
+    (-p no:cacheprovider)
+    """
+    cache = getattr(config, "cache", None)
+    if cache is None:
+        return {}
+    return dict(cache.get(CACHE_KEY, {}))
+
+
+def save_durations(config, measured):
+    """
+    Blend the durations measured in this run into the stored ones
+    :param measured: dictionary test id -> seconds
+    """
+    durations = load_durations(config)
+    for nodeid, seconds in measured.items():
+        previous = durations.get(nodeid)
+        durations[nodeid] = round(
+            seconds
+            if previous is None
+            else previous + SMOOTHING * (seconds - previous),
+            6,
+        )
+    config.cache.set(CACHE_KEY, durations)
+
+
+if LoadScopeScheduling is not None:
+
+    class DurationScheduling(LoadScopeScheduling):
+        """
+        Load scheduling with one work unit per test or per group of tests,
+        handed out to idle workers longest first
+        """
+
+        def __init__(self, config, log=None, durations=None, groups=()):
+            """
+            :param durations: dictionary test id -> seconds of earlier runs
+            :param groups: list of (name, patterns) of tests kept on one worker
+            """
+            super().__init__(config, log)
+            self.durations = durations or {}
+            self.groups = groups
+            self._scopes = {}
+
+        def _split_scope(self, nodeid):
+            return self._scopes.get(nodeid, nodeid)
+
+        def schedule(self):
+            assert self.collection_is_completed
+            if self.collection is not None:
+                for node in self.nodes:
+                    self._reschedule(node)
+                return
+            if not self._check_nodes_have_same_collection():
+                self.log("**Different tests collected, aborting run**")
+                return
+            self.collection = list(next(iter(self.registered_collections.values())))
+            if not self.collection:
+                return
+            for scope, nodeids in plan(self.collection, self.durations, self.groups):
+                self.workqueue[scope] = dict.fromkeys(nodeids, False)
+                for nodeid in nodeids:
+                    self._scopes[nodeid] = scope
+            extra_nodes = len(self.nodes) - len(self.workqueue)
+            for _ in range(max(extra_nodes, 0)):
+                unused_node, _ = self.assigned_work.popitem()
+                self.log(f"Shutting down unused node {unused_node}")
+                unused_node.shutdown()
+            for node in self.nodes:
+                self._assign_work_unit(node)
+            for node in self.nodes:
+                self._reschedule(node)
+            if not self.workqueue:
+                for node in self.nodes:
+                    node.shutdown()
+
+
+class DurationRecorder:
+    """
+    Sums the setup, call and teardown durations of every test reported to
+    the controller and stores them at the end of the session
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.measured = {}
+
+    def pytest_runtest_logreport(self, report):
+        self.measured[report.nodeid] = (
+            self.measured.get(report.nodeid, 0.0) + report.duration
+        )
+
+    def pytest_sessionfinish(self):
+        if self.measured and getattr(self.config, "cache", None) is not None:
+            save_durations(self.config, self.measured)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("duration_scheduler", "duration-aware xdist scheduling")
+    group.addoption(
+        "--duration-schedule",
+        action="store_true",
+        default=None,
+        help="balance xdist workers by recorded test durations",
+    )
+    parser.addini(
+        "duration_schedule",
+        type="bool",
+        default=False,
+        help="balance xdist workers by recorded test durations",
+    )
+    parser.addini(
+        "duration_groups",
+        type="linelist",
+        default=[],
+        help="'name: pattern ...' lines of test ids run on one worker",
+    )
+
+
+def _enabled(config):
+    option = config.getoption("duration_schedule")
+    return config.getini("duration_schedule") if option is None else option
+
+
+def pytest_configure(config):
+    if not hasattr(config, "workerinput") and _enabled(config):
+        config.pluginmanager.register(DurationRecorder(config), "duration_recorder")
+
+
+@pytest.hookimpl(tryfirst=True, optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    if not _enabled(config) or config.getvalue("dist") not in ("load", "loadscope"):
+        return None
+    return DurationScheduling(
+        config,
+        log,
+        durations=load_durations(config),
+        groups=parse_groups(config.getini("duration_groups")),
+    )
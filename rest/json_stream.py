@@ -0,0 +1,109 @@
+from codecs import getincrementaldecoder
+from json import JSONDecodeError, JSONDecoder
+
+_WHITESPACE = " \t\n\r"
+
+
+class _Buffer:
+    """
+    Text buffer over an iterator of byte chunks that reads more data on demand
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self):
+        """
+        Read the next chunk
+        :return: False when the stream is exhausted
+        """
+        if self.exhausted:
+            return False
+        if self.pos > 65536 and self.pos * 2 > len(self.text):
+            self.text = self.text[self.pos :]
+            self.pos = 0
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                self.text += text
+                return True
+        self.text += self._decoder.decode(b"", final=True)
+        self.exhausted = True
+        return False
+
+    def peek(self):
+        """
+        :return: next non-whitespace character, "" at the end of the stream
+        """
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, characters):
+        character = self.peek()
+        if character not in characters:
+            raise JSONDecodeError(
+                f"Expecting one of {characters!r}", self.text, self.pos
+            )
+        self.pos += 1
+        return character
+
+    def value(self, decoder):
+        """
+        Decode the next complete JSON value
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            if end == len(self.text) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_array_items(chunks, key="data", decoder=None, fields=None):
+    """
+    Incrementally parse a JSON object from byte chunks and yield items of the
+    array stored under `key` one by one, keeping only one item in memory.
+    :param chunks: iterable of bytes
+    :param key: top-level key holding the array
+    :param decoder: optional JSONDecoder
+    :param fields: optional dictionary receiving the other top-level fields
+    :return: generator of array items
+    """
+    decoder = decoder or JSONDecoder()
+    buffer = _Buffer(chunks)
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        return
+    while True:
+        name = buffer.value(decoder)
+        buffer.expect(":")
+        if name == key and buffer.peek() == "[":
+            buffer.expect("[")
+            if buffer.peek() == "]":
+                buffer.expect("]")
+            else:
+                while True:
+                    yield buffer.value(decoder)
+                    if buffer.expect(",]") == "]":
+                        break
+        else:
+            value = buffer.value(decoder)
+            if fields is not None:
+                fields[name] = value
+        if buffer.expect(",}") == "}":
+            return
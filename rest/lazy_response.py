@@ -0,0 +1,72 @@
+from collections.abc import Mapping
+from json import loads as _stdlib_loads
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _loads_json(body):
+    # str() decodes straight from the buffer, bytes(body) would copy it first
+    return _stdlib_loads(str(body, "utf-8"))
+
+
+BACKENDS = {"json": _loads_json}
+if orjson is not None:
+    BACKENDS["orjson"] = orjson.loads
+
+DEFAULT_BACKEND = "orjson" if orjson is not None else "json"
+
+_UNDECODED = object()
+
+
+class LazyResponse(Mapping):
+    """
+    Response body kept as a memoryview over the bytes read from the socket
+    and decoded from JSON on the first access to a field. Callers that only
+    need the status code never pay for decoding. Reads like the decoded dict.
+    """
+
+    __slots__ = ("status_code", "body", "_loads", "_decoded")
+
+    def __init__(self, content, status_code=None, loads=None):
+        """
+        :param content: raw response body, bytes or any buffer
+        :param status_code: HTTP status of the response
+        :param loads: JSON decoder from BACKENDS, the default backend when None
+        """
+        self.status_code = status_code
+        self.body = memoryview(content)
+        self._loads = loads or BACKENDS[DEFAULT_BACKEND]
+        self._decoded = _UNDECODED
+
+    @property
+    def decoded(self):
+        """
+        :return: True once the body was decoded
+        """
+        return self._decoded is not _UNDECODED
+
+    def json(self):
+        """
+        :return: decoded body, None when it is empty
+        """
+        if self._decoded is _UNDECODED:
+            self._decoded = self._loads(self.body) if self.body.nbytes else None
+        return self._decoded
+
+    def __getitem__(self, key):
+        return self.json()[key]
+
+    def __iter__(self):
+        return iter(self.json())
+
+    def __len__(self):
+        return len(self.json())
+
+    def __bytes__(self):
+        return self.body.tobytes()
+
+    def __repr__(self):
+        return f"<LazyResponse [{self.status_code}] {self.body.nbytes} bytes>"
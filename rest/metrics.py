@@ -0,0 +1,379 @@
+import re
+from threading import Lock
+from time import perf_counter
+
+_ID_SEGMENT = re.compile(r"[0-9a-fA-F]{24}|[0-9a-fA-F-]{32,36}|\d+")
+
+GLOBAL_HOOKS = []
+
+
+def add_global_hook(hook):
+    """
+    Observe the requests of every RestClient, e.g. from a pytest plugin
+    :param hook: RequestHook
+    """
+    GLOBAL_HOOKS.append(hook)
+
+
+def remove_global_hook(hook):
+    if hook in GLOBAL_HOOKS:
+        GLOBAL_HOOKS.remove(hook)
+
+
+def endpoint_name(method, path):
+    """
+    Group requests by endpoint, replacing ids in the path with {id}
+    :return: str like "GET notes/{id}"
+    """
+    segments = path.split("?", 1)[0].split("/")
+    return f"{method} " + "/".join(
+        "{id}" if _ID_SEGMENT.fullmatch(segment) else segment for segment in segments
+    )
+
+
+class RequestContext:
+    """
+    Timings and sizes of one RestClient request, filled in while it runs.
+    Durations are in seconds: connect is spent opening TCP connections,
+    server_wait from sending the request until the body arrived and decode
+    parsing the JSON body. elapsed covers the whole call including retries.
+    """
+
+    __slots__ = (
+        "method",
+        "path",
+        "started",
+        "elapsed",
+        "connect",
+        "server_wait",
+        "decode",
+        "status_code",
+        "bytes_sent",
+        "bytes_received",
+        "error",
+    )
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.started = perf_counter()
+        self.elapsed = None
+        self.connect = 0.0
+        self.server_wait = 0.0
+        self.decode = 0.0
+        self.status_code = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.error = None
+
+    @property
+    def endpoint(self):
+        return endpoint_name(self.method, self.path)
+
+
+class RequestHook:
+    """
+    Base class of request hooks, override the methods of interest
+    """
+
+    def before_request(self, context):
+        """
+        Called before the request is sent
+        :param context: RequestContext with method and path
+        """
+
+    def after_response(self, context):
+        """
+        Called once the request finished or failed
+        :param context: completed RequestContext, error is set on failure
+        """
+
+
+class Histogram:
+    """
+    HDR-style histogram of durations with log-linear buckets.
+    Values are kept in microseconds with a relative error below
+    1 / 2 ** (precision - 1); histograms merge by adding bucket counts.
+    """
+
+    def __init__(self, precision=7):
+        """
+        :param precision: number of significant bits kept per value
+        """
+        self.precision = precision
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        shift = value.bit_length() - self.precision
+        if shift <= 0:
+            return value
+        return (shift << (self.precision - 1)) + (value >> shift)
+
+    def _value(self, index):
+        half = 1 << (self.precision - 1)
+        if index < 2 * half:
+            return index
+        shift, mantissa = divmod(index, half)
+        shift -= 1
+        mantissa += half
+        return (mantissa << shift) + (1 << shift) // 2
+
+    def record(self, seconds):
+        """
+        :param seconds: duration to add
+        """
+        index = self._index(max(int(seconds * 1e6), 0))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def percentile(self, percent):
+        """
+        :return: duration in seconds at the percentile, None when empty
+        """
+        if not self.count:
+            return None
+        rank = max(int(self.count * percent / 100 + 0.5), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(max(self._value(index) / 1e6, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def merge(self, other):
+        """
+        Add the samples of another histogram with the same precision
+        :return: the histogram itself
+        """
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        for bound in (other.min, other.max):
+            if bound is not None:
+                self.min = bound if self.min is None else min(self.min, bound)
+                self.max = bound if self.max is None else max(self.max, bound)
+        return self
+
+    def to_dict(self):
+        """
+        :return: JSON-serializable state, see from_dict
+        """
+        return {
+            "precision": self.precision,
+            "counts": {str(index): count for index, count in self.counts.items()},
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        histogram = cls(state["precision"])
+        histogram.counts = {
+            int(index): count for index, count in state["counts"].items()
+        }
+        histogram.count = state["count"]
+        histogram.total = state["total"]
+        histogram.min = state["min"]
+        histogram.max = state["max"]
+        return histogram
+
+
+_TIMINGS = ("latency", "connect", "server_wait", "decode")
+_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+class EndpointMetrics:
+    """
+    Counters and timing histograms of one endpoint
+    """
+
+    def __init__(self):
+        self.timings = {name: Histogram() for name in _TIMINGS}
+        self.statuses = {}
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def record(self, context):
+        self.timings["latency"].record(context.elapsed)
+        self.timings["connect"].record(context.connect)
+        self.timings["server_wait"].record(context.server_wait)
+        self.timings["decode"].record(context.decode)
+        if context.status_code is not None:
+            self.statuses[context.status_code] = (
+                self.statuses.get(context.status_code, 0) + 1
+            )
+        if context.error is not None:
+            self.errors += 1
+        self.bytes_sent += context.bytes_sent
+        self.bytes_received += context.bytes_received
+
+    def merge(self, other):
+        for name, histogram in other.timings.items():
+            self.timings[name].merge(histogram)
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        self.errors += other.errors
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+
+    def to_dict(self):
+        return {
+            "timings": {name: h.to_dict() for name, h in self.timings.items()},
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "errors": self.errors,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        metrics = cls()
+        metrics.timings = {
+            name: Histogram.from_dict(h) for name, h in state["timings"].items()
+        }
+        metrics.statuses = {
+            int(status): count for status, count in state["statuses"].items()
+        }
+        metrics.errors = state["errors"]
+        metrics.bytes_sent = state["bytes_sent"]
+        metrics.bytes_received = state["bytes_received"]
+        return metrics
+
+
+class RequestMetrics(RequestHook):
+    """
+    Built-in hook collecting per-endpoint latency histograms, status code
+    counts and bytes transferred. Collections from several threads, clients
+    or processes merge into one through to_dict, from_dict and merge.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.endpoints = {}
+
+    def after_response(self, context):
+        endpoint = context.endpoint
+        with self._lock:
+            metrics = self.endpoints.get(endpoint)
+            if metrics is None:
+                metrics = self.endpoints[endpoint] = EndpointMetrics()
+            metrics.record(context)
+
+    def merge(self, other):
+        """
+        Add the samples of another RequestMetrics
+        :return: the metrics itself
+        """
+        with self._lock:
+            for endpoint, metrics in other.endpoints.items():
+                self.endpoints.setdefault(endpoint, EndpointMetrics()).merge(metrics)
+        return self
+
+    def to_dict(self):
+        """
+        :return: JSON-serializable state, see from_dict
+        """
+        with self._lock:
+            return {
+                endpoint: metrics.to_dict()
+                for endpoint, metrics in self.endpoints.items()
+            }
+
+    @classmethod
+    def from_dict(cls, state):
+        collected = cls()
+        collected.endpoints = {
+            endpoint: EndpointMetrics.from_dict(metrics)
+            for endpoint, metrics in state.items()
+        }
+        return collected
+
+    def snapshot(self):
+        """
+        :return: dictionary endpoint -> summary with counts, bytes and
+        timings in milliseconds
+        """
+        summary = {}
+        with self._lock:
+            for endpoint, metrics in sorted(self.endpoints.items()):
+                timings = {}
+                for name, histogram in metrics.timings.items():
+                    timings[name] = {
+                        f"p{quantile * 100:g}": _ms(
+                            histogram.percentile(quantile * 100)
+                        )
+                        for quantile in _QUANTILES
+                    }
+                    timings[name]["mean"] = _ms(histogram.mean)
+                    timings[name]["max"] = _ms(histogram.max)
+                summary[endpoint] = {
+                    "requests": metrics.timings["latency"].count,
+                    "errors": metrics.errors,
+                    "statuses": dict(sorted(metrics.statuses.items())),
+                    "bytes_sent": metrics.bytes_sent,
+                    "bytes_received": metrics.bytes_received,
+                    "timings_ms": timings,
+                }
+        return summary
+
+    def prometheus(self, prefix="rest_client"):
+        """
+        :param prefix: metric name prefix
+        :return: metrics in the Prometheus text exposition format
+        """
+        lines = []
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            for name in _TIMINGS:
+                metric = f"{prefix}_{name}_seconds"
+                lines.append(f"# TYPE {metric} summary")
+                for endpoint, metrics in endpoints:
+                    histogram = metrics.timings[name]
+                    label = f'endpoint="{endpoint}"'
+                    for quantile in _QUANTILES:
+                        value = histogram.percentile(quantile * 100)
+                        lines.append(
+                            f'{metric}{{{label},quantile="{quantile:g}"}} {value:.6f}'
+                        )
+                    lines.append(f"{metric}_sum{{{label}}} {histogram.total:.6f}")
+                    lines.append(f"{metric}_count{{{label}}} {histogram.count}")
+            lines.append(f"# TYPE {prefix}_responses_total counter")
+            for endpoint, metrics in endpoints:
+                for status, count in sorted(metrics.statuses.items()):
+                    lines.append(
+                        f'{prefix}_responses_total{{endpoint="{endpoint}",'
+                        f'status="{status}"}} {count}'
+                    )
+            lines.append(f"# TYPE {prefix}_errors_total counter")
+            for endpoint, metrics in endpoints:
+                lines.append(
+                    f'{prefix}_errors_total{{endpoint="{endpoint}"}} {metrics.errors}'
+                )
+            lines.append(f"# TYPE {prefix}_bytes_total counter")
+            for endpoint, metrics in endpoints:
+                for direction in ("sent", "received"):
+                    lines.append(
+                        f'{prefix}_bytes_total{{endpoint="{endpoint}",'
+                        f'direction="{direction}"}} '
+                        f"{getattr(metrics, f'bytes_{direction}')}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
@@ -0,0 +1,275 @@
+from array import array
+from sys import intern
+
+CATEGORIES = ("Home", "Work", "Personal")
+ID_BYTES = 12
+
+
+class Note:
+    """
+    Compact note built from the JSON returned by the Notes API
+    """
+
+    __slots__ = (
+        "id",
+        "title",
+        "description",
+        "category",
+        "completed",
+        "created_at",
+        "updated_at",
+        "user_id",
+    )
+
+    def __init__(
+        self,
+        id=None,
+        title=None,
+        description=None,
+        category=None,
+        completed=False,
+        created_at=None,
+        updated_at=None,
+        user_id=None,
+    ):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.category = category
+        self.completed = completed
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.user_id = user_id
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        :param data: note dictionary from a response
+        :return: Note
+        """
+        get = data.get
+        return cls(
+            get("id"),
+            get("title"),
+            get("description"),
+            get("category"),
+            get("completed", False),
+            get("created_at"),
+            get("updated_at"),
+            get("user_id"),
+        )
+
+    def to_json(self):
+        """
+        :return: note dictionary in the API format
+        """
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other):
+        if not isinstance(other, Note):
+            return NotImplemented
+        return all(
+            getattr(self, field) == getattr(other, field) for field in self.__slots__
+        )
+
+    def __repr__(self):
+        return f"Note(id={self.id!r}, title={self.title!r}, category={self.category!r})"
+
+
+class User:
+    """
+    Compact user profile built from the JSON returned by the Notes API
+    """
+
+    __slots__ = ("id", "name", "email", "phone", "company", "token")
+
+    def __init__(
+        self, id=None, name=None, email=None, phone=None, company=None, token=None
+    ):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.phone = phone
+        self.company = company
+        self.token = token
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        :param data: user dictionary from a response
+        :return: User
+        """
+        get = data.get
+        return cls(
+            get("id"),
+            get("name"),
+            get("email"),
+            get("phone"),
+            get("company"),
+            get("token"),
+        )
+
+    def to_json(self):
+        """
+        :return: user dictionary in the API format, without unset fields
+        """
+        return {
+            field: getattr(self, field)
+            for field in self.__slots__
+            if getattr(self, field) is not None
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, User):
+            return NotImplemented
+        return self.to_json() == other.to_json()
+
+    def __repr__(self):
+        return f"User(id={self.id!r}, email={self.email!r})"
+
+
+class NoteCollection:
+    """
+    Column-oriented storage of many notes.
+    Note ids, categories and completion flags are packed into byte arrays and
+    repeated strings such as the owner id are interned, so a large collection
+    costs far less than the equivalent list of dictionaries.
+    Indexing builds a Note on demand.
+    """
+
+    def __init__(self):
+        self._ids = bytearray()
+        self._extra_ids = {}
+        self.titles = []
+        self.descriptions = []
+        self._categories = array("B")
+        self._extra_categories = {}
+        self._completed = bytearray()
+        self.created_at = []
+        self.updated_at = []
+        self.user_ids = []
+
+    @classmethod
+    def from_json(cls, notes):
+        """
+        :param notes: iterable of note dictionaries, e.g. response["data"]
+        or NotesRest.iter_notes()
+        :return: NoteCollection
+        """
+        collection = cls()
+        collection.extend(notes)
+        return collection
+
+    def append(self, data):
+        """
+        :param data: note dictionary from a response
+        """
+        get = data.get
+        index = len(self)
+        note_id = get("id")
+        try:
+            packed = bytes.fromhex(note_id)
+        except (TypeError, ValueError):
+            packed = b""
+        if len(packed) != ID_BYTES:
+            self._extra_ids[index] = note_id
+            packed = bytes(ID_BYTES)
+        self._ids += packed
+        category = get("category")
+        if category in CATEGORIES:
+            self._categories.append(CATEGORIES.index(category))
+        else:
+            self._extra_categories[index] = category
+            self._categories.append(255)
+        self.titles.append(get("title"))
+        self.descriptions.append(get("description"))
+        self._completed.append(bool(get("completed")))
+        self.created_at.append(get("created_at"))
+        self.updated_at.append(get("updated_at"))
+        user_id = get("user_id")
+        self.user_ids.append(intern(user_id) if isinstance(user_id, str) else user_id)
+
+    def extend(self, notes):
+        for data in notes:
+            self.append(data)
+
+    def note_id(self, index):
+        if index in self._extra_ids:
+            return self._extra_ids[index]
+        return self._ids[index * ID_BYTES : (index + 1) * ID_BYTES].hex()
+
+    @property
+    def ids(self):
+        return [self.note_id(index) for index in range(len(self))]
+
+    def category(self, index):
+        code = self._categories[index]
+        if code == 255:
+            return self._extra_categories[index]
+        return CATEGORIES[code]
+
+    def completed(self, index):
+        return bool(self._completed[index])
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("note index out of range")
+        return Note(
+            self.note_id(index),
+            self.titles[index],
+            self.descriptions[index],
+            self.category(index),
+            self.completed(index),
+            self.created_at[index],
+            self.updated_at[index],
+            self.user_ids[index],
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self):
+        return f"NoteCollection({len(self)} notes)"
+
+
+class ApiResponse:
+    """
+    Typed Notes API response
+    """
+
+    __slots__ = ("success", "status", "message", "data")
+
+    def __init__(self, success=None, status=None, message=None, data=None):
+        self.success = success
+        self.status = status
+        self.message = message
+        self.data = data
+
+    @classmethod
+    def from_json(cls, response):
+        """
+        Convert a response in JSON format. A list of notes becomes a
+        NoteCollection, a note becomes a Note and a profile becomes a User.
+        :param response: response in JSON format
+        :return: ApiResponse
+        """
+        data = response.get("data")
+        if isinstance(data, list):
+            data = NoteCollection.from_json(data)
+        elif isinstance(data, dict):
+            data = (Note if "title" in data else User).from_json(data)
+        return cls(
+            response.get("success"),
+            response.get("status"),
+            response.get("message"),
+            data,
+        )
+
+    def __repr__(self):
+        return f"ApiResponse(status={self.status!r}, message={self.message!r})"
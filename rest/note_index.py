@@ -0,0 +1,123 @@
+import re
+from threading import RLock
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """
+    :return: set of lowercase word tokens of the text
+    """
+    return set(TOKEN_PATTERN.findall(text.lower())) if text else set()
+
+
+class NoteIndex:
+    """
+    In-memory notes with secondary indexes on category and completion state
+    and an inverted index of title and description tokens
+    """
+
+    def __init__(self, notes=()):
+        """
+        :param notes: iterable of note dictionaries, e.g. get_notes()["data"]
+        """
+        self._lock = RLock()
+        self.reset(notes)
+
+    @classmethod
+    def from_response(cls, response):
+        """
+        :param response: get_notes response in JSON format
+        :return: NoteIndex
+        """
+        return cls(response.get("data") or ())
+
+    def reset(self, notes=()):
+        """
+        Replace the indexed notes
+        """
+        with self._lock:
+            self._notes = {}
+            self._by_category = {}
+            self._by_completed = {True: set(), False: set()}
+            self._by_token = {}
+            for note in notes:
+                self.add(note)
+
+    def add(self, note):
+        """
+        Insert or replace a note
+        :param note: note dictionary
+        """
+        note_id = note["id"]
+        with self._lock:
+            self.discard(note_id)
+            self._notes[note_id] = note
+            self._by_category.setdefault(note.get("category"), set()).add(note_id)
+            self._by_completed[bool(note.get("completed"))].add(note_id)
+            for token in self._tokens(note):
+                self._by_token.setdefault(token, set()).add(note_id)
+
+    def apply(self, response):
+        """
+        Index the note returned by post_notes, put_note_by_id or patch_note_by_id
+        :param response: response in JSON format
+        """
+        if response.get("status") == 200 and isinstance(response.get("data"), dict):
+            self.add(response["data"])
+
+    def discard(self, note_id):
+        """
+        Remove a note if it is indexed
+        """
+        with self._lock:
+            note = self._notes.pop(note_id, None)
+            if note is None:
+                return
+            self._remove(self._by_category, note.get("category"), note_id)
+            self._by_completed[bool(note.get("completed"))].discard(note_id)
+            for token in self._tokens(note):
+                self._remove(self._by_token, token, note_id)
+
+    @staticmethod
+    def _remove(index, key, note_id):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(note_id)
+            if not ids:
+                del index[key]
+
+    @staticmethod
+    def _tokens(note):
+        return tokenize(note.get("title")) | tokenize(note.get("description"))
+
+    def get(self, note_id):
+        return self._notes.get(note_id)
+
+    def __contains__(self, note_id):
+        return note_id in self._notes
+
+    def __len__(self):
+        return len(self._notes)
+
+    def query(self, category=None, completed=None, text=None):
+        """
+        Find notes matching all given filters
+        :param category: category of the notes
+        :param completed: completion state of the notes
+        :param text: words that must all appear in the title or description
+        :return: list of note dictionaries
+        """
+        with self._lock:
+            candidates = []
+            if category is not None:
+                candidates.append(self._by_category.get(category, set()))
+            if completed is not None:
+                candidates.append(self._by_completed[bool(completed)])
+            for token in tokenize(text):
+                candidates.append(self._by_token.get(token, set()))
+            if not candidates:
+                return list(self._notes.values())
+            candidates.sort(key=len)
+            ids = candidates[0].intersection(*candidates[1:])
+            return [self._notes[note_id] for note_id in ids]
@@ -1,4 +1,10 @@
+from threading import local
+
+from rest.bulk import BulkReport, run_bulk
+from rest.json_stream import iter_array_items
+from rest.lazy_response import LazyResponse
 from rest.rest_client import RestClient
+from rest.write_behind import WriteBehindQueue
 
 
 class NotesRest(RestClient):
@@ -9,10 +15,97 @@ class NotesRest(RestClient):
     BASE_URL = "https://practice.expandtesting.com/notes/api/"
     _token: str | None = None
 
+    def __init__(
+        self,
+        base_url=None,
+        cache=None,
+        token_store=None,
+        note_index=None,
+        resource_registry=None,
+        **kwargs,
+    ):
+        """
+        :param base_url: API address overriding the class BASE_URL
+        :param cache: optional ResponseCache for get_notes and get_note_by_id
+        :param token_store: optional TokenStore used by authenticate
+        :param note_index: optional NoteIndex kept up to date with the notes
+        retrieved and changed through this service
+        :param resource_registry: optional ResourceRegistry recording the notes
+        and users created through this service for a later sweep
+        :param kwargs: connection pool settings of RestClient
+        """
+        super().__init__(base_url, **kwargs)
+        self._cache = cache
+        self._note_index = note_index
+        self._resources = resource_registry
+        self._token_store = token_store
+        self._credentials = None
+        self._relogin = local()
+
     @property
     def _headers(self):
         return {"x-auth-token": self._token}
 
+    def _reauthenticate(self):
+        if (
+            self._token_store is None
+            or self._credentials is None
+            or getattr(self._relogin, "active", False)
+        ):
+            return False
+        email, password = self._credentials
+        self._log.info(f"Token rejected, logging in again as {email}")
+        self._relogin.active = True
+        try:
+            self._token_store.invalidate(self, email, self._token)
+            token = self._token_store.login(self, email, password)
+        finally:
+            self._relogin.active = False
+        if self._resources is not None:
+            self._resources.bind_token(token, email, password)
+        return True
+
+    def _forget_credentials(self):
+        if self._token_store is not None and self._credentials is not None:
+            self._token_store.invalidate(self, self._credentials[0], self._token)
+        self._credentials = None
+
+    @staticmethod
+    def _status(response):
+        # the status echoed in the body, read from a lazy response without decoding
+        if isinstance(response, LazyResponse):
+            return response.status_code
+        return response["status"]
+
+    def _cached(self, key, expected_status_code):
+        if self._cache is None or expected_status_code != 200:
+            return None
+        return self._cache.get((self._token, *key))
+
+    def _cache_generation(self):
+        return None if self._cache is None else self._cache.generation
+
+    def _store(self, key, response, generation):
+        if self._cache is not None and self._status(response) == 200:
+            self._cache.set((self._token, *key), response, generation)
+
+    def _invalidate_notes(self, note_id=None):
+        if self._cache is not None:
+            self._cache.invalidate(
+                (self._token, "notes"), (self._token, "notes", note_id)
+            )
+
+    def _note_changed(self, note_id, response, deleted=False):
+        self._invalidate_notes(note_id)
+        if deleted and self._resources is not None and self._status(response) == 200:
+            self._resources.untrack_note(note_id)
+        if self._note_index is None or self._status(response) != 200:
+            return
+        if deleted:
+            self._note_index.discard(note_id)
+        else:
+            self._note_index.apply(response)
+
     def get_health_check(self):
         """
         Send a GET request to /health-check
@@ -39,6 +132,8 @@ class NotesRest(RestClient):
             data={"name": name, "email": email, "password": password},
             expected_status_code=expected_status_code,
         )
+        if self._resources is not None and self._status(response) == 201:
+            self._resources.track_user(email, password)
         return response
 
     def post_users_login(self, email=None, password=None, expected_status_code=200):
@@ -55,10 +150,29 @@ class NotesRest(RestClient):
             json={"email": email, "password": password},
             expected_status_code=expected_status_code,
         )
-        if response["status"] == 200:
+        if self._status(response) == 200:
             self._token = response["data"]["token"]
+            if self._resources is not None:
+                self._resources.bind_token(self._token, email, password)
         return response
 
+    def authenticate(self, email, password):
+        """
+        Log in reusing the token stored for the credential in the token store.
+        Without a token store this is a plain post_users_login.
+        A token rejected later with 401 is replaced by logging in again.
+        :param email: registered user's email
+        :param password: registered user's password
+        :return: auth token
+        """
+        if self._token_store is None:
+            return self.post_users_login(email, password)["data"]["token"]
+        token = self._token_store.login(self, email, password)
+        self._credentials = (email, password)
+        if self._resources is not None:
+            self._resources.bind_token(token, email, password)
+        return token
+
     def get_users_profile(self, expected_status_code=200):
         """
         Send a GET request to /users/profile
@@ -162,7 +276,10 @@ class NotesRest(RestClient):
         response = self._delete(
             "users/logout", expected_status_code=expected_status_code
         )
-        if response["status"] == 200:
+        if self._status(response) == 200:
+            self._forget_credentials()
+            if self._cache is not None:
+                self._cache.invalidate_token(self._token)
             self._token = None
         return response
 
@@ -176,7 +293,12 @@ class NotesRest(RestClient):
         response = self._delete(
             "users/delete-account", expected_status_code=expected_status_code
         )
-        if response["status"] == 200:
+        if self._status(response) == 200:
+            self._forget_credentials()
+            if self._resources is not None:
+                self._resources.untrack_account(self._token)
+            if self._cache is not None:
+                self._cache.invalidate_token(self._token)
             self._token = None
         return response
 
@@ -197,6 +319,12 @@ class NotesRest(RestClient):
             data={"title": title, "description": description, "category": category},
             expected_status_code=expected_status_code,
         )
+        if self._status(response) == 200:
+            self._invalidate_notes()
+            if self._resources is not None:
+                self._resources.track_note(self._token, response["data"]["id"])
+            if self._note_index is not None:
+                self._note_index.apply(response)
         return response
 
     def get_notes(self, expected_status_code=200):
@@ -206,9 +334,36 @@ class NotesRest(RestClient):
         :return: response in JSON format
         """
         self._log.info("Retrieving a list of notes")
+        response = self._cached(("notes",), expected_status_code)
+        if response is not None:
+            self._log.info("Using cached list of notes")
+            return response
+        generation = self._cache_generation()
         response = self._get("notes", expected_status_code=expected_status_code)
+        self._store(("notes",), response, generation)
+        if self._note_index is not None and self._status(response) == 200:
+            self._note_index.reset(response["data"])
         return response
 
+    def iter_notes(self, note_factory=None, chunk_size=65536, expected_status_code=200):
+        """
+        Send a GET request to /notes and parse the list of notes while it
+        downloads, so only one note is held in memory at a time
+        :param note_factory: optional callable building an object from each note dict
+        :param chunk_size: maximum number of bytes read from the response at once
+        :param expected_status_code: expected response code
+        :return: generator of notes
+        """
+        self._log.info("Streaming a list of notes")
+        chunks = self._stream(
+            "GET",
+            "notes",
+            expected_status_code=expected_status_code,
+            chunk_size=chunk_size,
+        )
+        for note in iter_array_items(chunks):
+            yield note if note_factory is None else note_factory(note)
+
     def get_note_by_id(self, note_id=None, expected_status_code=200):
         """
         Send a GET request to /notes/{id}
@@ -217,9 +372,15 @@ class NotesRest(RestClient):
         :return: response in JSON format
         """
         self._log.info(f"Retrieving a note with id: {note_id}")
+        response = self._cached(("notes", note_id), expected_status_code)
+        if response is not None:
+            self._log.info(f"Using cached note with id: {note_id}")
+            return response
+        generation = self._cache_generation()
         response = self._get(
             f"notes/{note_id}", expected_status_code=expected_status_code
         )
+        self._store(("notes", note_id), response, generation)
         return response
 
     def put_note_by_id(
@@ -252,6 +413,7 @@ class NotesRest(RestClient):
             },
             expected_status_code=expected_status_code,
         )
+        self._note_changed(note_id, response)
         return response
 
     def patch_note_by_id(self, note_id=None, completed=None, expected_status_code=200):
@@ -268,6 +430,7 @@ class NotesRest(RestClient):
             json={"completed": completed},
             expected_status_code=expected_status_code,
         )
+        self._note_changed(note_id, response)
         return response
 
     def delete_note_by_id(self, note_id=None, expected_status_code=200):
@@ -281,4 +444,106 @@ class NotesRest(RestClient):
         response = self._delete(
             f"notes/{note_id}", expected_status_code=expected_status_code
         )
+        self._note_changed(note_id, response, deleted=True)
         return response
+
+    def write_behind(
+        self, window=0.05, max_pending=100, concurrency=8, expected_status_code=200
+    ):
+        """
+        Create a queue merging bursts of put_note_by_id and patch_note_by_id
+        calls to the same note into a single request
+        :param window: seconds an update may wait before it is sent
+        :param max_pending: number of distinct notes that triggers a flush
+        :param concurrency: maximum number of requests in flight while flushing
+        :param expected_status_code: expected response code for every update
+        :return: WriteBehindQueue, close it to send the remaining updates
+        """
+        self._log.info(f"Starting write-behind queue with a {window}s window")
+        return WriteBehindQueue(
+            self, window, max_pending, concurrency, expected_status_code
+        )
+
+    def _run_bulk(self, func, items, concurrency, limiter):
+        if limiter is None:
+            return run_bulk(func, items, concurrency)
+
+        def observed(item):
+            with self._observed_by(limiter):
+                return func(item)
+
+        return run_bulk(observed, items, concurrency, limiter)
+
+    def create_notes_many(
+        self, notes, concurrency=8, expected_status_code=200, limiter=None
+    ):
+        """
+        Create notes in parallel with POST requests to /notes
+        :param notes: iterable of dicts with post_notes arguments
+        (title, description, category)
+        :param concurrency: maximum number of requests in flight
+        :param expected_status_code: expected response code for every note
+        :param limiter: optional AdaptiveLimiter deciding the number of requests
+        in flight instead of `concurrency`, fed with the responses of this batch
+        :return: BulkReport streaming results in completion order
+        """
+        self._log.info(f"Creating notes with concurrency {concurrency}")
+        return BulkReport(
+            self._run_bulk(
+                lambda note: self.post_notes(
+                    **note, expected_status_code=expected_status_code
+                ),
+                notes,
+                concurrency,
+                limiter,
+            )
+        )
+
+    def update_notes_many(
+        self, updates, concurrency=8, expected_status_code=200, limiter=None
+    ):
+        """
+        Update notes in parallel with PUT requests to /notes/{id}
+        :param updates: iterable of dicts with put_note_by_id arguments
+        (note_id, title, description, completed, category)
+        :param concurrency: maximum number of requests in flight
+        :param expected_status_code: expected response code for every note
+        :param limiter: optional AdaptiveLimiter deciding the number of requests
+        in flight instead of `concurrency`, fed with the responses of this batch
+        :return: BulkReport streaming results in completion order
+        """
+        self._log.info(f"Updating notes with concurrency {concurrency}")
+        return BulkReport(
+            self._run_bulk(
+                lambda update: self.put_note_by_id(
+                    **update, expected_status_code=expected_status_code
+                ),
+                updates,
+                concurrency,
+                limiter,
+            )
+        )
+
+    def delete_notes_many(
+        self, note_ids, concurrency=8, expected_status_code=200, limiter=None
+    ):
+        """
+        Delete notes in parallel with DELETE requests to /notes/{id}
+        :param note_ids: iterable of note ids
+        :param concurrency: maximum number of requests in flight
+        :param expected_status_code: expected response code for every note
+        :param limiter: optional AdaptiveLimiter deciding the number of requests
+        in flight instead of `concurrency`, fed with the responses of this batch
+        :return: BulkReport streaming results in completion order
+        """
+        self._log.info(f"Deleting notes with concurrency {concurrency}")
+        return BulkReport(
+            self._run_bulk(
+                lambda note_id: self.delete_note_by_id(
+                    note_id, expected_status_code=expected_status_code
+                ),
+                note_ids,
+                concurrency,
+                limiter,
+            )
+        )
@@ -0,0 +1,9 @@
+def drop_none(values):
+    """
+    Remove None values the same way requests does for form data, params and headers
+    :param values: dictionary, anything else is returned unchanged
+    :return: copy of the dictionary without None values
+    """
+    if not isinstance(values, dict):
+        return values
+    return {key: value for key, value in values.items() if value is not None}
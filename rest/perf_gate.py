@@ -0,0 +1,326 @@
+"""
+pytest plugin gating a run on client-side performance regressions.
+
+Every RestClient request is recorded through a global RequestHook per
+endpoint, and per test when the test function sends it from its own thread.
+Fixture setup and background threads (pool refills, write-behind flushes)
+are not charged to whichever test happens to be running. At the end of the
+session the summary is compared to a stored baseline and regressions either
+warn or fail the run, depending on `perf_gate` in pytest.ini or --perf-gate:
+
+    pytest --perf-save-baseline   # record perf_baseline.json
+    pytest --perf-gate fail       # compare against it
+
+An endpoint regresses when its `perf_percentile` latency exceeds the
+baseline by more than `perf_threshold` times and by at least
+`perf_min_delta_ms`, both sides having `perf_min_samples` requests; a test
+regresses the same way on the total time of its requests.
+"""
+import json
+from pathlib import Path
+from threading import Lock, local
+
+import pytest
+
+from rest.metrics import (
+    Histogram,
+    RequestHook,
+    RequestMetrics,
+    add_global_hook,
+    remove_global_hook,
+)
+
+MODES = ("off", "warn", "fail")
+PERCENTILES = (50, 90, 95, 99)
+
+
+class PerfRecorder(RequestHook):
+    """
+    Request latencies by endpoint and by the test that sent them
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._local = local()
+        self.endpoints = RequestMetrics()
+        self.tests = {}
+
+    @property
+    def current_test(self):
+        """
+        Test id requests of the calling thread are charged to, None for none
+        """
+        return getattr(self._local, "test", None)
+
+    @current_test.setter
+    def current_test(self, nodeid):
+        self._local.test = nodeid
+
+    def after_response(self, context):
+        self.endpoints.after_response(context)
+        nodeid = self.current_test
+        if nodeid is None:
+            return
+        with self._lock:
+            histogram = self.tests.get(nodeid)
+            if histogram is None:
+                histogram = self.tests[nodeid] = Histogram()
+            histogram.record(context.elapsed)
+
+    def merge(self, other):
+        """
+        Add the samples of another recorder, e.g. of an xdist worker
+        :return: the recorder itself
+        """
+        self.endpoints.merge(other.endpoints)
+        with self._lock:
+            for nodeid, histogram in other.tests.items():
+                self.tests.setdefault(nodeid, Histogram()).merge(histogram)
+        return self
+
+    def to_dict(self):
+        """
+        :return: JSON-serializable state, see from_dict
+        """
+        with self._lock:
+            tests = {nodeid: h.to_dict() for nodeid, h in self.tests.items()}
+        return {"endpoints": self.endpoints.to_dict(), "tests": tests}
+
+    @classmethod
+    def from_dict(cls, state):
+        recorder = cls()
+        recorder.endpoints = RequestMetrics.from_dict(state["endpoints"])
+        recorder.tests = {
+            nodeid: Histogram.from_dict(h) for nodeid, h in state["tests"].items()
+        }
+        return recorder
+
+
+def _timings(histogram):
+    timings = {
+        f"p{percent}": round(histogram.percentile(percent) * 1000, 3)
+        for percent in PERCENTILES
+    }
+    timings["total"] = round(histogram.total * 1000, 3)
+    return timings
+
+
+def summarize(recorder):
+    """
+    :return: dictionary with request counts and latencies in milliseconds
+    by endpoint and by test, the format of the baseline file
+    """
+    endpoints = {}
+    for endpoint, metrics in sorted(recorder.endpoints.endpoints.items()):
+        latency = metrics.timings["latency"]
+        endpoints[endpoint] = {"requests": latency.count, **_timings(latency)}
+    tests = {
+        nodeid: {"requests": histogram.count, **_timings(histogram)}
+        for nodeid, histogram in sorted(recorder.tests.items())
+    }
+    return {"endpoints": endpoints, "tests": tests}
+
+
+def compare(
+    summary,
+    baseline,
+    percentile=90,
+    threshold=1.5,
+    min_samples=5,
+    min_delta_ms=1.0,
+):
+    """
+    Find the endpoints and tests slower than in the baseline
+    :param summary: result of summarize for this run
+    :param baseline: result of summarize for the reference run
+    :param percentile: endpoint latency percentile compared
+    :param threshold: allowed ratio of current to baseline time
+    :param min_samples: fewer requests on either side are not compared
+    :param min_delta_ms: smaller slowdowns are noise
+    :return: list of regression dictionaries, the largest ratio first
+    """
+    regressions = []
+    for kind, key in (("endpoint", f"p{percentile:g}"), ("test", "total")):
+        current, reference = summary[f"{kind}s"], baseline.get(f"{kind}s", {})
+        for name, timings in current.items():
+            before = reference.get(name)
+            if before is None or key not in before:
+                continue
+            if min(timings["requests"], before["requests"]) < min_samples:
+                continue
+            if (
+                timings[key] > before[key] * threshold
+                and timings[key] - before[key] >= min_delta_ms
+            ):
+                regressions.append(
+                    {
+                        "kind": kind,
+                        "name": name,
+                        "statistic": key,
+                        "baseline_ms": before[key],
+                        "current_ms": timings[key],
+                        "ratio": round(timings[key] / before[key], 2)
+                        if before[key]
+                        else None,
+                    }
+                )
+    regressions.sort(key=lambda regression: -(regression["ratio"] or float("inf")))
+    return regressions
+
+
+class PerfGate:
+    """
+    Plugin object registered while the gate is on
+    """
+
+    def __init__(self, config, mode):
+        self.config = config
+        self.mode = mode
+        self.recorder = PerfRecorder()
+        self.summary = None
+        self.regressions = []
+        self.percentile = float(config.getini("perf_percentile"))
+        if self.percentile not in PERCENTILES:
+            raise pytest.UsageError(f"perf_percentile must be one of {PERCENTILES}")
+        self.baseline_path = Path(
+            config.getoption("perf_baseline") or config.getini("perf_baseline")
+        )
+        if not self.baseline_path.is_absolute():
+            self.baseline_path = config.rootpath / self.baseline_path
+        add_global_hook(self.recorder)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        self.recorder.current_test = item.nodeid
+        try:
+            yield
+        finally:
+            self.recorder.current_test = None
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        state = getattr(node, "workeroutput", {}).get("perf_gate")
+        if state is not None:
+            self.recorder.merge(PerfRecorder.from_dict(state))
+
+    def pytest_sessionfinish(self, session):
+        remove_global_hook(self.recorder)
+        if hasattr(self.config, "workerinput"):
+            self.config.workeroutput["perf_gate"] = self.recorder.to_dict()
+            return
+        self.summary = summarize(self.recorder)
+        if self.config.getoption("perf_save_baseline"):
+            self.baseline_path.write_text(json.dumps(self.summary, indent=2))
+        elif self.baseline_path.exists():
+            self.regressions = compare(
+                self.summary,
+                json.loads(self.baseline_path.read_text()),
+                percentile=self.percentile,
+                threshold=float(self.config.getini("perf_threshold")),
+                min_samples=int(self.config.getini("perf_min_samples")),
+                min_delta_ms=float(self.config.getini("perf_min_delta_ms")),
+            )
+        report = self.config.getoption("perf_report")
+        if report:
+            Path(report).write_text(json.dumps(self.report(), indent=2))
+        if (
+            self.regressions
+            and self.mode == "fail"
+            and session.exitstatus == pytest.ExitCode.OK
+        ):
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+    def report(self):
+        """
+        :return: JSON report with the run summary and its regressions
+        """
+        return {
+            "mode": self.mode,
+            "baseline": str(self.baseline_path),
+            "percentile": self.percentile,
+            "regressions": self.regressions,
+            **self.summary,
+        }
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.summary is None:
+            return
+        key = f"p{self.percentile:g}"
+        slowest = sorted(
+            self.summary["endpoints"].items(), key=lambda item: -item[1][key]
+        )[: int(self.config.getini("perf_top"))]
+        terminalreporter.section("perf gate")
+        if not slowest:
+            terminalreporter.write_line("no RestClient requests recorded")
+        for endpoint, timings in slowest:
+            terminalreporter.write_line(
+                f"{timings[key]:10.3f} ms {key}  {timings['requests']:6d} requests  "
+                f"{endpoint}"
+            )
+        if self.config.getoption("perf_save_baseline"):
+            terminalreporter.write_line(f"baseline saved to {self.baseline_path}")
+        elif not self.baseline_path.exists():
+            terminalreporter.write_line(f"no baseline at {self.baseline_path}")
+        for regression in self.regressions:
+            terminalreporter.write_line(
+                f"{regression['kind']} {regression['name']} {regression['statistic']} "
+                f"{regression['baseline_ms']} ms -> {regression['current_ms']} ms",
+                red=self.mode == "fail",
+                yellow=self.mode == "warn",
+            )
+        if self.regressions:
+            terminalreporter.write_line(
+                f"{len(self.regressions)} performance regressions"
+                + (", failing the run" if self.mode == "fail" else ""),
+                bold=True,
+            )
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("perf_gate", "performance regression gate")
+    group.addoption(
+        "--perf-gate",
+        choices=MODES,
+        default=None,
+        help="warn or fail on RestClient latency regressions against the baseline",
+    )
+    group.addoption(
+        "--perf-baseline", default=None, help="baseline JSON file, see perf_baseline"
+    )
+    group.addoption(
+        "--perf-save-baseline",
+        action="store_true",
+        help="store this run as the baseline instead of comparing",
+    )
+    group.addoption("--perf-report", default=None, help="write a JSON report here")
+    parser.addini("perf_gate", default="off", help="off, warn or fail")
+    parser.addini(
+        "perf_baseline",
+        default="perf_baseline.json",
+        help="baseline JSON file relative to the rootdir",
+    )
+    parser.addini(
+        "perf_percentile", default="90", help="endpoint latency percentile compared"
+    )
+    parser.addini(
+        "perf_threshold", default="1.5", help="allowed ratio of current to baseline"
+    )
+    parser.addini(
+        "perf_min_samples",
+        default="5",
+        help="requests needed on both sides for a comparison",
+    )
+    parser.addini(
+        "perf_min_delta_ms", default="1.0", help="smaller slowdowns are ignored"
+    )
+    parser.addini("perf_top", default="10", help="slowest endpoints in the summary")
+
+
+def pytest_configure(config):
+    mode = config.getoption("perf_gate") or config.getini("perf_gate")
+    if mode not in MODES:
+        raise pytest.UsageError(f"perf_gate must be one of {MODES}")
+    if mode == "off" and config.getoption("perf_save_baseline"):
+        mode = "warn"
+    if mode != "off":
+        config.pluginmanager.register(PerfGate(config, mode), "perf_gate_recorder")
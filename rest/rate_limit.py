@@ -0,0 +1,177 @@
+import mmap
+import os
+import struct
+from threading import Lock
+from time import monotonic, sleep, time
+
+from rest.file_lock import FileLock
+
+_STATE = struct.Struct("dd")
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second with bursts up to `capacity`
+    """
+
+    def __init__(self, rate, capacity=None, clock=monotonic, sleep=sleep):
+        """
+        :param rate: tokens added per second
+        :param capacity: maximum burst size, defaults to one second worth of tokens
+        :param clock: time source
+        :param sleep: function used to wait
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = Lock()
+        self._tokens = self.capacity
+        self._updated = clock()
+        self.waits = 0
+        self.waited = 0.0
+
+    def _take(self, tokens, now):
+        """
+        Refill and try to take tokens from a (tokens, updated) state
+        :return: new state and seconds to wait, 0 when the tokens were taken
+        """
+        return _refill_and_take(
+            self.rate, self.capacity, self._tokens, self._updated, tokens, now
+        )
+
+    def try_acquire(self, tokens=1):
+        """
+        :return: True if the tokens were taken without waiting
+        """
+        with self._lock:
+            (self._tokens, self._updated), wait = self._take(tokens, self._clock())
+        return wait == 0
+
+    def acquire(self, tokens=1):
+        """
+        Block until the tokens are available and take them
+        :return: seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                (self._tokens, self._updated), wait = self._take(tokens, self._clock())
+                if wait == 0:
+                    if waited:
+                        self.waits += 1
+                        self.waited += waited
+                    return waited
+            self._sleep(wait)
+            waited += wait
+
+
+def _refill_and_take(rate, capacity, available, updated, tokens, now):
+    available = min(capacity, available + max(now - updated, 0.0) * rate)
+    if available >= tokens:
+        return (available - tokens, now), 0
+    return (available, now), (tokens - available) / rate
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket shared by all processes of a host through a memory-mapped
+    state file guarded by a file lock
+    """
+
+    def __init__(self, path, rate, capacity=None, sleep=sleep):
+        """
+        :param path: state file shared by the processes, created when missing
+        :param rate: tokens added per second for all processes together
+        :param capacity: maximum burst size, defaults to one second worth of tokens
+        :param sleep: function used to wait
+        """
+        super().__init__(rate, capacity, clock=time, sleep=sleep)
+        self.path = os.fspath(path)
+        self._lock_path = self.path + ".lock"
+        with FileLock(self._lock_path):
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            if os.fstat(fd).st_size < _STATE.size:
+                os.write(fd, _STATE.pack(self.capacity, time()))
+            self._map = mmap.mmap(fd, _STATE.size)
+            os.close(fd)
+
+    @property
+    def _state(self):
+        return _STATE.unpack(self._map[: _STATE.size])
+
+    def _take(self, tokens, now):
+        with FileLock(self._lock_path):
+            available, updated = self._state
+            state, wait = _refill_and_take(
+                self.rate, self.capacity, available, updated, tokens, now
+            )
+            self._map[: _STATE.size] = _STATE.pack(*state)
+        return state, wait
+
+    def close(self):
+        self._map.close()
+
+
+class RateLimiter:
+    """
+    Client-side rate limits: an optional bucket for all requests plus
+    buckets for specific endpoints.
+    Endpoint keys are path prefixes relative to the base api address,
+    optionally qualified with a method, e.g. "users/login" or "POST notes".
+    The most specific matching key wins.
+    """
+
+    def __init__(self, default=None, endpoints=None):
+        """
+        :param default: TokenBucket applied to every request
+        :param endpoints: dictionary endpoint key -> TokenBucket
+        """
+        self.default = default
+        self._endpoints = sorted(
+            (
+                self._parse_key(key) + (bucket,)
+                for key, bucket in (endpoints or {}).items()
+            ),
+            key=lambda entry: (len(entry[1]), entry[0] is not None),
+            reverse=True,
+        )
+        self._lock = Lock()
+        self.waits = 0
+        self.waited = 0.0
+
+    @staticmethod
+    def _parse_key(key):
+        method, _, prefix = key.rpartition(" ")
+        return (method.upper() or None, prefix.strip("/"))
+
+    def bucket_for(self, method, path):
+        """
+        :return: endpoint bucket matching the request or None
+        """
+        path = path.strip("/")
+        for bucket_method, prefix, bucket in self._endpoints:
+            if bucket_method not in (None, method.upper()):
+                continue
+            if path == prefix or path.startswith(prefix + "/") or not prefix:
+                return bucket
+        return None
+
+    def acquire(self, method, path):
+        """
+        Block until the request is allowed by every matching bucket
+        :return: seconds spent waiting
+        """
+        waited = 0.0
+        for bucket in (self.bucket_for(method, path), self.default):
+            if bucket is not None:
+                waited += bucket.acquire()
+        if waited:
+            with self._lock:
+                self.waits += 1
+                self.waited += waited
+        return waited
+
+    def snapshot(self):
+        with self._lock:
+            return {"waits": self.waits, "waited_s": round(self.waited, 6)}
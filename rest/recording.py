@@ -0,0 +1,187 @@
+import os
+from collections import deque
+from datetime import datetime, timezone
+from json import dumps, loads
+from threading import Lock
+
+from rest.params import drop_none
+
+
+class ReplayMissError(LookupError):
+    """
+    Raised when a replayed request was never recorded
+    """
+
+
+REDACTED = "[REDACTED]"
+SECRET_FIELDS = ("x-auth-token", "authorization", "cookie", "token")
+
+
+def _is_secret(key):
+    key = str(key).lower()
+    return key in SECRET_FIELDS or "password" in key
+
+
+def redact(value):
+    """
+    Replace auth tokens and passwords in headers, form data and JSON bodies
+    :return: copy of value with the secrets replaced by REDACTED
+    """
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if _is_secret(key) and item is not None else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def request_key(method, path, headers=None, params=None, data=None, json=None):
+    """
+    Canonical key of a request. None values of headers, params and form data
+    are dropped the same way requests drops them before sending.
+    """
+    return (
+        method.upper(),
+        path,
+        _canonical(drop_none(headers)),
+        _canonical(drop_none(params)),
+        _canonical(drop_none(data)),
+        _canonical(json),
+    )
+
+
+def _canonical(value):
+    if value is None:
+        return None
+    return dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def replay_key(method, path, headers=None, params=None, data=None, json=None):
+    """
+    request_key of a request with its secrets redacted, matching the
+    redacted request stored by Recorder whatever token or password was sent
+    """
+    return request_key(
+        method, path, redact(headers), redact(params), redact(data), redact(json)
+    )
+
+
+def _decode(content):
+    try:
+        return {"response": redact(loads(content))}
+    except ValueError:
+        return {"content": content.decode("utf-8", "replace")}
+
+
+class Recorder:
+    """
+    Streams request/response pairs to a JSONL file, one exchange per line.
+    Auth tokens and passwords are redacted before they are written.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: JSONL file, appended to when it already exists
+        """
+        self.path = os.fspath(path)
+        self._lock = Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def record(
+        self,
+        method,
+        path,
+        status_code,
+        content,
+        elapsed,
+        headers=None,
+        params=None,
+        data=None,
+        json=None,
+    ):
+        """
+        Append one exchange
+        :param method: HTTP method
+        :param path: path relative to the base api address
+        :param status_code: response status code
+        :param content: raw response body
+        :param elapsed: seconds the exchange took
+        """
+        entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "method": method.upper(),
+            "path": path,
+            "headers": redact(drop_none(headers)),
+            "params": redact(drop_none(params)),
+            "data": redact(drop_none(data)),
+            "json": redact(json),
+            "status": status_code,
+            **_decode(content),
+            "elapsed_ms": round(elapsed * 1000, 3),
+        }
+        line = dumps(entry, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class Replayer:
+    """
+    Serves recorded responses without network I/O.
+    Identical requests are answered in recording order; once their recorded
+    responses run out the last one keeps being served.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: JSONL file written by Recorder
+        """
+        self.path = os.fspath(path)
+        self._lock = Lock()
+        self._index = {}
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                entry = loads(line)
+                key = replay_key(
+                    entry["method"],
+                    entry["path"],
+                    entry.get("headers"),
+                    entry.get("params"),
+                    entry.get("data"),
+                    entry.get("json"),
+                )
+                if "response" in entry:
+                    content = dumps(entry["response"]).encode()
+                else:
+                    content = entry.get("content", "").encode()
+                self._index.setdefault(key, deque()).append((entry["status"], content))
+
+    def __len__(self):
+        return sum(len(responses) for responses in self._index.values())
+
+    def lookup(self, method, path, headers=None, params=None, data=None, json=None):
+        """
+        :return: recorded status code and raw response body
+        """
+        key = replay_key(method, path, headers, params, data, json)
+        with self._lock:
+            responses = self._index.get(key)
+            if not responses:
+                raise ReplayMissError(f"No recorded response for {method} {path}")
+            if len(responses) > 1:
+                return responses.popleft()
+            return responses[0]
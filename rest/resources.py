@@ -0,0 +1,157 @@
+from logging import getLogger
+from threading import Lock
+
+from rest.bulk import BulkReport, run_bulk
+
+_log = getLogger(__name__)
+
+
+class ResourceRegistry:
+    """
+    Thread-safe record of the notes and users created through NotesRest
+    services, so they can be removed in one concurrent sweep afterwards.
+    Notes are tracked by their owner's email; the sweep logs in again with
+    the owner's credentials, as the token a note was created with may have
+    been logged out or replaced meanwhile.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._notes = {}
+        self._users = {}
+        self._logins = {}
+        self._passwords = {}
+
+    def track_note(self, token, note_id):
+        """
+        :param token: auth token the note was created with, see bind_token
+        :param note_id: id of the created note
+        """
+        with self._lock:
+            self._notes[note_id] = self._logins.get(token)
+
+    def untrack_note(self, note_id):
+        with self._lock:
+            self._notes.pop(note_id, None)
+
+    def track_user(self, email, password):
+        """
+        :param email: registered user's email
+        :param password: registered user's password
+        """
+        with self._lock:
+            self._users[email] = password
+
+    def bind_token(self, token, email, password):
+        """
+        Remember the credentials a login token was obtained with
+        """
+        with self._lock:
+            self._logins[token] = email
+            self._passwords[email] = password
+
+    def untrack_account(self, token):
+        """
+        Forget the user owning the token and every note of that user,
+        the server removed them together with the account
+        """
+        with self._lock:
+            email = self._logins.get(token)
+            if email is None:
+                return
+            self._users.pop(email, None)
+            self._passwords.pop(email, None)
+            self._logins = {
+                other: owner for other, owner in self._logins.items() if owner != email
+            }
+            self._notes = {
+                note_id: owner
+                for note_id, owner in self._notes.items()
+                if owner != email
+            }
+
+    def drain(self):
+        """
+        Take every tracked resource out of the registry
+        :return: dictionary note id -> (owner's email, password), with None
+        for notes of unknown owners, and dictionary email -> password
+        """
+        with self._lock:
+            notes = {
+                note_id: None if email is None else (email, self._passwords.get(email))
+                for note_id, email in self._notes.items()
+            }
+            users = self._users
+            self._notes, self._users, self._logins, self._passwords = {}, {}, {}, {}
+        return notes, users
+
+    def __len__(self):
+        with self._lock:
+            return len(self._notes) + len(self._users)
+
+
+def sweep(registry, service_factory, concurrency=8):
+    """
+    Delete every resource tracked by the registry concurrently.
+    Notes are deleted first by their owners, logged in once per owner with
+    service.authenticate, then the users' accounts. Failures, e.g. resources
+    the test already removed, are reported and do not stop the sweep.
+    :param registry: ResourceRegistry to drain
+    :param service_factory: callable returning a new NotesRest, with a
+    TokenStore to reuse stored tokens
+    :param concurrency: maximum number of requests in flight
+    :return: BulkReport of the deletions, already completed
+    """
+    notes, users = registry.drain()
+    services = {}
+    login_lock = Lock()
+
+    def owner_service(owner):
+        if owner is None:
+            raise LookupError("The note was created with an unknown token")
+        with login_lock:
+            service = services.get(owner)
+            if service is None:
+                service = service_factory()
+                try:
+                    service.authenticate(*owner)
+                except BaseException:
+                    service.close()
+                    raise
+                services[owner] = service
+        return service
+
+    def delete(resource):
+        kind, key = resource
+        if kind == "note":
+            return owner_service(notes[key]).delete_note_by_id(key)
+        with service_factory() as service:
+            service.post_users_login(key, users[key])
+            return service.delete_users_delete_account()
+
+    try:
+        report = BulkReport(
+            run_bulk(delete, [("note", note_id) for note_id in notes], concurrency)
+        ).wait()
+    finally:
+        for service in services.values():
+            service.close()
+    users_report = BulkReport(
+        run_bulk(delete, [("user", email) for email in users], concurrency)
+    ).wait()
+    report.results.extend(users_report.results)
+    if report.failed:
+        _log.warning(f"Sweep could not delete {len(report.failed)} resources")
+    return report
+
+
+def purge_notes(service, concurrency=8):
+    """
+    Delete every note of the logged in user, including leftovers of earlier
+    runs that no registry tracked
+    :param service: logged in NotesRest
+    :param concurrency: maximum number of requests in flight
+    :return: BulkReport of the deletions, already completed
+    """
+    note_ids = [note["id"] for note in service.get_notes()["data"]]
+    return service.delete_notes_many(note_ids, concurrency).wait()
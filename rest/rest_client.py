@@ -1,6 +1,17 @@
+from contextlib import contextmanager
+from json import loads
 from logging import getLogger
+from threading import local
+from time import perf_counter
+from urllib.parse import urlsplit
 
-import requests
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE
+
+from rest.lazy_response import BACKENDS, DEFAULT_BACKEND, LazyResponse
+from rest.metrics import GLOBAL_HOOKS, RequestContext
+from rest.recording import request_key
+from rest.retry import CircuitOpenError, RetryStats
+from rest.transport import TRANSPORTS, encode_request
 
 
 class RestClient:
@@ -11,8 +22,396 @@ class RestClient:
     BASE_URL: str
     _headers: dict = {}
 
-    def __init__(self):
+    def __init__(
+        self,
+        base_url=None,
+        pool_connections=DEFAULT_POOLSIZE,
+        pool_maxsize=DEFAULT_POOLSIZE,
+        pool_block=DEFAULT_POOLBLOCK,
+        keep_alive=True,
+        recorder=None,
+        replayer=None,
+        retry_policy=None,
+        circuit_breakers=None,
+        rate_limiter=None,
+        single_flight=None,
+        transport="requests",
+        hooks=None,
+        lazy=False,
+    ):
+        """
+        :param base_url: API address overriding the class BASE_URL
+        :param pool_connections: number of per-host connection pools to cache
+        :param pool_maxsize: maximum number of connections kept open per host
+        :param pool_block: wait for a free connection instead of opening
+        a throwaway one when all pooled connections are busy
+        :param keep_alive: reuse connections between requests
+        :param recorder: optional Recorder streaming every exchange to JSONL
+        :param replayer: optional Replayer serving recorded responses offline
+        :param retry_policy: optional RetryPolicy for transient failures
+        :param circuit_breakers: optional CircuitBreakerRegistry failing fast
+        while a host is down
+        :param rate_limiter: optional RateLimiter delaying requests to stay
+        under the allowed request rate
+        :param single_flight: optional SingleFlight coalescing concurrent
+        identical GET requests into one network call
+        :param transport: name of the HTTP transport in TRANSPORTS
+        ("requests", "urllib3", "http.client") built with the pool settings,
+        or a ready transport instance
+        :param hooks: optional list of RequestHook called before every request
+        and after its response, e.g. RequestMetrics
+        :param lazy: return LazyResponse objects decoding the body on first
+        access instead of decoded dictionaries; True picks the fastest JSON
+        backend installed, a name in lazy_response.BACKENDS picks that one.
+        Decoding then happens outside the request, so hooks see no decode time.
+        """
         self._log = getLogger(__name__)
+        if base_url is not None:
+            self.BASE_URL = base_url
+        if isinstance(transport, str):
+            transport = TRANSPORTS[transport](
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+                keep_alive=keep_alive,
+            )
+        self._transport = transport
+        self._recorder = recorder
+        self._replayer = replayer
+        self._retry_policy = retry_policy
+        self._circuit_breakers = circuit_breakers
+        self._retry_stats = RetryStats()
+        self._rate_limiter = rate_limiter
+        self._single_flight = single_flight
+        self._hooks = list(hooks or ())
+        self._context = local()
+        self._lazy_loads = None
+        if lazy:
+            self._lazy_loads = BACKENDS[DEFAULT_BACKEND if lazy is True else lazy]
+
+    @property
+    def connection_stats(self):
+        """
+        Counters of requests sent, new connections opened and connections reused
+        :return: dictionary with counters
+        """
+        return self._transport.stats.snapshot()
+
+    @property
+    def retry_stats(self):
+        """
+        Retry counters and the state of circuit breakers
+        :return: dictionary with counters
+        """
+        stats = self._retry_stats.snapshot()
+        if self._circuit_breakers is not None:
+            stats["circuit_breakers"] = self._circuit_breakers.snapshot()
+        return stats
+
+    def close(self):
+        """
+        Close all pooled connections
+        """
+        self._transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @contextmanager
+    def _observed_by(self, hook):
+        """
+        Call `hook` for the requests sent from this thread inside the block,
+        in addition to the client's hooks
+        """
+        previous = getattr(self._context, "hooks", ())
+        self._context.hooks = (*previous, hook)
+        try:
+            yield
+        finally:
+            self._context.hooks = previous
+
+    def _active_hooks(self):
+        """
+        :return: hooks observing a request sent now from the calling thread
+        """
+        hooks = self._hooks + GLOBAL_HOOKS if GLOBAL_HOOKS else self._hooks
+        call_hooks = getattr(self._context, "hooks", None)
+        if call_hooks:
+            hooks = [*hooks, *call_hooks]
+        return hooks
+
+    def _request(
+        self,
+        method,
+        path,
+        headers=None,
+        expected_status_code=200,
+        raw=False,
+        **kwargs,
+    ):
+        """
+        Send request to REST API over the pooled session
+        :param method: HTTP method
+        :param path: str path that will be added to base api address
+        :param headers: dictionary of HTTP Headers
+        :param expected_status_code: expected response code
+        :param raw: return the undecoded response body
+        :param kwargs: other params for request
+        :return: Response in JSON format, a LazyResponse for lazy clients
+        """
+        hooks = self._active_hooks()
+        if not hooks:
+            return self._call(
+                None, method, path, headers, expected_status_code, raw, **kwargs
+            )
+        context = RequestContext(method, path)
+        for hook in hooks:
+            hook.before_request(context)
+        self._context.current = context
+        try:
+            return self._call(
+                context, method, path, headers, expected_status_code, raw, **kwargs
+            )
+        except BaseException as error:
+            context.error = error
+            raise
+        finally:
+            self._context.current = None
+            context.elapsed = perf_counter() - context.started
+            for hook in hooks:
+                hook.after_response(context)
+
+    def _call(
+        self, context, method, path, headers, expected_status_code, raw, **kwargs
+    ):
+        """
+        Send the request, repeating it once after re-login, and decode the
+        response, filling in the context when hooks observe the request
+        """
+        status_code, content = self._send(method, path, headers, **kwargs)
+        if (
+            status_code == 401
+            and expected_status_code != 401
+            and self._reauthenticate()
+        ):
+            self._log.info(f"Repeating {method} request to {path} after re-login")
+            status_code, content = self._send(method, path, headers, **kwargs)
+        if context is not None:
+            context.status_code = status_code
+        assert status_code == expected_status_code
+        if raw:
+            return content
+        if self._lazy_loads is not None:
+            return LazyResponse(content, status_code, self._lazy_loads)
+        if context is None:
+            return loads(content)
+        started = perf_counter()
+        response = loads(content)
+        context.decode = perf_counter() - started
+        return response
+
+    def _send(self, method, path, headers=None, **kwargs):
+        """
+        Perform the HTTP exchange, or serve it from the replayer when replaying
+        :return: response status code and raw body
+        """
+        headers = headers or self._headers
+        payload = {key: kwargs.get(key) for key in ("params", "data", "json")}
+        if self._replayer is not None:
+            return self._replayer.lookup(method, path, headers, **payload)
+        if method == "GET" and self._single_flight is not None:
+            key = request_key(method, self.BASE_URL + path, headers, payload["params"])
+            return self._single_flight.do(
+                key, lambda: self._exchange(method, path, headers, payload, **kwargs)
+            )
+        return self._exchange(method, path, headers, payload, **kwargs)
+
+    def _exchange(self, method, path, headers, payload, **kwargs):
+        """
+        Perform the HTTP exchange and record it when recording
+        :return: response status code and raw body
+        """
+        started = perf_counter()
+        response = self._open(method, path, headers, **kwargs)
+        context = getattr(self._context, "current", None)
+        if context is not None:
+            context.bytes_received += len(response.content)
+        if self._recorder is not None:
+            self._recorder.record(
+                method,
+                path,
+                response.status_code,
+                response.content,
+                perf_counter() - started,
+                headers,
+                **payload,
+            )
+        return response.status_code, response.content
+
+    def _open(self, method, path, headers, **kwargs):
+        """
+        Send request over the transport, waiting for the rate limiter,
+        retrying transient failures according to the retry policy and failing
+        fast while the host's circuit breaker is open
+        :return: requests.Response or TransportResponse
+        """
+        url, headers, body = encode_request(
+            self.BASE_URL + path,
+            headers,
+            kwargs.pop("params", None),
+            kwargs.pop("data", None),
+            kwargs.pop("json", None),
+        )
+        context = getattr(self._context, "current", None)
+        stats = self._transport.stats
+        breaker = None
+        if self._circuit_breakers is not None:
+            breaker = self._circuit_breakers.for_host(urlsplit(url).netloc)
+        policy = self._retry_policy
+        attempt = 0
+        while True:
+            if breaker is not None:
+                try:
+                    breaker.before_request()
+                except CircuitOpenError:
+                    self._retry_stats.rejected()
+                    raise
+            if self._rate_limiter is not None:
+                try:
+                    self._rate_limiter.acquire(method, path)
+                except BaseException:
+                    if breaker is not None:
+                        breaker.cancel()
+                    raise
+            if context is not None:
+                context.bytes_sent += len(body or b"")
+                stats.reset_connect_time()
+                sent = perf_counter()
+            try:
+                response = self._transport.request(method, url, headers, body, **kwargs)
+                if context is not None:
+                    connect = stats.connect_time()
+                    context.connect += connect
+                    context.server_wait += perf_counter() - sent - connect
+            except self._transport.connection_errors as error:
+                if breaker is not None:
+                    breaker.record_failure()
+                if policy is None or not policy.should_retry(method, attempt):
+                    if policy is not None and policy.is_retryable(method):
+                        self._retry_stats.exhausted()
+                    raise
+                reason, delay = type(error).__name__, policy.backoff(attempt)
+            except BaseException:
+                # not a failure of the host, e.g. bad request options or an
+                # interrupt, only free a half-open trial for the next request
+                if breaker is not None:
+                    breaker.cancel()
+                raise
+            else:
+                if breaker is not None:
+                    if response.status_code >= 500:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                status_code = response.status_code
+                if policy is None or not policy.should_retry(
+                    method, attempt, status_code
+                ):
+                    if policy is not None and policy.is_retryable(method, status_code):
+                        self._retry_stats.exhausted()
+                    return response
+                reason = status_code
+                delay = policy.backoff(attempt, response.headers.get("Retry-After"))
+                response.close()
+            self._log.warning(f"Retrying {method} {url} after {reason} in {delay:.2f}s")
+            self._retry_stats.retried(reason)
+            policy.sleep(delay)
+            attempt += 1
+
+    def _stream(
+        self,
+        method,
+        path,
+        headers=None,
+        expected_status_code=200,
+        chunk_size=65536,
+        **kwargs,
+    ):
+        """
+        Send request to REST API and read the response body incrementally
+        :param method: HTTP method
+        :param path: str path that will be added to base api address
+        :param headers: dictionary of HTTP Headers
+        :param expected_status_code: expected response code
+        :param chunk_size: maximum number of bytes read at once
+        :param kwargs: other params for request
+        :return: generator of raw response body chunks
+        """
+        if (
+            self._replayer is not None
+            or self._recorder is not None
+            or (method == "GET" and self._single_flight is not None)
+        ):
+            # the whole body is needed to record, replay or share it
+            yield self._request(
+                method, path, headers, expected_status_code, raw=True, **kwargs
+            )
+            return
+        hooks = self._active_hooks()
+        context = None
+        if hooks:
+            context = RequestContext(method, path)
+            for hook in hooks:
+                hook.before_request(context)
+        try:
+            for attempt in range(2):
+                # the context is only current while sending, the caller may
+                # send other requests from this thread between chunks
+                self._context.current = context
+                try:
+                    response = self._open(
+                        method, path, headers or self._headers, stream=True, **kwargs
+                    )
+                finally:
+                    self._context.current = None
+                with response:
+                    if context is not None:
+                        context.status_code = response.status_code
+                    if (
+                        attempt == 0
+                        and response.status_code == 401
+                        and expected_status_code != 401
+                        and self._reauthenticate()
+                    ):
+                        continue
+                    assert response.status_code == expected_status_code
+                    for chunk in response.iter_content(chunk_size):
+                        if context is not None:
+                            context.bytes_received += len(chunk)
+                        yield chunk
+                    return
+        except GeneratorExit:
+            # the caller stopped reading, not a failed request
+            raise
+        except BaseException as error:
+            if context is not None:
+                context.error = error
+            raise
+        finally:
+            if context is not None:
+                context.elapsed = perf_counter() - context.started
+                for hook in hooks:
+                    hook.after_response(context)
+
+    def _reauthenticate(self):
+        """
+        Called when a request is unexpectedly rejected as unauthorized
+        :return: True if credentials were refreshed and the request should be repeated
+        """
+        return False
 
     def _get(self, path, params=None, headers=None, expected_status_code=200, **kwargs):
         """
@@ -24,12 +423,15 @@ class RestClient:
         :param kwargs: other params for GET request
         :return: Response in JSON format
         """
-        url = self.BASE_URL + path
-        headers = headers or self._headers
-        self._log.info(f"GET request to {url} with params: {params}")
-        response = requests.get(url, params, headers=headers, **kwargs)
-        assert response.status_code == expected_status_code
-        return response.json()
+        self._log.info(f"GET request to {self.BASE_URL + path} with params: {params}")
+        return self._request(
+            "GET",
+            path,
+            params=params,
+            headers=headers,
+            expected_status_code=expected_status_code,
+            **kwargs,
+        )
 
     def _post(
         self,
@@ -50,12 +452,18 @@ class RestClient:
         :param kwargs: other params for POST request
         :return: Response in JSON format
         """
-        url = self.BASE_URL + path
-        headers = headers or self._headers
-        self._log.info(f"POST request to {url} with data: {data} and json: {json}")
-        response = requests.post(url, data, json, headers=headers, **kwargs)
-        assert response.status_code == expected_status_code
-        return response.json()
+        self._log.info(
+            f"POST request to {self.BASE_URL + path} with data: {data} and json: {json}"
+        )
+        return self._request(
+            "POST",
+            path,
+            data=data,
+            json=json,
+            headers=headers,
+            expected_status_code=expected_status_code,
+            **kwargs,
+        )
 
     def _put(
         self,
@@ -76,12 +484,18 @@ class RestClient:
         :param kwargs: other params for PUT request
         :return: Response in JSON format
         """
-        url = self.BASE_URL + path
-        headers = headers or self._headers
-        self._log.info(f"PUT request to {url} with data: {data} and json: {json}")
-        response = requests.put(url, data, json=json, headers=headers, **kwargs)
-        assert response.status_code == expected_status_code
-        return response.json()
+        self._log.info(
+            f"PUT request to {self.BASE_URL + path} with data: {data} and json: {json}"
+        )
+        return self._request(
+            "PUT",
+            path,
+            data=data,
+            json=json,
+            headers=headers,
+            expected_status_code=expected_status_code,
+            **kwargs,
+        )
 
     def _patch(
         self,
@@ -102,12 +516,18 @@ class RestClient:
         :param kwargs: other params for PATCH request
         :return: Response in JSON format
         """
-        url = self.BASE_URL + path
-        headers = headers or self._headers
-        self._log.info(f"PATCH request to {url} with data: {data} and json: {json}")
-        response = requests.patch(url, data, json=json, headers=headers, **kwargs)
-        assert response.status_code == expected_status_code
-        return response.json()
+        self._log.info(
+            f"PATCH request to {self.BASE_URL + path} with data: {data} and json: {json}"
+        )
+        return self._request(
+            "PATCH",
+            path,
+            data=data,
+            json=json,
+            headers=headers,
+            expected_status_code=expected_status_code,
+            **kwargs,
+        )
 
     def _delete(self, path, headers=None, expected_status_code=200, **kwargs):
         """
@@ -118,9 +538,11 @@ class RestClient:
         :param kwargs: other params for DELETE request
         :return: Response in JSON format
         """
-        url = self.BASE_URL + path
-        headers = headers or self._headers
-        self._log.info(f"DELETE request to {url}")
-        response = requests.delete(url, headers=headers, **kwargs)
-        assert response.status_code == expected_status_code
-        return response.json()
+        self._log.info(f"DELETE request to {self.BASE_URL + path}")
+        return self._request(
+            "DELETE",
+            path,
+            headers=headers,
+            expected_status_code=expected_status_code,
+            **kwargs,
+        )
@@ -0,0 +1,255 @@
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import monotonic, sleep
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of sending a request while the host's circuit breaker is open
+    """
+
+
+def parse_retry_after(value):
+    """
+    :param value: Retry-After header, delay in seconds or an HTTP date
+    :return: seconds to wait or None
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((moment - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RetryPolicy:
+    """
+    Which failures are retried and how long to wait between attempts
+    """
+
+    def __init__(
+        self,
+        total=3,
+        backoff_factor=0.1,
+        max_backoff=10.0,
+        jitter=True,
+        statuses=RETRY_STATUSES,
+        methods=IDEMPOTENT_METHODS,
+        respect_retry_after=True,
+        sleep=sleep,
+    ):
+        """
+        :param total: maximum number of retries after the first attempt
+        :param backoff_factor: base delay, attempt n waits up to factor * 2 ** n
+        :param max_backoff: upper bound of a single delay in seconds
+        :param jitter: randomize delays (full jitter) to spread retries of many clients
+        :param statuses: response codes worth retrying
+        :param methods: HTTP methods safe to repeat; POST and PATCH are not
+        retried by default as they are not idempotent
+        :param respect_retry_after: wait as long as the Retry-After header asks
+        :param sleep: function used to wait
+        """
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(method.upper() for method in methods)
+        self.respect_retry_after = respect_retry_after
+        self.sleep = sleep
+
+    def is_retryable(self, method, status_code=None):
+        """
+        :param method: HTTP method
+        :param status_code: response code, None for a connection error
+        :return: True if the failure is worth repeating the request
+        """
+        if method.upper() not in self.methods:
+            return False
+        return status_code is None or status_code in self.statuses
+
+    def should_retry(self, method, attempt, status_code=None):
+        """
+        :param method: HTTP method
+        :param attempt: number of retries already made
+        :param status_code: response code, None for a connection error
+        :return: True if the request should be repeated
+        """
+        return attempt < self.total and self.is_retryable(method, status_code)
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        :param attempt: number of retries already made
+        :param retry_after: Retry-After header value
+        :return: seconds to wait before the next attempt
+        """
+        if self.respect_retry_after:
+            delay = parse_retry_after(retry_after)
+            if delay is not None:
+                return min(delay, self.max_backoff)
+        delay = min(self.backoff_factor * 2**attempt, self.max_backoff)
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+class CircuitBreaker:
+    """
+    Fails fast after consecutive failures of a host.
+    closed: requests flow; open: requests are rejected until reset_timeout
+    passes; half-open: a single trial request decides whether to close again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=monotonic):
+        """
+        :param failure_threshold: consecutive failures that open the circuit
+        :param reset_timeout: seconds the circuit stays open before a trial request
+        :param clock: monotonic time source
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            if (
+                self._state == self.OPEN
+                and self._clock() - self._opened_at >= self.reset_timeout
+            ):
+                return self.HALF_OPEN
+            return self._state
+
+    def before_request(self):
+        """
+        :raise CircuitOpenError: when the request must not be sent
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            if self._clock() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self.rejected += 1
+        raise CircuitOpenError("Circuit breaker is open, the host looks unavailable")
+
+    def cancel(self):
+        """
+        Give up a request let through by before_request without an outcome,
+        freeing the half-open trial for the next request
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if (
+                self._state == self.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+    def snapshot(self):
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class CircuitBreakerRegistry:
+    """
+    One CircuitBreaker per host, can be shared by many clients
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=monotonic):
+        self._settings = {
+            "failure_threshold": failure_threshold,
+            "reset_timeout": reset_timeout,
+            "clock": clock,
+        }
+        self._lock = Lock()
+        self._breakers = {}
+
+    def for_host(self, host):
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(**self._settings)
+            return breaker
+
+    def snapshot(self):
+        """
+        :return: dictionary host -> breaker state and counters
+        """
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {host: breaker.snapshot() for host, breaker in breakers.items()}
+
+
+class RetryStats:
+    """
+    Thread-safe counters of retries made by a client
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.retries = 0
+        self.by_reason = {}
+        self.gave_up = 0
+        self.rejected_by_breaker = 0
+
+    def retried(self, reason):
+        with self._lock:
+            self.retries += 1
+            self.by_reason[reason] = self.by_reason.get(reason, 0) + 1
+
+    def exhausted(self):
+        with self._lock:
+            self.gave_up += 1
+
+    def rejected(self):
+        with self._lock:
+            self.rejected_by_breaker += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "retries": self.retries,
+                "by_reason": dict(self.by_reason),
+                "gave_up": self.gave_up,
+                "rejected_by_breaker": self.rejected_by_breaker,
+            }
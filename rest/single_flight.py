@@ -0,0 +1,120 @@
+import asyncio
+from threading import Event, Lock
+
+
+_CANCELLED = object()
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution whose
+    result, or exception, is shared by every caller waiting for it
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls = {}
+        self.executed = 0
+        self.collapsed = 0
+
+    def do(self, key, function):
+        """
+        :param key: hashable identity of the call
+        :param function: callable executed when no identical call is in flight
+        :return: result of the in-flight or the new call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+            else:
+                self.collapsed += 1
+                leader = False
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    @property
+    def stats(self):
+        """
+        :return: dictionary with the number of executed and collapsed calls
+        """
+        with self._lock:
+            return {"executed": self.executed, "collapsed": self.collapsed}
+
+
+class AsyncSingleFlight:
+    """
+    asyncio variant of SingleFlight for one event loop.
+    When the coroutine running the call is cancelled, one of the waiting
+    callers runs the call again instead of every waiter being cancelled.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.executed = 0
+        self.collapsed = 0
+
+    async def do(self, key, function):
+        """
+        :param key: hashable identity of the call
+        :param function: coroutine function executed when no identical call is in flight
+        :return: result of the in-flight or the new call
+        """
+        waited = False
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            if not waited:
+                self.collapsed += 1
+                waited = True
+            result = await asyncio.shield(future)
+            if result is not _CANCELLED:
+                return result
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        self.executed += 1
+        try:
+            result = await function()
+        except asyncio.CancelledError:
+            future.set_result(_CANCELLED)
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    @property
+    def stats(self):
+        """
+        :return: dictionary with the number of executed and collapsed calls
+        """
+        return {"executed": self.executed, "collapsed": self.collapsed}
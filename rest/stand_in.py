@@ -0,0 +1,530 @@
+"""
+In-memory stand-in for the Notes API.
+
+Implements every endpoint used by NotesRest with the same status codes and
+messages, so the client and the test suite can run against a local process:
+
+    python -m rest.stand_in --port 8000 --user test_rest_api:me@example.com:secret1
+"""
+
+import argparse
+import json
+import re
+import secrets
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from urllib.parse import parse_qsl, urlsplit
+
+API_PREFIX = "/notes/api/"
+CATEGORIES = ("Home", "Work", "Personal")
+NOTE_ID_PATTERN = re.compile(r"^[0-9a-f]{24}$")
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+NO_TOKEN = "No authentication token specified in x-auth-token header"
+INVALID_TOKEN = "Access token is not valid or has expired, you will need to login"
+NOTE_NOT_FOUND = "No note was found with the provided ID, Maybe it was deleted"
+INVALID_RESET_TOKEN = "The provided password reset token is invalid or has expired"
+
+
+class ApiError(Exception):
+    """
+    Error response of the stand-in API
+    """
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+def _timestamp():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")[:-6] + "Z"
+
+
+def _check_length(value, minimum, maximum, message):
+    if not isinstance(value, str) or not minimum <= len(value) <= maximum:
+        raise ApiError(400, message)
+
+
+def _check_email(email):
+    if not isinstance(email, str) or not EMAIL_PATTERN.match(email):
+        raise ApiError(400, "A valid email address is required")
+
+
+def _check_completed(completed):
+    if isinstance(completed, str) and completed in ("true", "false"):
+        return completed == "true"
+    if not isinstance(completed, bool):
+        raise ApiError(400, "Note completed status must be boolean")
+    return completed
+
+
+class NotesApiState:
+    """
+    Thread-safe in-memory storage of users, sessions and notes
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.users = {}
+        self.tokens = {}
+        self.reset_tokens = {}
+        self.notes = {}
+        self._faults = deque()
+
+    def fail_next(
+        self, count=1, status=503, message="Service Unavailable", retry_after=None
+    ):
+        """
+        Answer the next `count` requests with an error, e.g. to exercise retries
+        :param count: number of requests to fail
+        :param status: response code of the failures
+        :param message: response message of the failures
+        :param retry_after: optional Retry-After header value
+        """
+        headers = {} if retry_after is None else {"Retry-After": str(retry_after)}
+        with self._lock:
+            self._faults.extend([ApiError(status, message, headers)] * count)
+
+    def next_fault(self):
+        """
+        :return: ApiError to answer the current request with, or None
+        """
+        if not self._faults:
+            return None
+        with self._lock:
+            return self._faults.popleft() if self._faults else None
+
+    def add_user(self, name, email, password):
+        """
+        Register a user directly in the storage
+        :return: user's public profile
+        """
+        with self._lock:
+            return self._register(name, email, password)
+
+    def _register(self, name, email, password):
+        if email in self.users:
+            raise ApiError(409, "An account already exists with the same email address")
+        user = {
+            "id": secrets.token_hex(12),
+            "name": name,
+            "email": email,
+            "password": password,
+        }
+        self.users[email] = user
+        return self._profile(user)
+
+    @staticmethod
+    def _profile(user):
+        profile = {"id": user["id"], "name": user["name"], "email": user["email"]}
+        for field in ("phone", "company"):
+            if field in user:
+                profile[field] = user[field]
+        return profile
+
+    def _authenticate(self, token):
+        if not token:
+            raise ApiError(401, NO_TOKEN)
+        email = self.tokens.get(token)
+        if email is None:
+            raise ApiError(401, INVALID_TOKEN)
+        return self.users[email]
+
+    def _note(self, user, note_id):
+        if not isinstance(note_id, str) or not NOTE_ID_PATTERN.match(note_id):
+            raise ApiError(400, "Note ID must be a valid ID")
+        note = self.notes.get(note_id)
+        if note is None or note["user_id"] != user["id"]:
+            raise ApiError(404, NOTE_NOT_FOUND)
+        return note
+
+    @staticmethod
+    def _check_note(title, description, category):
+        _check_length(title, 4, 100, "Title must be between 4 and 100 characters")
+        _check_length(
+            description, 4, 1000, "Description must be between 4 and 1000 characters"
+        )
+        if category not in CATEGORIES:
+            raise ApiError(
+                400, "Category must be one of the categories: Home, Work, Personal"
+            )
+
+    def health_check(self, token, body):
+        return 200, "Notes API is Running", None
+
+    def register(self, token, body):
+        name, email, password = (
+            body.get("name"),
+            body.get("email"),
+            body.get("password"),
+        )
+        _check_length(name, 4, 30, "User name must be between 4 and 30 characters")
+        _check_email(email)
+        _check_length(password, 6, 30, "Password must be between 6 and 30 characters")
+        with self._lock:
+            profile = self._register(name, email, password)
+        return 201, "User account created successfully", profile
+
+    def login(self, token, body):
+        email, password = body.get("email"), body.get("password")
+        _check_email(email)
+        _check_length(password, 6, 30, "Password must be between 6 and 30 characters")
+        with self._lock:
+            user = self.users.get(email)
+            if user is None or user["password"] != password:
+                raise ApiError(401, "Incorrect email address or password")
+            new_token = secrets.token_hex(32)
+            self.tokens[new_token] = email
+            data = dict(self._profile(user), token=new_token)
+        return 200, "Login successful", data
+
+    def get_profile(self, token, body):
+        with self._lock:
+            user = self._authenticate(token)
+            return 200, "Profile successful", self._profile(user)
+
+    def patch_profile(self, token, body):
+        with self._lock:
+            user = self._authenticate(token)
+        if "name" in body:
+            _check_length(
+                body["name"], 4, 30, "User name must be between 4 and 30 characters"
+            )
+        if "phone" in body:
+            _check_length(
+                body["phone"], 8, 20, "Phone number must be between 8 and 20 digits"
+            )
+        if "company" in body:
+            _check_length(
+                body["company"],
+                4,
+                30,
+                "Company name must be between 4 and 30 characters",
+            )
+        with self._lock:
+            for field in ("name", "phone", "company"):
+                if field in body:
+                    user[field] = body[field]
+            return 200, "Profile updated successful", self._profile(user)
+
+    def forgot_password(self, token, body):
+        email = body.get("email")
+        _check_email(email)
+        with self._lock:
+            if email not in self.users:
+                raise ApiError(401, "No account found with the given email address")
+            self.reset_tokens[secrets.token_hex(32)] = email
+        return (
+            200,
+            f"Password reset link successfully sent to {email}. "
+            f"Please verify by clicking on the given link",
+            None,
+        )
+
+    def verify_reset_token(self, token, body):
+        with self._lock:
+            if body.get("token") not in self.reset_tokens:
+                raise ApiError(401, INVALID_RESET_TOKEN)
+        return 200, "The provided password reset token is valid", None
+
+    def reset_password(self, token, body):
+        reset_token, new_password = body.get("token"), body.get("newPassword")
+        _check_length(reset_token, 64, 64, "Token must be between 64 characters")
+        _check_length(
+            new_password, 6, 30, "Password must be between 6 and 30 characters"
+        )
+        with self._lock:
+            email = self.reset_tokens.pop(reset_token, None)
+            if email is None or email not in self.users:
+                raise ApiError(401, INVALID_RESET_TOKEN)
+            self.users[email]["password"] = new_password
+        return 200, "The password has been reset successfully", None
+
+    def change_password(self, token, body):
+        with self._lock:
+            user = self._authenticate(token)
+        current, new = body.get("currentPassword"), body.get("newPassword")
+        _check_length(
+            current, 6, 30, "Current password must be between 6 and 30 characters"
+        )
+        _check_length(new, 6, 30, "New password must be between 6 and 30 characters")
+        if current == new:
+            raise ApiError(
+                400, "The new password should be different from the current password"
+            )
+        with self._lock:
+            if user["password"] != current:
+                raise ApiError(400, "The current password is incorrect")
+            user["password"] = new
+        return 200, "The password was successfully updated", None
+
+    def logout(self, token, body):
+        with self._lock:
+            self._authenticate(token)
+            del self.tokens[token]
+        return 200, "User has been successfully logged out", None
+
+    def delete_account(self, token, body):
+        with self._lock:
+            user = self._authenticate(token)
+            del self.users[user["email"]]
+            self.tokens = {
+                key: email
+                for key, email in self.tokens.items()
+                if email != user["email"]
+            }
+            self.notes = {
+                key: note
+                for key, note in self.notes.items()
+                if note["user_id"] != user["id"]
+            }
+        return 200, "Account successfully deleted", None
+
+    def create_note(self, token, body):
+        with self._lock:
+            user = self._authenticate(token)
+        title, description = body.get("title"), body.get("description")
+        category = body.get("category")
+        self._check_note(title, description, category)
+        now = _timestamp()
+        note = {
+            "id": secrets.token_hex(12),
+            "title": title,
+            "description": description,
+            "completed": False,
+            "created_at": now,
+            "updated_at": now,
+            "category": category,
+            "user_id": user["id"],
+        }
+        with self._lock:
+            self.notes[note["id"]] = note
+            return 200, "Note successfully created", dict(note)
+
+    def get_notes(self, token, body):
+        with self._lock:
+            user = self._authenticate(token)
+            notes = [
+                dict(note)
+                for note in self.notes.values()
+                if note["user_id"] == user["id"]
+            ]
+        notes.sort(key=lambda note: note["updated_at"], reverse=True)
+        return 200, "Notes successfully retrieved", notes
+
+    def get_note(self, token, body, note_id):
+        with self._lock:
+            user = self._authenticate(token)
+            return 200, "Note successfully retrieved", dict(self._note(user, note_id))
+
+    def put_note(self, token, body, note_id):
+        with self._lock:
+            user = self._authenticate(token)
+            self._note(user, note_id)
+        title, description = body.get("title"), body.get("description")
+        category = body.get("category")
+        self._check_note(title, description, category)
+        completed = _check_completed(body.get("completed"))
+        with self._lock:
+            note = self._note(user, note_id)
+            note.update(
+                title=title,
+                description=description,
+                category=category,
+                completed=completed,
+                updated_at=_timestamp(),
+            )
+            return 200, "Note successfully Updated", dict(note)
+
+    def patch_note(self, token, body, note_id):
+        with self._lock:
+            user = self._authenticate(token)
+            self._note(user, note_id)
+        completed = _check_completed(body.get("completed"))
+        with self._lock:
+            note = self._note(user, note_id)
+            note.update(completed=completed, updated_at=_timestamp())
+            return 200, "Note successfully Updated", dict(note)
+
+    def delete_note(self, token, body, note_id):
+        with self._lock:
+            user = self._authenticate(token)
+            del self.notes[self._note(user, note_id)["id"]]
+        return 200, "Note successfully deleted", None
+
+
+ROUTES = {
+    ("GET", "health-check"): NotesApiState.health_check,
+    ("POST", "users/register"): NotesApiState.register,
+    ("POST", "users/login"): NotesApiState.login,
+    ("GET", "users/profile"): NotesApiState.get_profile,
+    ("PATCH", "users/profile"): NotesApiState.patch_profile,
+    ("POST", "users/forgot-password"): NotesApiState.forgot_password,
+    ("POST", "users/verify-reset-password-token"): NotesApiState.verify_reset_token,
+    ("POST", "users/reset-password"): NotesApiState.reset_password,
+    ("POST", "users/change-password"): NotesApiState.change_password,
+    ("DELETE", "users/logout"): NotesApiState.logout,
+    ("DELETE", "users/delete-account"): NotesApiState.delete_account,
+    ("POST", "notes"): NotesApiState.create_note,
+    ("GET", "notes"): NotesApiState.get_notes,
+}
+
+NOTE_ROUTES = {
+    "GET": NotesApiState.get_note,
+    "PUT": NotesApiState.put_note,
+    "PATCH": NotesApiState.patch_note,
+    "DELETE": NotesApiState.delete_note,
+}
+
+
+class NotesApiHandler(BaseHTTPRequestHandler):
+    """
+    Keep-alive HTTP handler dispatching requests to NotesApiState
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "NotesApiServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if not raw:
+            return {}
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            body = json.loads(raw)
+            return body if isinstance(body, dict) else {}
+        return dict(parse_qsl(raw.decode(), keep_blank_values=True))
+
+    def _dispatch(self):
+        path = urlsplit(self.path).path
+        body = self._read_body()
+        fault = self.server.state.next_fault()
+        if fault is not None:
+            raise fault
+        if not path.startswith(API_PREFIX):
+            raise ApiError(404, "Not Found")
+        route = path[len(API_PREFIX) :].strip("/")
+        token = self.headers.get("x-auth-token")
+        handler = ROUTES.get((self.command, route))
+        if handler is not None:
+            return handler(self.server.state, token, body)
+        if route.startswith("notes/") and self.command in NOTE_ROUTES:
+            note_id = route[len("notes/") :]
+            return NOTE_ROUTES[self.command](self.server.state, token, body, note_id)
+        raise ApiError(404, "Not Found")
+
+    def _handle(self):
+        headers = {}
+        try:
+            status, message, data = self._dispatch()
+            payload = {"success": True, "status": status, "message": message}
+            if data is not None:
+                payload["data"] = data
+        except ApiError as error:
+            status, headers = error.status, error.headers
+            payload = {"success": False, "status": status, "message": error.message}
+        except ValueError:
+            status = 400
+            payload = {"success": False, "status": status, "message": "Bad Request"}
+        content = json.dumps(payload, separators=(",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if self.close_connection:
+            # the client asked to close, tell it so it does not reuse the socket
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+
+class NotesApiServer(ThreadingHTTPServer):
+    """
+    Threaded Notes API stand-in server.
+    Use as a context manager to serve from a background thread.
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, host="127.0.0.1", port=0, state=None):
+        """
+        :param host: interface to bind
+        :param port: port to bind, 0 picks a free one
+        :param state: NotesApiState to serve, a new empty one by default
+        """
+        super().__init__((host, port), NotesApiHandler)
+        self.state = state or NotesApiState()
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        Base API address to be used as NotesRest base_url
+        """
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self):
+        """
+        Serve requests from a background thread
+        :return: the server itself
+        """
+        self._thread = Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop serving and release the socket
+        """
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Notes API stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--user",
+        action="append",
+        default=[],
+        metavar="NAME:EMAIL:PASSWORD",
+        help="register a user on startup, may be repeated",
+    )
+    args = parser.parse_args(argv)
+    server = NotesApiServer(args.host, args.port)
+    for user in args.user:
+        server.state.add_user(*user.split(":", 2))
+    print(f"Serving Notes API stand-in on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import os
+import sqlite3
+from datetime import datetime, timezone
+from logging import getLogger
+from threading import Lock
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    title TEXT,
+    description TEXT,
+    category TEXT,
+    completed INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (user_id, id)
+);
+CREATE INDEX IF NOT EXISTS notes_user_category ON notes (user_id, category);
+CREATE TABLE IF NOT EXISTS sync_state (
+    user_id TEXT PRIMARY KEY,
+    synced_at TEXT NOT NULL,
+    note_count INTEGER NOT NULL
+);
+"""
+
+COLUMNS = (
+    "id",
+    "title",
+    "description",
+    "category",
+    "completed",
+    "created_at",
+    "updated_at",
+)
+
+
+class SyncResult:
+    """
+    Changes written to the mirror by one sync
+    """
+
+    __slots__ = ("added", "updated", "deleted", "unchanged")
+
+    def __init__(self, added=0, updated=0, deleted=0, unchanged=0):
+        self.added = added
+        self.updated = updated
+        self.deleted = deleted
+        self.unchanged = unchanged
+
+    @property
+    def changed(self):
+        return self.added + self.updated + self.deleted
+
+    def __repr__(self):
+        return (
+            f"SyncResult(added={self.added}, updated={self.updated}, "
+            f"deleted={self.deleted}, unchanged={self.unchanged})"
+        )
+
+
+class NotesMirror:
+    """
+    Local SQLite mirror of a user's notes.
+    sync() downloads the notes and writes only the ones that were added,
+    changed (by updated_at) or removed since the last sync; the query methods
+    read the mirror without any network calls and are only blocked while a
+    sync writes, not while it downloads.
+    """
+
+    def __init__(self, service, path=":memory:", user_id=None):
+        """
+        :param service: authenticated NotesRest
+        :param path: SQLite database file, in memory by default
+        :param user_id: id of the mirrored user, looked up from the profile
+        on the first sync when omitted
+        """
+        self._log = getLogger(__name__)
+        self.service = service
+        self.user_id = user_id
+        self._lock = Lock()
+        self._connection = sqlite3.connect(
+            os.fspath(path), check_same_thread=False, isolation_level=None
+        )
+        self._connection.row_factory = sqlite3.Row
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def sync(self):
+        """
+        Bring the mirror up to date with the server
+        :return: SyncResult
+        """
+        if self.user_id is None:
+            self.user_id = self.service.get_users_profile()["data"]["id"]
+        rows = [
+            (self.user_id, *self._values(note)) for note in self.service.iter_notes()
+        ]
+        result = SyncResult()
+        with self._lock:
+            snapshot = dict(
+                self._connection.execute(
+                    "SELECT id, updated_at FROM notes WHERE user_id = ?",
+                    (self.user_id,),
+                )
+            )
+            self._connection.execute("BEGIN")
+            try:
+                for row in rows:
+                    note_id, updated_at = row[1], row[7]
+                    known = snapshot.pop(note_id, False)
+                    if known is False:
+                        self._connection.execute(
+                            "INSERT INTO notes (user_id, id, title, description, "
+                            "category, completed, created_at, updated_at) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            row,
+                        )
+                        result.added += 1
+                    elif known != updated_at:
+                        self._connection.execute(
+                            "UPDATE notes SET title = ?, description = ?, "
+                            "category = ?, completed = ?, created_at = ?, "
+                            "updated_at = ? WHERE user_id = ? AND id = ?",
+                            (*row[2:], self.user_id, note_id),
+                        )
+                        result.updated += 1
+                    else:
+                        result.unchanged += 1
+                self._connection.executemany(
+                    "DELETE FROM notes WHERE user_id = ? AND id = ?",
+                    ((self.user_id, note_id) for note_id in snapshot),
+                )
+                result.deleted = len(snapshot)
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+                    (
+                        self.user_id,
+                        datetime.now(timezone.utc).isoformat(),
+                        result.added + result.updated + result.unchanged,
+                    ),
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        self._log.info(f"Synced notes of user {self.user_id}: {result}")
+        return result
+
+    @staticmethod
+    def _values(note):
+        values = [note.get(column) for column in COLUMNS]
+        values[4] = int(bool(values[4]))
+        return values
+
+    @staticmethod
+    def _note(row):
+        note = dict(row)
+        del note["user_id"]
+        note["completed"] = bool(note["completed"])
+        return note
+
+    def notes(self, category=None, completed=None):
+        """
+        Query mirrored notes
+        :param category: only notes of this category
+        :param completed: only completed (True) or not completed (False) notes
+        :return: list of note dictionaries, most recently updated first
+        """
+        query = "SELECT * FROM notes WHERE user_id = ?"
+        params = [self.user_id]
+        if category is not None:
+            query += " AND category = ?"
+            params.append(category)
+        if completed is not None:
+            query += " AND completed = ?"
+            params.append(int(completed))
+        query += " ORDER BY updated_at DESC"
+        with self._lock:
+            return [self._note(row) for row in self._connection.execute(query, params)]
+
+    def get(self, note_id):
+        """
+        :return: mirrored note dictionary or None
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT * FROM notes WHERE user_id = ? AND id = ?",
+                (self.user_id, note_id),
+            ).fetchone()
+        return None if row is None else self._note(row)
+
+    def count(self):
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM notes WHERE user_id = ?", (self.user_id,)
+            ).fetchone()[0]
+
+    @property
+    def synced_at(self):
+        """
+        Time of the last successful sync in ISO format or None
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT synced_at FROM sync_state WHERE user_id = ?", (self.user_id,)
+            ).fetchone()
+        return None if row is None else row[0]
@@ -0,0 +1,83 @@
+import json
+import os
+from logging import getLogger
+
+from rest.file_lock import FileLock
+
+
+class TokenStore:
+    """
+    Login tokens shared by threads and processes through a locked JSON file.
+    Every credential is logged in once and its token is reused until invalidated.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: path of the JSON file with stored tokens
+        """
+        self._log = getLogger(__name__)
+        self.path = os.fspath(path)
+        self._lock_path = self.path + ".lock"
+
+    @staticmethod
+    def _key(service, email):
+        return f"{service.BASE_URL}|{email}"
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write(self, tokens):
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(tokens, file)
+        os.replace(temporary_path, self.path)
+
+    def get(self, service, email):
+        """
+        :param service: NotesRest the token is used with
+        :param email: user's email
+        :return: stored token or None
+        """
+        with FileLock(self._lock_path):
+            return self._read().get(self._key(service, email))
+
+    def login(self, service, email, password):
+        """
+        Authenticate the service with a stored token, logging in only
+        when no token is stored for the credential yet
+        :param service: NotesRest to authenticate
+        :param email: registered user's email
+        :param password: registered user's password
+        :return: auth token
+        """
+        key = self._key(service, email)
+        with FileLock(self._lock_path):
+            tokens = self._read()
+            token = tokens.get(key)
+            if token is None:
+                token = service.post_users_login(email, password)["data"]["token"]
+                tokens[key] = token
+                self._write(tokens)
+            else:
+                self._log.info(f"Reusing stored token for {email}")
+        service._token = token
+        return token
+
+    def invalidate(self, service, email, token=None):
+        """
+        Forget the stored token of a credential
+        :param service: NotesRest the token was used with
+        :param email: user's email
+        :param token: forget only if this is still the stored token, so a
+        token refreshed meanwhile by another worker is kept
+        """
+        key = self._key(service, email)
+        with FileLock(self._lock_path):
+            tokens = self._read()
+            if key in tokens and token in (None, tokens[key]):
+                del tokens[key]
+                self._write(tokens)
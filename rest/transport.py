@@ -0,0 +1,436 @@
+import http.client
+from json import dumps
+from threading import Lock, local
+from time import perf_counter
+from urllib.parse import urlencode, urlsplit
+
+import requests
+import urllib3
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE, HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from rest.retry import IDEMPOTENT_METHODS
+
+
+class ConnectionStats:
+    """
+    Thread-safe counters of requests sent and TCP connections opened
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._local = local()
+        self.requests = 0
+        self.new_connections = 0
+
+    def request_sent(self):
+        with self._lock:
+            self.requests += 1
+
+    def connection_opened(self, seconds=0.0):
+        """
+        :param seconds: time spent connecting, added to the calling thread's
+        connect time
+        """
+        with self._lock:
+            self.new_connections += 1
+        self._local.connect_time = self.connect_time() + seconds
+
+    def connect_time(self):
+        """
+        :return: seconds the calling thread spent connecting since reset_connect_time
+        """
+        return getattr(self._local, "connect_time", 0.0)
+
+    def reset_connect_time(self):
+        self._local.connect_time = 0.0
+
+    @property
+    def reused_connections(self):
+        """
+        Number of requests that were served over an already open connection
+        """
+        return max(self.requests - self.new_connections, 0)
+
+    def snapshot(self):
+        """
+        :return: dictionary with current counters
+        """
+        with self._lock:
+            requests_sent, new_connections = self.requests, self.new_connections
+        return {
+            "requests": requests_sent,
+            "new_connections": new_connections,
+            "reused_connections": max(requests_sent - new_connections, 0),
+        }
+
+
+def _counting_pool_class(base, stats):
+    class CountingConnection(base.ConnectionCls):
+        def connect(self):
+            started = perf_counter()
+            try:
+                return super().connect()
+            finally:
+                stats.connection_opened(perf_counter() - started)
+
+    class CountingConnectionPool(base):
+        ConnectionCls = CountingConnection
+
+    return CountingConnectionPool
+
+
+def _counting_pool_classes(stats):
+    return {
+        "http": _counting_pool_class(HTTPConnectionPool, stats),
+        "https": _counting_pool_class(HTTPSConnectionPool, stats),
+    }
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that counts new connections against reused keep-alive ones
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.stats = ConnectionStats()
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _counting_pool_classes(self.stats)
+
+    def send(self, request, *args, **kwargs):
+        self.stats.request_sent()
+        return super().send(request, *args, **kwargs)
+
+
+def _form_items(values):
+    return [(key, value) for key, value in values.items() if value is not None]
+
+
+def encode_request(url, headers=None, params=None, data=None, json=None):
+    """
+    Encode query params and the body the way requests does, so every
+    transport sends the same bytes
+    :param url: absolute request URL
+    :param headers: dictionary of HTTP Headers, None values are dropped
+    :param params: query params
+    :param data: form data dictionary, or an already encoded body
+    :param json: json data, used when there is no form data
+    :return: url with the query string, headers, body bytes or None
+    """
+    headers = {
+        key: value for key, value in (headers or {}).items() if value is not None
+    }
+    if params:
+        query = urlencode(_form_items(params), doseq=True)
+        if query:
+            url += ("&" if urlsplit(url).query else "?") + query
+    body = None
+    if data:
+        if isinstance(data, dict):
+            body = urlencode(_form_items(data), doseq=True).encode()
+            headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+        else:
+            body = data.encode() if isinstance(data, str) else data
+    elif json is not None:
+        body = dumps(json, allow_nan=False).encode()
+        headers.setdefault("Content-Type", "application/json")
+    return url, headers, body
+
+
+class TransportResponse:
+    """
+    Response of the urllib3 and http.client transports, exposing the part
+    of the requests.Response interface RestClient uses
+    """
+
+    def __init__(self, status_code, headers, content=None, read=None, release=None):
+        """
+        :param status_code: HTTP status code
+        :param headers: case-insensitive mapping of response headers
+        :param content: whole body when it was read eagerly
+        :param read: callable reading at most n bytes of a streamed body
+        :param release: callable returning the connection after the body is consumed
+        """
+        self.status_code = status_code
+        self.headers = headers
+        self._content = content
+        self._read = read
+        self._release = release
+
+    @property
+    def content(self):
+        if self._content is None:
+            self._content = b"".join(self.iter_content(65536))
+        return self._content
+
+    def iter_content(self, chunk_size=65536):
+        if self._content is not None:
+            yield self._content
+            return
+        while chunk := self._read(chunk_size):
+            yield chunk
+
+    def close(self):
+        if self._release is not None:
+            self._release()
+            self._release = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _reject_options(transport, options):
+    if options:
+        raise TypeError(
+            f"{type(transport).__name__} does not support the request options "
+            f"{', '.join(sorted(options))}, use the requests transport for them"
+        )
+
+
+class RequestsTransport:
+    """
+    Transport over a requests.Session with a counting connection pool
+    """
+
+    connection_errors = (requests.ConnectionError, requests.Timeout)
+
+    def __init__(
+        self,
+        pool_connections=DEFAULT_POOLSIZE,
+        pool_maxsize=DEFAULT_POOLSIZE,
+        pool_block=DEFAULT_POOLBLOCK,
+        keep_alive=True,
+    ):
+        """
+        :param pool_connections: number of per-host connection pools to cache
+        :param pool_maxsize: maximum number of connections kept open per host
+        :param pool_block: wait for a free connection instead of opening
+        a throwaway one when all pooled connections are busy
+        :param keep_alive: reuse connections between requests
+        """
+        self.adapter = PooledHTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+    @property
+    def stats(self):
+        return self.adapter.stats
+
+    def request(
+        self, method, url, headers, body=None, stream=False, timeout=None, **kwargs
+    ):
+        """
+        :param kwargs: other options of requests.Session.request, e.g. verify,
+        allow_redirects or cookies
+        :return: requests.Response
+        """
+        return self.session.request(
+            method,
+            url,
+            headers=headers,
+            data=body,
+            stream=stream,
+            timeout=timeout,
+            **kwargs,
+        )
+
+    def close(self):
+        self.session.close()
+
+
+class Urllib3Transport:
+    """
+    Transport over a bare urllib3.PoolManager, skipping the request
+    preparation and hooks of requests
+    """
+
+    connection_errors = (urllib3.exceptions.HTTPError,)
+
+    def __init__(
+        self,
+        pool_connections=DEFAULT_POOLSIZE,
+        pool_maxsize=DEFAULT_POOLSIZE,
+        pool_block=DEFAULT_POOLBLOCK,
+        keep_alive=True,
+    ):
+        """
+        :param pool_connections: number of per-host connection pools to cache
+        :param pool_maxsize: maximum number of connections kept open per host
+        :param pool_block: wait for a free connection instead of opening
+        a throwaway one when all pooled connections are busy
+        :param keep_alive: reuse connections between requests
+        """
+        self.stats = ConnectionStats()
+        self.manager = urllib3.PoolManager(
+            num_pools=pool_connections,
+            maxsize=pool_maxsize,
+            block=pool_block,
+            retries=False,
+        )
+        self.manager.pool_classes_by_scheme = _counting_pool_classes(self.stats)
+        self._keep_alive = keep_alive
+
+    def request(
+        self, method, url, headers, body=None, stream=False, timeout=None, **kwargs
+    ):
+        """
+        :param kwargs: requests options, rejected as this transport has none
+        :return: TransportResponse
+        """
+        _reject_options(self, kwargs)
+        if not self._keep_alive:
+            headers = {**headers, "Connection": "close"}
+        self.stats.request_sent()
+        response = self.manager.request(
+            method,
+            url,
+            body=body,
+            headers=headers,
+            preload_content=not stream,
+            redirect=False,
+            timeout=timeout,
+        )
+        if not stream:
+            return TransportResponse(response.status, response.headers, response.data)
+
+        def release():
+            response.drain_conn()
+            response.release_conn()
+
+        return TransportResponse(
+            response.status, response.headers, read=response.read, release=release
+        )
+
+    def close(self):
+        self.manager.clear()
+
+
+class HttpClientTransport:
+    """
+    Transport over the standard library http.client with one persistent
+    connection per host and thread
+    """
+
+    connection_errors = (OSError, http.client.HTTPException)
+
+    def __init__(
+        self,
+        pool_connections=DEFAULT_POOLSIZE,
+        pool_maxsize=DEFAULT_POOLSIZE,
+        pool_block=DEFAULT_POOLBLOCK,
+        keep_alive=True,
+    ):
+        """
+        Pool settings are accepted for a uniform constructor and ignored,
+        every thread keeps its own connection to each host
+        :param keep_alive: reuse connections between requests
+        """
+        self.stats = ConnectionStats()
+        self._keep_alive = keep_alive
+        self._local = local()
+        self._lock = Lock()
+        self._connections = []
+
+    def _connection(self, key, timeout):
+        connections = self._local.__dict__.setdefault("connections", {})
+        connection = connections.get(key)
+        if connection is None:
+            scheme, netloc = key
+            connection_class = (
+                http.client.HTTPSConnection
+                if scheme == "https"
+                else http.client.HTTPConnection
+            )
+            connection = connections[key] = connection_class(netloc, timeout=timeout)
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _discard(self, key, connection):
+        connections = self._local.__dict__.get("connections", {})
+        if connections.get(key) is connection:
+            del connections[key]
+        with self._lock:
+            if connection in self._connections:
+                self._connections.remove(connection)
+        connection.close()
+
+    def request(
+        self, method, url, headers, body=None, stream=False, timeout=None, **kwargs
+    ):
+        """
+        :param kwargs: requests options, rejected as this transport has none
+        :return: TransportResponse
+        """
+        _reject_options(self, kwargs)
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        if not self._keep_alive:
+            headers = {**headers, "Connection": "close"}
+        self.stats.request_sent()
+        for attempt in range(2):
+            connection = self._connection(key, timeout)
+            reused = connection.sock is not None
+            sent = False
+            try:
+                if not reused:
+                    started = perf_counter()
+                    try:
+                        connection.connect()
+                    finally:
+                        self.stats.connection_opened(perf_counter() - started)
+                connection.request(method, target, body, headers)
+                sent = True
+                response = connection.getresponse()
+                break
+            except (
+                http.client.RemoteDisconnected,
+                ConnectionResetError,
+                BrokenPipeError,
+            ):
+                self._discard(key, connection)
+                # the server closed an idle keep-alive connection, reconnect once
+                # unless it may have processed a request that is not idempotent,
+                # those are left to the RetryPolicy
+                if not reused or attempt or sent and method not in IDEMPOTENT_METHODS:
+                    raise
+            except BaseException:
+                self._discard(key, connection)
+                raise
+        if not stream:
+            return TransportResponse(response.status, response.headers, response.read())
+
+        def release():
+            if not response.isclosed():
+                self._discard(key, connection)
+
+        return TransportResponse(
+            response.status, response.headers, read=response.read, release=release
+        )
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+
+
+TRANSPORTS = {
+    "requests": RequestsTransport,
+    "urllib3": Urllib3Transport,
+    "http.client": HttpClientTransport,
+}
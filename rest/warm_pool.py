@@ -0,0 +1,129 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+from queue import Empty, SimpleQueue
+from threading import Lock
+
+
+class _Failed:
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
+
+
+def size_for_workers(total, workers=None):
+    """
+    Split a pool size budget between pytest-xdist workers
+    :param total: number of resources to keep warm across all workers
+    :param workers: number of workers, PYTEST_XDIST_WORKER_COUNT when None
+    :return: pool size of one worker, at least 1
+    """
+    if workers is None:
+        workers = int(os.getenv("PYTEST_XDIST_WORKER_COUNT", "1"))
+    return max(1, total // max(workers, 1))
+
+
+class WarmPool:
+    """
+    Keeps `size` resources provisioned ahead of demand.
+    take() hands out a ready resource immediately and starts provisioning its
+    replacement in the background. When nothing is ready it waits for a
+    resource already being provisioned, or provisions one itself.
+    """
+
+    def __init__(self, factory, size, concurrency=None):
+        """
+        :param factory: callable creating one resource
+        :param size: number of resources kept ready
+        :param concurrency: maximum number of resources provisioned in parallel
+        """
+        self._log = getLogger(__name__)
+        self._factory = factory
+        self._ready = SimpleQueue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency or size, thread_name_prefix="warm-pool"
+        )
+        self._lock = Lock()
+        self._in_flight = 0
+        self._closed = False
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        for _ in range(size):
+            self._refill()
+
+    def _refill(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._in_flight += 1
+        self._executor.submit(self._provision)
+
+    def _provision(self):
+        try:
+            resource = self._factory()
+        except Exception as error:
+            self._log.warning(f"Provisioning a pooled resource failed: {error!r}")
+            resource = _Failed(error)
+        with self._lock:
+            self._in_flight -= 1
+            if isinstance(resource, _Failed):
+                self.failures += 1
+        self._ready.put(resource)
+
+    def take(self):
+        """
+        :return: a fresh resource, never handed out before
+        """
+        try:
+            resource = self._ready.get_nowait()
+        except Empty:
+            with self._lock:
+                in_flight = self._in_flight
+            resource = self._ready.get() if in_flight else None
+            with self._lock:
+                self.misses += 1
+        else:
+            with self._lock:
+                self.hits += 1
+        self._refill()
+        if resource is None or isinstance(resource, _Failed):
+            return self._factory()
+        return resource
+
+    @property
+    def stats(self):
+        """
+        :return: dictionary with the number of resources ready, being
+        provisioned, handed out instantly or after waiting, and failures
+        """
+        with self._lock:
+            return {
+                "ready": self._ready.qsize(),
+                "in_flight": self._in_flight,
+                "hits": self.hits,
+                "misses": self.misses,
+                "failures": self.failures,
+            }
+
+    def close(self):
+        """
+        Stop provisioning and wait for the resources in flight
+        :return: list of resources that were never handed out
+        """
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=True)
+        leftovers = []
+        while not self._ready.empty():
+            resource = self._ready.get_nowait()
+            if not isinstance(resource, _Failed):
+                leftovers.append(resource)
+        return leftovers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
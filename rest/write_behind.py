@@ -0,0 +1,181 @@
+from concurrent.futures import Future
+from threading import Condition, Lock, Thread
+from time import monotonic
+
+from rest.bulk import run_bulk
+
+_PUT_FIELDS = ("title", "description", "completed", "category")
+
+
+class _PendingUpdate:
+    """
+    Merged state of the updates queued for one note
+    """
+
+    __slots__ = ("note_id", "fields", "full", "futures")
+
+    def __init__(self, note_id):
+        self.note_id = note_id
+        self.fields = {}
+        self.full = False
+        self.futures = []
+
+    def merge(self, fields, full):
+        self.fields.update(fields)
+        self.full = self.full or full
+
+    def send(self, service, expected_status_code):
+        if self.full:
+            return service.put_note_by_id(
+                self.note_id,
+                **self.fields,
+                expected_status_code=expected_status_code,
+            )
+        return service.patch_note_by_id(
+            self.note_id,
+            self.fields["completed"],
+            expected_status_code=expected_status_code,
+        )
+
+
+class WriteBehindQueue:
+    """
+    Buffers note updates and sends them in batches.
+    Updates to the same note are merged with last-write-wins on fields: only
+    PATCHes send a single PATCH, any PUT turns the merged update into a single
+    PUT. A batch is flushed `window` seconds after its first update, as soon
+    as `max_pending` notes are waiting, or on an explicit flush().
+    """
+
+    def __init__(
+        self,
+        service,
+        window=0.05,
+        max_pending=100,
+        concurrency=8,
+        expected_status_code=200,
+    ):
+        """
+        :param service: NotesRest used to send the updates
+        :param window: seconds an update may wait before it is sent
+        :param max_pending: number of distinct notes that triggers a flush
+        :param concurrency: maximum number of requests in flight while flushing
+        :param expected_status_code: expected response code for every update
+        """
+        self._service = service
+        self._window = window
+        self._max_pending = max_pending
+        self._concurrency = concurrency
+        self._expected_status_code = expected_status_code
+        self._pending = {}
+        self._deadline = None
+        self._condition = Condition()
+        self._flush_lock = Lock()
+        self._closed = False
+        self.queued = 0
+        self.sent = 0
+        self._thread = Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def put(self, note_id, title, description, completed, category):
+        """
+        Queue a full update of a note
+        :return: Future resolved with the response of the request carrying it
+        """
+        return self._enqueue(
+            note_id,
+            dict(zip(_PUT_FIELDS, (title, description, completed, category))),
+            True,
+        )
+
+    def patch(self, note_id, completed):
+        """
+        Queue a status update of a note
+        :return: Future resolved with the response of the request carrying it
+        """
+        return self._enqueue(note_id, {"completed": completed}, False)
+
+    def _enqueue(self, note_id, fields, full):
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Write-behind queue is closed")
+            update = self._pending.get(note_id)
+            if update is None:
+                update = self._pending[note_id] = _PendingUpdate(note_id)
+            update.merge(fields, full)
+            update.futures.append(future)
+            self.queued += 1
+            if self._deadline is None:
+                self._deadline = monotonic() + self._window
+            if len(self._pending) >= self._max_pending:
+                self._deadline = monotonic()
+            self._condition.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed and (
+                    self._deadline is None or self._deadline > monotonic()
+                ):
+                    timeout = (
+                        None if self._deadline is None else self._deadline - monotonic()
+                    )
+                    self._condition.wait(timeout)
+                if self._closed:
+                    return
+            self.flush()
+
+    def flush(self):
+        """
+        Send every pending update and wait for the responses
+        :return: number of requests sent
+        """
+        with self._flush_lock:
+            with self._condition:
+                batch, self._pending = list(self._pending.values()), {}
+                self._deadline = None
+            if not batch:
+                return 0
+            for result in run_bulk(
+                lambda update: update.send(self._service, self._expected_status_code),
+                batch,
+                self._concurrency,
+            ):
+                for future in result.item.futures:
+                    if result.success:
+                        future.set_result(result.response)
+                    else:
+                        future.set_exception(result.error)
+            self.sent += len(batch)
+            return len(batch)
+
+    @property
+    def stats(self):
+        """
+        :return: dictionary with the number of queued updates, sent requests
+        and updates still waiting
+        """
+        with self._condition:
+            return {
+                "queued": self.queued,
+                "sent": self.sent,
+                "pending": len(self._pending),
+            }
+
+    def close(self):
+        """
+        Stop the background flusher and send the remaining updates
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,19 +1,55 @@
 import os
+from itertools import count
 from logging import getLogger
+from uuid import uuid4
 
 import pytest
 
 from rest.notes_rest import NotesRest
+from rest.rate_limit import FileTokenBucket, RateLimiter, TokenBucket
+from rest.recording import Recorder, Replayer
+from rest.resources import ResourceRegistry, sweep
+from rest.stand_in import NotesApiServer
+from rest.token_store import TokenStore
+from rest.warm_pool import WarmPool, size_for_workers
+
+pytest_plugins = ["pytester", "rest.duration_scheduler", "rest.perf_gate"]
 
 logger = getLogger(__name__)
 
+NOTE_POOL_SIZE = 8
+USER_POOL_SIZE = 2
+
+
+class FakeClock:
+    """
+    Manual time source: calls return `now`, which moves only when set, on
+    sleep() and by `tick` on every reading
+    """
+
+    def __init__(self, tick=0.0):
+        self.now = 0.0
+        self.tick = tick
+
+    def __call__(self):
+        self.now += self.tick
+        return self.now
+
+    def sleep(self, delay):
+        self.now += delay
+
+
+@pytest.fixture
+def fake_clock():
+    return FakeClock()
+
 
 @pytest.fixture(scope="session")
 def email():
     return os.getenv("EMAIL")
 
 
-@pytest.fixture()
+@pytest.fixture(scope="session")
 def new_email():
     return os.getenv("NEW_EMAIL")
 
@@ -28,14 +64,103 @@ def new_password():
     return os.getenv("NEW_PASSWORD")
 
 
+@pytest.fixture(scope="session")
+def stand_in():
+    with NotesApiServer() as server:
+        yield server
+
+
+@pytest.fixture(scope="session")
+def base_url(request, email, password):
+    if not os.getenv("NOTES_API_LOCAL"):
+        return NotesRest.BASE_URL
+    logger.info("Using local Notes API stand-in")
+    server = request.getfixturevalue("stand_in")
+    server.state.add_user("test_rest_api", email, password)
+    return server.url
+
+
+@pytest.fixture(scope="session")
+def token_store(tmp_path_factory):
+    shared_dir = tmp_path_factory.getbasetemp()
+    if os.getenv("PYTEST_XDIST_WORKER"):
+        shared_dir = shared_dir.parent
+    return TokenStore(shared_dir / "notes_api_tokens.json")
+
+
+@pytest.fixture(scope="session")
+def rate_limiter(tmp_path_factory):
+    rate = os.getenv("NOTES_API_RATE")
+    if not rate:
+        yield None
+        return
+    if os.getenv("PYTEST_XDIST_WORKER"):
+        # one budget for all xdist workers of the run, not one per worker
+        bucket = FileTokenBucket(
+            tmp_path_factory.getbasetemp().parent / "notes_api_rate", float(rate)
+        )
+    else:
+        bucket = TokenBucket(float(rate))
+    logger.info(f"Limiting Notes API requests to {rate} per second")
+    yield RateLimiter(default=bucket)
+    if isinstance(bucket, FileTokenBucket):
+        bucket.close()
+
+
+@pytest.fixture(scope="session")
+def traffic():
+    if os.getenv("NOTES_API_REPLAY"):
+        logger.info("Replaying recorded Notes API traffic")
+        yield {"replayer": Replayer(os.getenv("NOTES_API_REPLAY"))}
+    elif os.getenv("NOTES_API_RECORD"):
+        with Recorder(os.getenv("NOTES_API_RECORD")) as recorder:
+            yield {"recorder": recorder}
+    else:
+        yield {}
+
+
+@pytest.fixture(scope="session")
+def resource_registry(base_url, token_store, rate_limiter, traffic):
+    registry = ResourceRegistry()
+    yield registry
+    logger.info(f"Sweeping {len(registry)} resources created by tests")
+    sweep(
+        registry,
+        lambda: NotesRest(
+            base_url, token_store=token_store, rate_limiter=rate_limiter, **traffic
+        ),
+    )
+
+
+@pytest.fixture
+def notes_service(base_url, token_store, rate_limiter, traffic, resource_registry):
+    with NotesRest(
+        base_url,
+        token_store=token_store,
+        resource_registry=resource_registry,
+        rate_limiter=rate_limiter,
+        **traffic,
+    ) as service:
+        yield service
+
+
 @pytest.fixture
-def notes_service():
-    return NotesRest()
+def stand_in_user(stand_in):
+    email = f"{uuid4().hex}@example.com"
+    stand_in.state.add_user("stand_in_user", email, "password")
+    return email, "password"
+
+
+@pytest.fixture
+def stand_in_service(stand_in, stand_in_user):
+    with NotesRest(stand_in.url) as service:
+        service.post_users_login(*stand_in_user)
+        yield service
 
 
 @pytest.fixture
 def authenticated_notes_service(notes_service, email, password):
-    notes_service.post_users_login(email, password)
+    notes_service.authenticate(email, password)
     return notes_service
 
 
@@ -47,24 +172,73 @@ def prepared_token(notes_service, email, password):
     return response["data"]["token"]
 
 
+@pytest.fixture(scope="session")
+def user_pool(base_url, new_email, password, rate_limiter, traffic, resource_registry):
+    local_part, domain = new_email.split("@")
+    worker = os.getenv("PYTEST_XDIST_WORKER", "gw0")
+    counter = count()
+
+    def register():
+        # recorded traffic only replays when the generated emails repeat
+        suffix = next(counter) if traffic else uuid4().hex[:12]
+        user_email = f"{local_part}.{worker}.{suffix}@{domain}"
+        service = NotesRest(
+            base_url,
+            resource_registry=resource_registry,
+            rate_limiter=rate_limiter,
+            **traffic,
+        )
+        try:
+            service.post_users_register("test_rest_api", user_email, password)
+            service.post_users_login(user_email, password)
+        except Exception:
+            service.close()
+            raise
+        return service
+
+    pool = WarmPool(register, size_for_workers(USER_POOL_SIZE))
+    yield pool
+    for service in pool.close():
+        service.close()
+
+
+@pytest.fixture(scope="session")
+def note_pool(
+    base_url, email, password, token_store, rate_limiter, traffic, resource_registry
+):
+    with NotesRest(
+        base_url,
+        token_store=token_store,
+        resource_registry=resource_registry,
+        rate_limiter=rate_limiter,
+        **traffic,
+    ) as service:
+        service.authenticate(email, password)
+        pool = WarmPool(
+            lambda: service.post_notes(
+                title="Test Title",
+                description="Test Description",
+                category="Home",
+                expected_status_code=200,
+            )["data"],
+            size_for_workers(NOTE_POOL_SIZE),
+        )
+        yield pool
+        pool.close()
+
+
 @pytest.fixture
-def prepared_user(notes_service, new_email, password):
+def prepared_user(user_pool):
     logger.info("Prepare user for tests")
-    name = "test_rest_api"
-    notes_service.post_users_register(name, new_email, password)
-    notes_service.post_users_login(new_email, password)
+    service = user_pool.take()
     logger.info("User prepared")
-    return notes_service
+    yield service
+    service.close()
 
 
 @pytest.fixture
-def prepared_note(authenticated_notes_service) -> dict:
+def prepared_note(note_pool) -> dict:
     logger.info("Preparing note for tests")
-    response = authenticated_notes_service.post_notes(
-        title="Test Title",
-        description="Test Description",
-        category="Home",
-        expected_status_code=200,
-    )
-    logger.info(f"Note prepared: {response['data']}")
-    return response["data"]
+    note = note_pool.take()
+    logger.info(f"Note prepared: {note}")
+    return note
@@ -0,0 +1,191 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.load import run_load
+from rest.adaptive import AdaptiveLimiter
+from rest.bulk import BulkReport, run_bulk
+from rest.notes_rest import NotesRest
+
+
+def test_limit_grows_additively_while_healthy(fake_clock):
+    limiter = AdaptiveLimiter(initial=2, max_limit=4, clock=fake_clock)
+    for _ in range(2 + 3 + 4 + 4):
+        limiter.observe(0.01, 200)
+
+    assert limiter.limit == 4
+    assert [(d["from"], d["to"], d["reason"]) for d in limiter.decisions] == [
+        (2, 3, "healthy"),
+        (3, 4, "healthy"),
+    ]
+
+
+def test_limit_cut_once_per_round_on_overload(fake_clock):
+    clock = fake_clock
+    clock.tick = 1
+    limiter = AdaptiveLimiter(initial=16, clock=clock)
+    limiter.observe(0.01, 200, started=clock())
+    sent_before_cut = clock()
+
+    limiter.observe(0.01, 429, started=clock())
+    limiter.observe(0.01, 503, started=sent_before_cut)
+    assert limiter.limit == 8
+
+    limiter.observe(0.01, 503, started=clock())
+    limiter.observe(0.5, 200, started=clock())
+    limiter.observe(0.01, error=ConnectionError(), started=clock())
+    assert limiter.limit == 1
+
+    limiter.observe(0.01, 400, error=AssertionError(), started=clock())
+    assert limiter.limit == 2
+    assert [d["reason"] for d in limiter.snapshot()["decisions"]] == [
+        "status 429",
+        "status 503",
+        "latency",
+        "ConnectionError",
+        "healthy",
+    ]
+
+
+class SlowRateLimiter:
+    delay = 0.0
+
+    def acquire(self, method, path):
+        time.sleep(self.delay)
+
+
+def test_rate_limiter_wait_is_not_latency(stand_in):
+    limiter = AdaptiveLimiter(initial=4, latency_tolerance=50)
+    rate_limiter = SlowRateLimiter()
+    with NotesRest(stand_in.url, hooks=[limiter], rate_limiter=rate_limiter) as service:
+        for _ in range(10):
+            service.get_health_check()
+        rate_limiter.delay = 0.1
+        for _ in range(5):
+            service.get_health_check()
+
+    assert limiter.baseline < 0.05
+    assert "latency" not in [d["reason"] for d in limiter.decisions]
+    assert limiter.limit >= 4
+
+
+def test_acquire_blocks_at_limit():
+    limiter = AdaptiveLimiter(initial=1)
+    limiter.acquire()
+    acquired = threading.Event()
+    waiter = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+    waiter.start()
+    assert not acquired.wait(0.02)
+    limiter.release()
+    assert acquired.wait(1)
+    waiter.join()
+    assert limiter.in_flight == 1
+
+
+def test_run_bulk_follows_adaptive_limit():
+    limiter = AdaptiveLimiter(initial=2, max_limit=6)
+    lock = threading.Lock()
+    in_flight = 0
+    peaks = []
+
+    def job(value):
+        nonlocal in_flight
+        with lock:
+            in_flight += 1
+            peaks.append((in_flight, limiter.limit))
+            assert limiter.in_flight >= 1
+        time.sleep(0.002)
+        with lock:
+            in_flight -= 1
+        limiter.observe(0.002, 200)
+        return value
+
+    report = BulkReport(run_bulk(job, range(60), limiter=limiter))
+
+    assert len(report.succeeded) == 60
+    assert limiter.limit == 6
+    assert max(peak for peak, _ in peaks) > 2
+    assert all(peak <= limit + 1 for peak, limit in peaks)
+    assert limiter.in_flight == 0
+
+
+def test_bulk_backs_off_on_server_errors(stand_in, stand_in_service):
+    limiter = AdaptiveLimiter(initial=8, max_limit=16)
+    stand_in.state.fail_next(3, status=503)
+
+    report = stand_in_service.create_notes_many(
+        (
+            {
+                "title": f"Adaptive {index}",
+                "description": "Bulk note",
+                "category": "Work",
+            }
+            for index in range(30)
+        ),
+        limiter=limiter,
+    )
+
+    assert len(report.failed) == 3
+    assert limiter.decisions[0]["reason"] == "status 503"
+    assert limiter.decisions[0]["to"] == 4
+
+
+class PathsLimiter(AdaptiveLimiter):
+    def __init__(self):
+        super().__init__(initial=2, max_limit=4)
+        self.paths = []
+
+    def after_response(self, context):
+        self.paths.append(context.endpoint)
+        super().after_response(context)
+
+
+def test_concurrent_bulk_calls_feed_their_own_limiters(stand_in_service):
+    creating, deleting = PathsLimiter(), PathsLimiter()
+    note_ids = [
+        stand_in_service.post_notes(f"Limited {index}", "Bulk note", "Home")["data"][
+            "id"
+        ]
+        for index in range(10)
+    ]
+
+    deleted = stand_in_service.delete_notes_many(note_ids, limiter=deleting)
+    created = stand_in_service.create_notes_many(
+        (
+            {
+                "title": f"Limited {index}",
+                "description": "Bulk note",
+                "category": "Home",
+            }
+            for index in range(10)
+        ),
+        limiter=creating,
+    )
+    for _ in range(10):
+        stand_in_service.get_health_check()
+
+    assert len(deleted.succeeded) == len(created.succeeded) == 10
+    assert deleting.paths == ["DELETE notes/{id}"] * 10
+    assert creating.paths == ["POST notes"] * 10
+    assert not stand_in_service._hooks
+
+
+def test_adaptive_load(stand_in, stand_in_user):
+    report = run_load(
+        stand_in.url,
+        *stand_in_user,
+        mix="get=1",
+        concurrency=8,
+        requests=200,
+        seed_notes=1,
+        seed=1,
+        adaptive=True,
+    )
+
+    assert report["totals"]["requests"] == 200
+    assert 1 <= report["adaptive"]["limit"] <= 8
+    wait = report["adaptive"]["queue_wait_ms"]
+    assert 0 <= wait["p50"] <= wait["p99"] <= wait["max"]
+    with pytest.raises(ValueError):
+        run_load(stand_in.url, *stand_in_user, processes=2, adaptive=True)
@@ -0,0 +1,120 @@
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+import pytest
+
+from rest.async_notes_rest import AsyncNotesRest
+from rest.async_rest_client import gather
+from rest.notes_rest import NotesRest
+
+
+def test_gather_limits_concurrency():
+    in_flight = 0
+    peak = 0
+
+    async def job(value):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return value
+
+    results = asyncio.run(gather(*(job(i) for i in range(50)), limit=5))
+
+    assert results == list(range(50))
+    assert peak == 5
+
+
+def test_gather_return_exceptions():
+    async def fail():
+        raise ValueError("boom")
+
+    async def ok():
+        return "ok"
+
+    results = asyncio.run(gather(ok(), fail(), limit=2, return_exceptions=True))
+
+    assert results[0] == "ok"
+    assert isinstance(results[1], ValueError)
+    with pytest.raises(ValueError):
+        asyncio.run(gather(fail(), limit=2))
+
+
+def test_async_session_shared_and_closed():
+    async def scenario():
+        async with AsyncNotesRest(limit=10) as service:
+            session = service.session
+            assert service.session is session
+            assert session.connector.limit == 10
+        return session
+
+    session = asyncio.run(scenario())
+    assert session.closed
+
+
+def test_async_notes_round_trip(stand_in):
+    stand_in.state.add_user("async_user", "async@example.com", "password")
+
+    async def scenario():
+        async with AsyncNotesRest(stand_in.url) as service:
+            await service.post_users_login("async@example.com", "password")
+            created = await gather(
+                *(service.post_notes(f"Async {i}", "Async", "Home") for i in range(30)),
+                limit=10,
+            )
+            note_id = created[0]["data"]["id"]
+            fetched = await service.get_note_by_id(note_id)
+            missing = await service.get_note_by_id("0" * 24, expected_status_code=404)
+            notes = await service.get_notes()
+        return fetched, missing, notes
+
+    fetched, missing, notes = asyncio.run(scenario())
+
+    assert fetched["message"] == "Note successfully retrieved"
+    assert missing["message"] == (
+        "No note was found with the provided ID, Maybe it was deleted"
+    )
+    assert len(notes["data"]) == 30
+
+
+class EmptyBodyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def empty_body_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), EmptyBodyHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_sync_and_async_clients_decode_alike(stand_in, empty_body_url):
+    async def fetch(base_url):
+        async with AsyncNotesRest(base_url) as service:
+            try:
+                return await service._request("GET", "health-check")
+            except ValueError as error:
+                return type(error)
+
+    def fetch_sync(base_url):
+        with NotesRest(base_url) as service:
+            try:
+                return service._get("health-check")
+            except ValueError as error:
+                return type(error)
+
+    for base_url in (stand_in.url, empty_body_url):
+        assert asyncio.run(fetch(base_url)) == fetch_sync(base_url)
+    assert fetch_sync(stand_in.url)["message"] == "Notes API is Running"
@@ -0,0 +1,115 @@
+import itertools
+import threading
+import time
+
+from rest.bulk import BulkReport, run_bulk
+
+
+def test_run_bulk_reports_each_item():
+    def square(value):
+        assert value != 3
+        return value * value
+
+    report = BulkReport(run_bulk(square, range(6), concurrency=3))
+
+    assert len(report) == 6
+    assert sorted(result.response for result in report.succeeded) == [0, 1, 4, 16, 25]
+    assert [result.item for result in report.failed] == [3]
+    assert isinstance(report.failed[0].error, AssertionError)
+
+
+def test_run_bulk_limits_concurrency():
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+
+    def job(value):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.005)
+        with lock:
+            in_flight -= 1
+        return value
+
+    report = BulkReport(run_bulk(job, range(40), concurrency=4)).wait()
+
+    assert len(report.succeeded) == 40
+    assert peak <= 4
+
+
+def test_run_bulk_streams_in_completion_order():
+    def job(delay):
+        time.sleep(delay)
+        return delay
+
+    results = list(run_bulk(job, [0.2, 0.0], concurrency=2))
+
+    assert [result.index for result in results] == [1, 0]
+
+
+def test_cancel_stops_submitting_items():
+    calls = []
+
+    def job(value):
+        calls.append(value)
+        time.sleep(0.005)
+        return value
+
+    report = BulkReport(run_bulk(job, itertools.count(), concurrency=2))
+    while len(calls) < 10:
+        time.sleep(0.005)
+    report.close()
+    submitted = len(calls)
+    time.sleep(0.05)
+
+    assert report._thread.daemon
+    assert not report._thread.is_alive()
+    assert len(calls) == submitted
+    assert submitted - 2 <= len(report.wait().results) <= submitted
+
+
+def test_create_and_delete_notes_many(stand_in_service):
+    notes = [
+        {"title": f"Bulk note {i}", "description": "Bulk", "category": "Work"}
+        for i in range(20)
+    ]
+    notes.append({"title": "Cut", "description": "Bulk", "category": "Work"})
+
+    created = stand_in_service.create_notes_many(notes, concurrency=4)
+
+    assert len(created.succeeded) == 20
+    assert [result.index for result in created.failed] == [20]
+    note_ids = [result.response["data"]["id"] for result in created.succeeded]
+    updated = stand_in_service.update_notes_many(
+        {
+            "note_id": note_id,
+            "title": "Updated",
+            "description": "Bulk",
+            "completed": True,
+            "category": "Home",
+        }
+        for note_id in note_ids
+    )
+    assert not updated.failed
+    deleted = stand_in_service.delete_notes_many(note_ids, concurrency=4)
+    assert len(deleted.succeeded) == 20
+    assert stand_in_service.get_notes()["data"] == []
+
+
+def test_bulk_runs_without_reading_the_report(stand_in_service):
+    stand_in_service.create_notes_many(
+        {"title": f"Unread {i}", "description": "Bulk", "category": "Work"}
+        for i in range(5)
+    )
+    deadline = time.monotonic() + 5
+    while len(stand_in_service.get_notes()["data"]) < 5:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    note_ids = [note["id"] for note in stand_in_service.get_notes()["data"]]
+    stand_in_service.delete_notes_many(note_ids)
+    while stand_in_service.get_notes()["data"]:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
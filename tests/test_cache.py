@@ -0,0 +1,97 @@
+from threading import Thread
+
+from rest.cache import ResponseCache
+from rest.metrics import RequestHook
+from rest.notes_rest import NotesRest
+
+
+def test_lru_eviction():
+    cache = ResponseCache(maxsize=2)
+    cache.set(("token", "a"), 1)
+    cache.set(("token", "b"), 2)
+    assert cache.get(("token", "a")) == 1
+    cache.set(("token", "c"), 3)
+
+    assert cache.get(("token", "b")) is None
+    assert cache.get(("token", "a")) == 1
+    assert cache.stats == {
+        "hits": 2,
+        "misses": 1,
+        "evictions": 1,
+        "expirations": 0,
+        "stale": 0,
+        "size": 2,
+    }
+
+
+def test_ttl_expiration(fake_clock):
+    cache = ResponseCache(ttl=10, clock=fake_clock)
+    cache.set(("token", "a"), 1)
+    fake_clock.now = 9.9
+    assert cache.get(("token", "a")) == 1
+    fake_clock.now = 10
+    assert cache.get(("token", "a")) is None
+    assert cache.stats["expirations"] == 1
+
+
+def test_invalidate_token():
+    cache = ResponseCache()
+    cache.set(("first", "notes"), 1)
+    cache.set(("second", "notes"), 2)
+    cache.invalidate_token("first")
+    assert cache.get(("first", "notes")) is None
+    assert cache.get(("second", "notes")) == 2
+
+
+def test_cached_reads_invalidated_by_writes(stand_in, stand_in_user):
+    cache = ResponseCache()
+    with NotesRest(stand_in.url, cache=cache) as service:
+        service.post_users_login(*stand_in_user)
+        note = service.post_notes("Cached note", "Description", "Home")["data"]
+
+        assert service.get_notes() is service.get_notes()
+        assert service.get_note_by_id(note["id"]) is service.get_note_by_id(note["id"])
+        assert cache.stats["hits"] == 2
+
+        service.patch_note_by_id(note["id"], True)
+        assert service.get_note_by_id(note["id"])["data"]["completed"] is True
+        assert service.get_notes()["data"][0]["completed"] is True
+
+        service.delete_note_by_id(note["id"])
+        assert service.get_notes()["data"] == []
+        service.get_note_by_id(note["id"], expected_status_code=404)
+        assert service.connection_stats["requests"] == 10
+
+
+class WriteAfterRead(RequestHook):
+    """
+    Completes a write on another thread once the first read got its response,
+    before the caller stores it in the cache
+    """
+
+    def __init__(self, write):
+        self.write = write
+        self.armed = True
+
+    def after_response(self, context):
+        if self.armed and context.method == "GET":
+            self.armed = False
+            writer = Thread(target=self.write)
+            writer.start()
+            writer.join()
+
+
+def test_read_racing_a_write_is_not_cached(stand_in, stand_in_user):
+    cache = ResponseCache()
+    hook = WriteAfterRead(None)
+    with NotesRest(stand_in.url, cache=cache, hooks=[hook]) as service:
+        service.post_users_login(*stand_in_user)
+        note = service.post_notes("Raced note", "Description", "Home")["data"]
+        hook.write = lambda: service.patch_note_by_id(note["id"], True)
+
+        stale = service.get_note_by_id(note["id"])
+
+        assert stale["data"]["completed"] is False
+        assert cache.stats["stale"] == 1
+        assert service.get_note_by_id(note["id"])["data"]["completed"] is True
+        service.delete_note_by_id(note["id"])
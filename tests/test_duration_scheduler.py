@@ -0,0 +1,129 @@
+from types import SimpleNamespace
+
+import pytest
+
+from rest.duration_scheduler import (
+    CACHE_KEY,
+    DurationRecorder,
+    DurationScheduling,
+    load_durations,
+    parse_groups,
+    plan,
+)
+
+COLLECTION = [
+    "tests/test_notes.py::test_fast",
+    "tests/test_notes.py::test_slow",
+    "tests/test_users.py::test_change_password",
+    "tests/test_users.py::test_logout",
+    "tests/test_users.py::test_new",
+]
+DURATIONS = {
+    "tests/test_notes.py::test_fast": 0.1,
+    "tests/test_notes.py::test_slow": 2.0,
+    "tests/test_users.py::test_change_password": 0.5,
+    "tests/test_users.py::test_logout": 0.6,
+}
+GROUPS = parse_groups(
+    ["account: tests/test_users.py::test_*password* tests/test_users.py::test_log*"]
+)
+
+
+class MockNode:
+    def __init__(self, name):
+        self.gateway = SimpleNamespace(id=name)
+        self.sent = []
+        self.shutting_down = False
+
+    def send_runtest_some(self, indices):
+        self.sent.extend(indices)
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+class MockCache:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key, default):
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+def test_parse_groups():
+    assert GROUPS == [
+        (
+            "account",
+            ["tests/test_users.py::test_*password*", "tests/test_users.py::test_log*"],
+        )
+    ]
+    with pytest.raises(pytest.UsageError):
+        parse_groups(["tests/test_users.py::test_logout"])
+
+
+def test_plan_longest_first_with_groups():
+    units = plan(COLLECTION, DURATIONS, GROUPS)
+
+    assert units == [
+        ("tests/test_notes.py::test_slow", ["tests/test_notes.py::test_slow"]),
+        (
+            "account",
+            [
+                "tests/test_users.py::test_change_password",
+                "tests/test_users.py::test_logout",
+            ],
+        ),
+        ("tests/test_users.py::test_new", ["tests/test_users.py::test_new"]),
+        ("tests/test_notes.py::test_fast", ["tests/test_notes.py::test_fast"]),
+    ]
+    assert [scope for scope, _ in plan(COLLECTION, {})] == COLLECTION
+
+
+def test_scheduler_keeps_groups_on_one_worker():
+    config = SimpleNamespace(
+        getvalue=lambda name: ["2*popen"],
+        option=SimpleNamespace(loadscopereorder=False),
+    )
+    scheduler = DurationScheduling(config, durations=DURATIONS, groups=GROUPS)
+    nodes = [MockNode("gw0"), MockNode("gw1")]
+    for node in nodes:
+        scheduler.add_node(node)
+        scheduler.add_node_collection(node, COLLECTION)
+    scheduler.schedule()
+
+    slow, account = nodes
+    assert slow.sent[0] == COLLECTION.index("tests/test_notes.py::test_slow")
+    assert account.sent[:2] == [2, 3]
+    assert sorted(slow.sent + account.sent) == list(range(len(COLLECTION)))
+    for index in account.sent:
+        scheduler.mark_test_complete(account, index)
+    for index in slow.sent:
+        scheduler.mark_test_complete(slow, index)
+    assert scheduler.tests_finished
+
+
+def test_recorder_blends_durations():
+    config = SimpleNamespace(cache=MockCache())
+    config.cache.set(CACHE_KEY, {"tests/test_a.py::test_a": 1.0})
+    recorder = DurationRecorder(config)
+    for nodeid, duration in [
+        ("tests/test_a.py::test_a", 0.5),
+        ("tests/test_a.py::test_a", 1.5),
+        ("tests/test_b.py::test_b", 0.25),
+    ]:
+        recorder.pytest_runtest_logreport(
+            SimpleNamespace(nodeid=nodeid, duration=duration)
+        )
+    recorder.pytest_sessionfinish()
+
+    assert config.cache.get(CACHE_KEY, None) == {
+        "tests/test_a.py::test_a": 1.5,
+        "tests/test_b.py::test_b": 0.25,
+    }
+
+
+def test_durations_without_cache_plugin():
+    assert load_durations(SimpleNamespace()) == {}
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from rest.json_stream import iter_array_items
+
+
+def _chunks(raw, size):
+    return [raw[i : i + size] for i in range(0, len(raw), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 1 << 20])
+def test_items_split_across_chunks(chunk_size):
+    document = {
+        "success": True,
+        "status": 200,
+        "data": [{"id": str(i), "title": "Ünïcode" * i} for i in range(30)],
+        "message": "Notes successfully retrieved",
+    }
+    raw = json.dumps(document, ensure_ascii=False, indent=2).encode()
+    fields = {}
+
+    items = list(iter_array_items(_chunks(raw, chunk_size), fields=fields))
+
+    assert items == document["data"]
+    assert fields == {
+        "success": True,
+        "status": 200,
+        "message": "Notes successfully retrieved",
+    }
+
+
+def test_empty_and_missing_array():
+    assert list(iter_array_items([b'{"data": []}'])) == []
+    assert list(iter_array_items([b'{"message": "none"}'])) == []
+
+
+def test_truncated_document():
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_array_items([b'{"data": [{"id": 1}, {"id"']))
+
+
+def test_iter_notes(stand_in_service):
+    titles = {f"Streamed note {i}" for i in range(200)}
+    stand_in_service.create_notes_many(
+        {"title": title, "description": "Streamed", "category": "Home"}
+        for title in titles
+    ).wait()
+
+    notes = stand_in_service.iter_notes(note_factory=lambda note: note["title"])
+
+    assert set(notes) == titles
+    assert len(list(stand_in_service.iter_notes(chunk_size=16))) == 200
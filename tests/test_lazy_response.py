@@ -0,0 +1,50 @@
+import pytest
+
+from benchmarks.json_decoding import ENDPOINTS, MODES, decode_cost, run
+from rest.lazy_response import BACKENDS, LazyResponse
+from rest.notes_rest import NotesRest
+
+BODY = '{"success": true, "status": 200, "data": {"id": "1", "title": "été"}}'.encode()
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_decodes_once_on_access(backend):
+    response = LazyResponse(BODY, 200, BACKENDS[backend])
+
+    assert response.body.obj is BODY
+    assert not response.decoded
+    assert response["data"]["title"] == "été"
+    assert response.decoded
+    assert response.json() is response.json()
+    assert dict(response) == {
+        "success": True,
+        "status": 200,
+        "data": {"id": "1", "title": "été"},
+    }
+    assert bytes(response) == BODY
+    assert LazyResponse(b"", 204).json() is None
+
+
+def test_lazy_client(stand_in, stand_in_user):
+    with NotesRest(stand_in.url, lazy=True) as service:
+        service.post_users_login(*stand_in_user)
+        note = service.post_notes("Lazy", "Decoded on access", "Home")
+        deleted = service.delete_note_by_id(note["data"]["id"])
+        missing = service.get_note_by_id(note["data"]["id"], expected_status_code=404)
+
+    assert isinstance(deleted, LazyResponse)
+    assert deleted.status_code == 200
+    assert not deleted.decoded
+    assert missing["message"].startswith("No note was found")
+    with pytest.raises(KeyError):
+        NotesRest(stand_in.url, lazy="simdjson")
+
+
+def test_json_decoding_benchmark():
+    results = run(requests=5, notes=2, transport="http.client")
+
+    assert list(results) == list(ENDPOINTS)
+    for result in results.values():
+        assert list(result) == list(MODES)
+        assert all(cpu > 0 for cpu in result.values())
+    assert list(decode_cost(notes=2, repeat=5)) == list(BACKENDS)
@@ -0,0 +1,68 @@
+import pytest
+
+from benchmarks.load import LoadRecorder, format_report, parse_mix, run_load
+
+
+def test_parse_mix():
+    assert parse_mix("list=3, get") == {"list": 3.0, "get": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("unknown=1")
+
+
+def test_load_recorders_merge():
+    first, second = LoadRecorder(), LoadRecorder()
+    for latency in range(1, 51):
+        first.record("GET notes", latency / 1000)
+        second.record("GET notes", (latency + 50) / 1000, ValueError())
+
+    first.merge(second)
+
+    histogram = first.latencies["GET notes"]
+    assert histogram.count == 100
+    assert histogram.percentile(50) == pytest.approx(0.05, rel=0.02)
+    assert histogram.max == 0.1
+    assert first.errors == {"GET notes": {"ValueError": 50}}
+
+
+def test_run_load_report(stand_in, stand_in_user):
+    report = run_load(
+        stand_in.url,
+        *stand_in_user,
+        mix="list=1,get=1,create=1,update=1,delete=1",
+        concurrency=4,
+        requests=100,
+        seed_notes=2,
+        seed=1,
+    )
+
+    assert report["totals"]["requests"] == 100
+    assert report["totals"]["errors"] == 0
+    assert set(report["endpoints"]["GET notes"]["latency_ms"]) == {
+        "p50",
+        "p90",
+        "p99",
+        "p99.9",
+        "mean",
+        "max",
+    }
+    assert "total" in format_report(report)
+
+
+def test_run_load_across_processes(stand_in, stand_in_user):
+    report = run_load(
+        stand_in.url,
+        *stand_in_user,
+        mix="list=1,get=1,create=1",
+        concurrency=4,
+        requests=60,
+        rate=500,
+        seed_notes=1,
+        seed=1,
+        processes=2,
+        own_users=True,
+    )
+
+    assert report["config"]["processes"] == 2
+    assert report["totals"]["requests"] == 60
+    assert report["totals"]["errors"] == 0
+    assert sum(stats["requests"] for stats in report["http"].values()) >= 60
@@ -0,0 +1,135 @@
+import json
+
+import pytest
+
+from rest.metrics import (
+    Histogram,
+    RequestHook,
+    RequestMetrics,
+    add_global_hook,
+    endpoint_name,
+    remove_global_hook,
+)
+from rest.notes_rest import NotesRest
+from rest.single_flight import SingleFlight
+
+
+def test_endpoint_name():
+    assert endpoint_name("GET", "notes") == "GET notes"
+    assert endpoint_name("PUT", "notes/65e764e9d1562c00f725454a") == "PUT notes/{id}"
+    assert endpoint_name("GET", "users/42?full=1") == "GET users/{id}"
+
+
+def test_histogram_percentiles_within_precision():
+    histogram = Histogram()
+    for micros in range(1, 10001):
+        histogram.record(micros / 1e6)
+
+    assert histogram.count == 10000
+    assert histogram.percentile(50) == pytest.approx(0.005, rel=0.02)
+    assert histogram.percentile(99) == pytest.approx(0.0099, rel=0.02)
+    assert histogram.percentile(100) == histogram.max == 0.01
+    assert histogram.mean == pytest.approx(0.0050005)
+
+
+def test_histograms_merge_across_processes():
+    fast, slow = Histogram(), Histogram()
+    for _ in range(90):
+        fast.record(0.001)
+    for _ in range(10):
+        slow.record(0.1)
+
+    merged = Histogram.from_dict(json.loads(json.dumps(fast.to_dict())))
+    merged.merge(Histogram.from_dict(slow.to_dict()))
+
+    assert merged.count == 100
+    assert merged.percentile(50) == pytest.approx(0.001, rel=0.02)
+    assert merged.percentile(95) == pytest.approx(0.1, rel=0.02)
+    assert (merged.min, merged.max) == (0.001, 0.1)
+
+
+class Events(RequestHook):
+    def __init__(self):
+        self.events = []
+
+    def before_request(self, context):
+        self.events.append(("before", context.endpoint))
+
+    def after_response(self, context):
+        self.events.append(("after", context.status_code, type(context.error)))
+
+
+def test_request_metrics(stand_in, stand_in_user):
+    metrics = RequestMetrics()
+    events = Events()
+    with NotesRest(stand_in.url, hooks=[metrics, events]) as service:
+        service.get_users_profile(expected_status_code=401)
+        service.post_users_login(*stand_in_user)
+        note = service.post_notes("Metrics", "Measured note", "Home")["data"]
+        for _ in range(3):
+            service.get_note_by_id(note["id"])
+        with pytest.raises(AssertionError):
+            service.get_note_by_id(note["id"], expected_status_code=404)
+
+    snapshot = metrics.snapshot()
+    by_id = snapshot["GET notes/{id}"]
+    assert by_id["requests"] == 4
+    assert by_id["errors"] == 1
+    assert by_id["statuses"] == {200: 4}
+    assert by_id["bytes_received"] > 0
+    assert snapshot["POST notes"]["bytes_sent"] > 0
+    assert snapshot["GET users/profile"]["statuses"] == {401: 1}
+    assert snapshot["GET users/profile"]["timings_ms"]["connect"]["max"] > 0
+    assert (
+        by_id["timings_ms"]["latency"]["p50"]
+        >= by_id["timings_ms"]["server_wait"]["p50"]
+    )
+    assert events.events[:2] == [
+        ("before", "GET users/profile"),
+        ("after", 401, type(None)),
+    ]
+    assert events.events[-1] == ("after", 200, AssertionError)
+
+    text = metrics.prometheus()
+    assert "# TYPE rest_client_latency_seconds summary" in text
+    assert (
+        'rest_client_responses_total{endpoint="GET notes/{id}",status="200"} 4' in text
+    )
+    assert 'rest_client_bytes_total{endpoint="POST notes",direction="sent"}' in text
+
+    merged = RequestMetrics.from_dict(json.loads(json.dumps(metrics.to_dict())))
+    merged.merge(metrics)
+    assert merged.snapshot()["GET notes/{id}"]["requests"] == 8
+
+
+def test_global_hook(stand_in_service):
+    events = Events()
+    add_global_hook(events)
+    try:
+        stand_in_service.get_health_check()
+    finally:
+        remove_global_hook(events)
+    stand_in_service.get_health_check()
+
+    assert events.events == [("before", "GET health-check"), ("after", 200, type(None))]
+
+
+@pytest.mark.parametrize("single_flight", [None, SingleFlight()])
+def test_streamed_requests_observed(stand_in, stand_in_user, single_flight):
+    metrics = RequestMetrics()
+    with NotesRest(
+        stand_in.url, hooks=[metrics], single_flight=single_flight
+    ) as service:
+        service.post_users_login(*stand_in_user)
+        note_id = service.post_notes("Streamed", "Observed", "Home")["data"]["id"]
+        for note in service.iter_notes(chunk_size=16):
+            service.get_note_by_id(note["id"])
+        service.delete_note_by_id(note_id)
+
+    streamed = metrics.snapshot()["GET notes"]
+    assert streamed["requests"] == 1
+    assert streamed["statuses"] == {200: 1}
+    assert streamed["errors"] == 0
+    assert streamed["bytes_received"] > 0
+    assert streamed["timings_ms"]["server_wait"]["max"] > 0
+    assert metrics.snapshot()["GET notes/{id}"]["requests"] == 1
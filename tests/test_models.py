@@ -0,0 +1,58 @@
+from benchmarks.memory import run
+from rest.models import ApiResponse, Note, NoteCollection, User
+
+NOTE = {
+    "id": "65e764e9d1562c00f725454a",
+    "title": "Test Title",
+    "description": "Test Description",
+    "completed": True,
+    "created_at": "2024-03-05T17:32:25.471Z",
+    "updated_at": "2024-03-05T17:32:25.471Z",
+    "category": "Work",
+    "user_id": "65e764e9d1562c00f7254500",
+}
+
+
+def test_note_round_trip():
+    note = Note.from_json(NOTE)
+    assert note.to_json() == NOTE
+    assert not hasattr(note, "__dict__")
+
+
+def test_note_collection():
+    odd = dict(NOTE, id="not-an-object-id", category=None, completed=False)
+    collection = NoteCollection.from_json([NOTE, odd])
+
+    assert len(collection) == 2
+    assert collection[0] == Note.from_json(NOTE)
+    assert collection[-1].to_json() == odd
+    assert collection.ids == [NOTE["id"], "not-an-object-id"]
+    assert [note.completed for note in collection] == [True, False]
+
+
+def test_api_response_types():
+    notes = ApiResponse.from_json({"status": 200, "data": [NOTE]})
+    note = ApiResponse.from_json({"status": 200, "data": NOTE})
+    profile = ApiResponse.from_json(
+        {"status": 200, "data": {"id": "1", "name": "user", "email": "a@b.cc"}}
+    )
+    empty = ApiResponse.from_json({"status": 401, "message": "No token"})
+
+    assert isinstance(notes.data, NoteCollection)
+    assert note.data == Note.from_json(NOTE)
+    assert profile.data == User("1", "user", "a@b.cc")
+    assert empty.data is None
+
+
+def test_iter_notes_into_collection(stand_in_service):
+    stand_in_service.post_notes("Collected note", "Description", "Personal")
+
+    collection = NoteCollection.from_json(stand_in_service.iter_notes())
+
+    assert collection[0].title == "Collected note"
+    assert collection.category(0) == "Personal"
+
+
+def test_compact_layouts_use_less_memory():
+    retained = run(2000)
+    assert retained["NoteCollection"] < retained["Note objects"] < retained["dicts"]
@@ -0,0 +1,70 @@
+from rest.note_index import NoteIndex, tokenize
+from rest.notes_rest import NotesRest
+
+NOTES = [
+    {"id": "1", "title": "Buy milk", "description": "Dairy aisle", "category": "Home"},
+    {
+        "id": "2",
+        "title": "Quarterly report",
+        "description": "Send the report to finance",
+        "category": "Work",
+        "completed": True,
+    },
+    {
+        "id": "3",
+        "title": "Gym",
+        "description": "Leg day, then milk",
+        "category": "Personal",
+    },
+]
+
+
+def _ids(notes):
+    return sorted(note["id"] for note in notes)
+
+
+def test_tokenize():
+    assert tokenize("Leg day, then MILK!") == {"leg", "day", "then", "milk"}
+    assert tokenize(None) == set()
+
+
+def test_query_by_indexes():
+    index = NoteIndex(NOTES)
+
+    assert _ids(index.query(category="Home")) == ["1"]
+    assert _ids(index.query(completed=False)) == ["1", "3"]
+    assert _ids(index.query(text="milk")) == ["1", "3"]
+    assert _ids(index.query(text="milk day", category="Personal")) == ["3"]
+    assert index.query(text="milk", completed=True) == []
+    assert len(index.query()) == 3
+
+
+def test_incremental_updates():
+    index = NoteIndex(NOTES)
+    index.add(dict(NOTES[0], title="Buy bread", completed=True))
+    index.discard("2")
+
+    assert index.query(text="milk", category="Home") == []
+    assert _ids(index.query(text="bread", completed=True)) == ["1"]
+    assert index.query(text="report") == []
+    assert "2" not in index
+
+
+def test_index_follows_service(stand_in, stand_in_user):
+    index = NoteIndex()
+    with NotesRest(stand_in.url, note_index=index) as service:
+        service.post_users_login(*stand_in_user)
+        home = service.post_notes("Water plants", "Balcony plants", "Home")["data"]
+        work = service.post_notes("Plan sprint", "Sprint planning", "Work")["data"]
+        assert _ids(index.query(text="plants")) == [home["id"]]
+
+        service.put_note_by_id(work["id"], "Plan sprint", "Review plants", True, "Work")
+        service.patch_note_by_id(home["id"], True)
+        assert _ids(index.query(text="plants", completed=True)) == _ids([home, work])
+
+        service.delete_note_by_id(home["id"])
+        assert _ids(index.query(text="plants")) == [work["id"]]
+
+        index.reset()
+        service.get_notes()
+        assert _ids(index.query(category="Work")) == [work["id"]]
@@ -30,7 +30,7 @@ def test_create_note_invalid_category(authenticated_notes_service):
     )
 
 
-def test_get_notes(authenticated_notes_service):
+def test_get_notes(authenticated_notes_service, prepared_note):
     response = authenticated_notes_service.get_notes()
     assert response["message"] == "Notes successfully retrieved"
     assert len(response["data"]) > 0
@@ -0,0 +1,99 @@
+import json
+from threading import Thread
+
+from rest.notes_rest import NotesRest
+from rest.perf_gate import PerfRecorder, compare, summarize
+
+HEALTH_TEST = """
+from rest.notes_rest import NotesRest
+from rest.stand_in import NotesApiServer
+
+
+def test_health():
+    with NotesApiServer() as server, NotesRest(server.url) as service:
+        for _ in range(5):
+            service.get_health_check()
+"""
+
+
+def test_recorder_summary(stand_in):
+    recorder = PerfRecorder()
+    with NotesRest(stand_in.url, hooks=[recorder]) as service:
+        service.get_health_check()
+        recorder.current_test = "tests/test_a.py::test_a"
+        for _ in range(3):
+            service.get_health_check()
+
+        background = Thread(target=service.get_health_check)
+        background.start()
+        background.join()
+
+    merged = PerfRecorder.from_dict(json.loads(json.dumps(recorder.to_dict())))
+    summary = summarize(merged.merge(recorder))
+
+    assert summary["endpoints"]["GET health-check"]["requests"] == 10
+    assert summary["tests"]["tests/test_a.py::test_a"]["requests"] == 6
+    assert set(summary["tests"]["tests/test_a.py::test_a"]) == {
+        "requests",
+        "p50",
+        "p90",
+        "p95",
+        "p99",
+        "total",
+    }
+
+
+def test_compare_thresholds():
+    baseline = {
+        "endpoints": {
+            "GET notes": {"requests": 10, "p90": 2.0},
+            "GET notes/{id}": {"requests": 10, "p90": 2.0},
+            "POST notes": {"requests": 2, "p90": 2.0},
+            "PUT notes/{id}": {"requests": 10, "p90": 0.1},
+        },
+        "tests": {"tests/test_a.py::test_a": {"requests": 10, "total": 10.0}},
+    }
+    summary = {
+        "endpoints": {
+            "GET notes": {"requests": 10, "p90": 6.0},
+            "GET notes/{id}": {"requests": 10, "p90": 2.5},
+            "POST notes": {"requests": 10, "p90": 9.0},
+            "PUT notes/{id}": {"requests": 10, "p90": 0.9},
+            "DELETE notes/{id}": {"requests": 10, "p90": 9.0},
+        },
+        "tests": {"tests/test_a.py::test_a": {"requests": 10, "total": 20.0}},
+    }
+
+    regressions = compare(summary, baseline, percentile=90, threshold=1.5)
+
+    assert [(r["kind"], r["name"], r["ratio"]) for r in regressions] == [
+        ("endpoint", "GET notes", 3.0),
+        ("test", "tests/test_a.py::test_a", 2.0),
+    ]
+
+
+def test_gate_fails_run_on_regression(pytester):
+    pytester.makepyfile(test_health=HEALTH_TEST)
+    pytester.makeini("[pytest]\nperf_min_samples = 1\nperf_min_delta_ms = 0\n")
+
+    saved = pytester.runpytest("-p", "rest.perf_gate", "--perf-save-baseline")
+    saved.assert_outcomes(passed=1)
+    baseline = json.loads((pytester.path / "perf_baseline.json").read_text())
+    assert baseline["endpoints"]["GET health-check"]["requests"] == 5
+
+    for timings in baseline["endpoints"].values():
+        timings["p90"] = 0.001
+    for timings in baseline["tests"].values():
+        timings["total"] = 1e6
+    (pytester.path / "perf_baseline.json").write_text(json.dumps(baseline))
+
+    warned = pytester.runpytest("-p", "rest.perf_gate", "--perf-gate", "warn")
+    warned.assert_outcomes(passed=1)
+    warned.stdout.fnmatch_lines(["*perf gate*", "*GET health-check*", "*1 perf*"])
+
+    failed = pytester.runpytest(
+        "-p", "rest.perf_gate", "--perf-gate", "fail", "--perf-report", "report.json"
+    )
+    assert failed.ret == 1
+    report = json.loads((pytester.path / "report.json").read_text())
+    assert report["regressions"][0]["name"] == "GET health-check"
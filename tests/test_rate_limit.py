@@ -0,0 +1,62 @@
+import time
+from multiprocessing import get_context
+
+from rest.notes_rest import NotesRest
+from rest.rate_limit import FileTokenBucket, RateLimiter, TokenBucket
+
+
+def test_token_bucket_waits_for_refill(fake_clock):
+    bucket = TokenBucket(rate=10, capacity=2, clock=fake_clock, sleep=fake_clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(4)]
+
+    assert waits[:2] == [0, 0]
+    assert round(fake_clock.now, 6) == 0.2
+    assert not bucket.try_acquire()
+
+
+def test_rate_limiter_picks_most_specific_bucket():
+    login, notes, note_writes = TokenBucket(1), TokenBucket(1), TokenBucket(1)
+    limiter = RateLimiter(
+        endpoints={"users/login": login, "notes": notes, "PUT notes": note_writes}
+    )
+
+    assert limiter.bucket_for("POST", "users/login") is login
+    assert limiter.bucket_for("GET", "notes/1") is notes
+    assert limiter.bucket_for("PUT", "notes/1") is note_writes
+    assert limiter.bucket_for("GET", "notes-archive") is None
+    assert limiter.bucket_for("GET", "health-check") is None
+
+
+def _drain(path, count):
+    bucket = FileTokenBucket(path, rate=50, capacity=5)
+    for _ in range(count):
+        bucket.acquire()
+
+
+def test_file_bucket_shared_between_processes(tmp_path):
+    path = tmp_path / "bucket"
+    FileTokenBucket(path, rate=50, capacity=5).close()
+    context = get_context("spawn")
+    started = time.monotonic()
+    processes = [context.Process(target=_drain, args=(path, 10)) for _ in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert all(process.exitcode == 0 for process in processes)
+    assert time.monotonic() - started >= (30 - 5) / 50
+
+
+def test_client_waits_for_rate_limiter(stand_in_service, stand_in):
+    limiter = RateLimiter(default=TokenBucket(rate=20, capacity=1))
+    service = NotesRest(stand_in.url, rate_limiter=limiter)
+    service._token = stand_in_service._token
+    started = time.monotonic()
+
+    for _ in range(6):
+        service.get_notes()
+
+    assert time.monotonic() - started >= 0.25
+    assert limiter.snapshot()["waits"] == 5
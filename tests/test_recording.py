@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from rest.notes_rest import NotesRest
+from rest.recording import Recorder, Replayer, ReplayMissError
+
+
+def test_record_and_replay(stand_in, stand_in_user, tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    with Recorder(path) as recorder:
+        with NotesRest(stand_in.url, recorder=recorder) as service:
+            service.post_users_login(*stand_in_user)
+            note = service.post_notes("Recorded note", "Description", "Work")["data"]
+            service.delete_note_by_id(note["id"])
+            service.get_note_by_id(note["id"], expected_status_code=404)
+
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(entry["method"], entry["status"]) for entry in entries] == [
+        ("POST", 200),
+        ("POST", 200),
+        ("DELETE", 200),
+        ("GET", 404),
+    ]
+    assert entries[1]["data"] == {
+        "title": "Recorded note",
+        "description": "Description",
+        "category": "Work",
+    }
+
+    replayer = Replayer(path)
+    assert len(replayer) == 4
+    with NotesRest("http://127.0.0.1:9/notes/api/", replayer=replayer) as service:
+        service.post_users_login(*stand_in_user)
+        response = service.post_notes("Recorded note", "Description", "Work")
+        assert response["data"] == note
+        service.delete_note_by_id(note["id"])
+        response = service.get_note_by_id(note["id"], expected_status_code=404)
+        assert response["message"] == (
+            "No note was found with the provided ID, Maybe it was deleted"
+        )
+        with pytest.raises(ReplayMissError):
+            service.get_notes()
+        assert service.connection_stats["requests"] == 0
+
+
+def test_replay_serves_identical_requests_in_order(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    with Recorder(path) as recorder:
+        for status in (200, 404):
+            recorder.record("GET", "notes/1", status, b'{"status": 0}', 0.001)
+    replayer = Replayer(path)
+
+    statuses = [replayer.lookup("GET", "notes/1")[0] for _ in range(3)]
+
+    assert statuses == [200, 404, 404]
+
+
+def test_recording_redacts_secrets(stand_in, tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    email, password = "redacted@example.com", "old-secret"
+    stand_in.state.add_user("redacted", email, password)
+    with Recorder(path) as recorder:
+        with NotesRest(stand_in.url, recorder=recorder) as service:
+            token = service.post_users_login(email, password)["data"]["token"]
+            service.post_users_change_password(
+                password, "new-secret", expected_status_code=200
+            )
+            service.get_users_profile()
+
+    text = path.read_text()
+    assert password not in text
+    assert "new-secret" not in text
+    assert token not in text
+    entries = [json.loads(line) for line in text.splitlines()]
+    assert entries[0]["json"] == {"email": email, "password": "[REDACTED]"}
+    assert entries[2]["headers"] == {"x-auth-token": "[REDACTED]"}
+
+    with NotesRest("http://127.0.0.1:9/notes/api/", replayer=Replayer(path)) as service:
+        service.post_users_login(email, "other password")
+        service.post_users_change_password("a", "b", expected_status_code=200)
+        assert service.get_users_profile()["data"]["email"] == email
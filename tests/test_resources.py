@@ -0,0 +1,96 @@
+from uuid import uuid4
+
+from rest.notes_rest import NotesRest
+from rest.resources import ResourceRegistry, purge_notes, sweep
+from rest.token_store import TokenStore
+
+
+def test_registry_tracks_created_and_deleted_resources(stand_in, stand_in_user):
+    registry = ResourceRegistry()
+    with NotesRest(stand_in.url, resource_registry=registry) as service:
+        service.post_users_login(*stand_in_user)
+        kept = service.post_notes("Kept", "Tracked", "Home")["data"]["id"]
+        removed = service.post_notes("Removed", "Untracked", "Home")["data"]["id"]
+        service.delete_note_by_id(removed)
+
+        email = f"{uuid4().hex}@example.com"
+        service.post_users_register("sweep_user", email, "password")
+        service.post_users_login(email, "password")
+        service.post_notes("Owned", "Removed with the account", "Work")
+        service.delete_users_delete_account()
+
+    notes, users = registry.drain()
+    assert list(notes) == [kept]
+    assert users == {}
+    assert len(registry) == 0
+
+
+def test_sweep_deletes_tracked_resources(stand_in, stand_in_user):
+    registry = ResourceRegistry()
+    emails = [f"{uuid4().hex}@example.com" for _ in range(3)]
+    with NotesRest(stand_in.url, resource_registry=registry) as service:
+        for email in emails:
+            service.post_users_register("sweep_user", email, "password")
+        service.post_users_login(*stand_in_user)
+        for index in range(10):
+            service.post_notes(f"Note {index}", "Swept", "Home")
+
+        report = sweep(registry, lambda: NotesRest(stand_in.url), concurrency=4)
+
+        assert len(report) == 13
+        assert not report.failed
+        assert service.get_notes()["data"] == []
+        for email in emails:
+            service.post_users_login(email, "password", expected_status_code=401)
+    assert len(registry) == 0
+
+
+def test_sweep_reports_already_deleted_resources(stand_in_service, stand_in_user):
+    registry = ResourceRegistry()
+    note_id = stand_in_service.post_notes("Note", "Gone", "Home")["data"]["id"]
+    registry.bind_token(stand_in_service._token, *stand_in_user)
+    registry.track_note(stand_in_service._token, note_id)
+    stand_in_service.delete_note_by_id(note_id)
+
+    report = sweep(registry, lambda: NotesRest(stand_in_service.BASE_URL))
+
+    assert [result.item for result in report.failed] == [("note", note_id)]
+
+
+def test_sweep_logs_in_again_after_logout(stand_in, stand_in_user, tmp_path):
+    registry = ResourceRegistry()
+    token_store = TokenStore(tmp_path / "tokens.json")
+    with NotesRest(
+        stand_in.url, token_store=token_store, resource_registry=registry
+    ) as service:
+        service.authenticate(*stand_in_user)
+        for index in range(3):
+            service.post_notes(f"Note {index}", "Created before logout", "Home")
+        service.delete_users_logout()
+        service.authenticate(*stand_in_user)
+        service.post_notes("After", "Created with a new token", "Home")
+        service.delete_users_logout()
+
+        report = sweep(
+            registry,
+            lambda: NotesRest(stand_in.url, token_store=token_store),
+            concurrency=2,
+        )
+
+        assert len(report.succeeded) == 4
+        assert not report.failed
+        service.post_users_login(*stand_in_user)
+        assert service.get_notes()["data"] == []
+    assert len(registry) == 0
+
+
+def test_purge_notes(stand_in_service):
+    stand_in_service.create_notes_many(
+        {"title": f"Leftover {index}", "description": "Old note", "category": "Work"}
+        for index in range(12)
+    ).wait()
+
+    report = purge_notes(stand_in_service, concurrency=4)
+
+    assert len(report.succeeded) == 12
+    assert stand_in_service.get_notes()["data"] == []
@@ -0,0 +1,32 @@
+from rest.notes_rest import NotesRest
+
+
+def test_session_pool_configuration():
+    service = NotesRest(pool_connections=2, pool_maxsize=32, pool_block=True)
+    adapter = service._transport.session.get_adapter(service.BASE_URL)
+    assert adapter is service._transport.adapter
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == 32
+    assert adapter.poolmanager.connection_pool_kw["block"] is True
+    service.close()
+
+
+def test_keep_alive_disabled():
+    with NotesRest(keep_alive=False) as service:
+        assert service._transport.session.headers["Connection"] == "close"
+
+
+def test_connection_stats_start_empty():
+    with NotesRest() as service:
+        assert service.connection_stats == {
+            "requests": 0,
+            "new_connections": 0,
+            "reused_connections": 0,
+        }
+
+
+def test_connections_reused(stand_in_service):
+    for _ in range(5):
+        stand_in_service.get_health_check()
+    stats = stand_in_service.connection_stats
+    assert stats["new_connections"] == 1
+    assert stats["reused_connections"] == stats["requests"] - 1
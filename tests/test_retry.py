@@ -0,0 +1,164 @@
+import pytest
+import requests
+
+from rest.notes_rest import NotesRest
+from rest.retry import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    RetryPolicy,
+    parse_retry_after,
+)
+
+
+def no_sleep(delay):
+    pass
+
+
+def test_backoff_grows_and_is_capped():
+    policy = RetryPolicy(backoff_factor=0.5, max_backoff=3, jitter=False)
+    assert [policy.backoff(attempt) for attempt in range(4)] == [0.5, 1, 2, 3]
+    assert policy.backoff(0, retry_after="7") == 3
+    jittered = RetryPolicy(backoff_factor=1)
+    assert all(0 <= jittered.backoff(2) <= 4 for _ in range(20))
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("soon") is None
+
+
+def test_idempotency_aware():
+    policy = RetryPolicy(total=2)
+    assert policy.should_retry("GET", 0, 503)
+    assert policy.should_retry("delete", 1)
+    assert not policy.should_retry("GET", 2, 503)
+    assert not policy.should_retry("POST", 0, 503)
+    assert not policy.should_retry("GET", 0, 500)
+
+
+def test_circuit_breaker_states(fake_clock):
+    clock = fake_clock
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    clock.now = 10
+    assert breaker.state == "half-open"
+    breaker.before_request()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_retries_transient_errors(stand_in, stand_in_user):
+    with NotesRest(
+        stand_in.url, retry_policy=RetryPolicy(total=3, sleep=no_sleep)
+    ) as service:
+        service.post_users_login(*stand_in_user)
+        stand_in.state.fail_next(2, status=503)
+        assert service.get_notes()["message"] == "Notes successfully retrieved"
+
+        stand_in.state.fail_next(1, status=429, message="Too many requests")
+        service.post_notes("Not retried", "Description", "Home", 429)
+
+        stand_in.state.fail_next(4, status=502)
+        service.get_notes(expected_status_code=502)
+
+        assert service.retry_stats == {
+            "retries": 5,
+            "by_reason": {503: 2, 502: 3},
+            "gave_up": 1,
+            "rejected_by_breaker": 0,
+        }
+
+
+def test_retry_after_is_honored(stand_in, stand_in_user):
+    delays = []
+    policy = RetryPolicy(sleep=delays.append, max_backoff=60)
+    with NotesRest(stand_in.url, retry_policy=policy) as service:
+        service.post_users_login(*stand_in_user)
+        stand_in.state.fail_next(1, status=429, retry_after=12)
+        service.get_notes()
+    assert delays == [12]
+
+
+def test_circuit_breaker_fails_fast(stand_in, stand_in_user):
+    breakers = CircuitBreakerRegistry(failure_threshold=3, reset_timeout=60)
+    with NotesRest(stand_in.url, circuit_breakers=breakers) as service:
+        service.post_users_login(*stand_in_user)
+        stand_in.state.fail_next(3, status=503)
+        for _ in range(3):
+            service.get_notes(expected_status_code=503)
+        with pytest.raises(CircuitOpenError):
+            service.get_notes()
+        stats = service.retry_stats
+    assert stats["rejected_by_breaker"] == 1
+    (host_stats,) = stats["circuit_breakers"].values()
+    assert host_stats["state"] == "open"
+
+
+def test_connection_errors_retried():
+    with NotesRest(
+        "http://127.0.0.1:9/notes/api/",
+        retry_policy=RetryPolicy(total=2, sleep=no_sleep),
+    ) as service:
+        with pytest.raises(requests.ConnectionError):
+            service.get_health_check()
+        assert service.retry_stats["retries"] == 2
+        assert service.retry_stats["gave_up"] == 1
+
+
+def test_unexpected_error_frees_breaker_without_failure(
+    stand_in, stand_in_user, monkeypatch, fake_clock
+):
+    clock = fake_clock
+    breakers = CircuitBreakerRegistry(
+        failure_threshold=1, reset_timeout=10, clock=clock
+    )
+    with NotesRest(stand_in.url, circuit_breakers=breakers) as service:
+        service.post_users_login(*stand_in_user)
+        stand_in.state.fail_next(1, status=503)
+        service.get_notes(expected_status_code=503)
+        clock.now = 10
+
+        def broken_body(*args, **kwargs):
+            raise requests.exceptions.ChunkedEncodingError()
+
+        with monkeypatch.context() as patch:
+            patch.setattr(service._transport, "request", broken_body)
+            with pytest.raises(requests.exceptions.ChunkedEncodingError):
+                service.get_notes()
+        assert service.get_notes()["status"] == 200
+
+        with pytest.raises(TypeError):
+            service._get("notes", unknown_option=True)
+        with monkeypatch.context() as patch:
+            patch.setattr(service._transport, "request", broken_body)
+            with pytest.raises(requests.exceptions.ChunkedEncodingError):
+                service.get_notes()
+        assert service.get_notes()["status"] == 200
+
+        stand_in.state.fail_next(1, status=503)
+        service.get_notes(expected_status_code=503)
+        with pytest.raises(CircuitOpenError):
+            service.get_notes()
+        clock.now = 20
+
+        class FailingLimiter:
+            def acquire(self, method, path):
+                raise RuntimeError("limiter failed")
+
+        service._rate_limiter = FailingLimiter()
+        with pytest.raises(RuntimeError):
+            service.get_notes()
+        service._rate_limiter = None
+        assert service.get_notes()["status"] == 200
+        (host_stats,) = service.retry_stats["circuit_breakers"].values()
+    assert host_stats["state"] == "closed"
@@ -0,0 +1,138 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier, Event
+
+import pytest
+
+from rest.async_notes_rest import AsyncNotesRest
+from rest.notes_rest import NotesRest
+from rest.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_single_flight_shares_result():
+    flight = SingleFlight()
+    release = Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait()
+        return "result"
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(flight.do, "key", fetch) for _ in range(4)]
+        while flight.collapsed < 3:
+            time.sleep(0.001)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert results == ["result"] * 4
+    assert calls == [1]
+    assert flight.stats == {"executed": 1, "collapsed": 3}
+    assert flight.do("key", lambda: "again") == "again"
+
+
+def test_single_flight_shares_exception():
+    flight = SingleFlight()
+    release = Event()
+
+    def fail():
+        release.wait()
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(2) as pool:
+        futures = [pool.submit(flight.do, "key", fail) for _ in range(2)]
+        while flight.collapsed < 1:
+            time.sleep(0.001)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+
+
+def test_async_single_flight_shares_result():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def scenario():
+        return await asyncio.gather(
+            *(flight.do("key", fetch) for _ in range(5)),
+            flight.do("other", fetch),
+        )
+
+    results = asyncio.run(scenario())
+
+    assert results == ["result"] * 6
+    assert len(calls) == 2
+    assert flight.stats == {"executed": 2, "collapsed": 4}
+
+
+def test_concurrent_get_notes_collapsed(stand_in, stand_in_user):
+    flight = SingleFlight()
+    barrier = Barrier(5)
+    with NotesRest(stand_in.url, single_flight=flight) as service:
+        service.post_users_login(*stand_in_user)
+        service.post_notes("Shared", "Fetched once", "Home")
+        open_ = service._open
+
+        def slow_open(*args, **kwargs):
+            time.sleep(0.05)
+            return open_(*args, **kwargs)
+
+        service._open = slow_open
+
+        def fetch(_):
+            barrier.wait()
+            return service.get_notes()
+
+        with ThreadPoolExecutor(5) as pool:
+            responses = list(pool.map(fetch, range(5)))
+
+    assert all(response == responses[0] for response in responses)
+    assert flight.executed + flight.collapsed == 5
+    assert flight.collapsed >= 1
+
+
+def test_async_get_notes_collapsed(stand_in, stand_in_user):
+    flight = AsyncSingleFlight()
+
+    async def scenario():
+        async with AsyncNotesRest(stand_in.url, single_flight=flight) as service:
+            await service.post_users_login(*stand_in_user)
+            await service.post_notes("Shared", "Fetched once", "Home")
+            return await asyncio.gather(*(service.get_notes() for _ in range(10)))
+
+    responses = asyncio.run(scenario())
+
+    assert all(response == responses[0] for response in responses)
+    assert flight.stats == {"executed": 1, "collapsed": 9}
+
+
+def test_async_waiter_takes_over_cancelled_call():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def scenario():
+        leader = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(flight.do("key", fetch)) for _ in range(2)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(scenario()) == ["result", "result"]
+    assert len(calls) == 2
+    assert flight.stats == {"executed": 2, "collapsed": 2}
@@ -0,0 +1,25 @@
+from rest.notes_rest import NotesRest
+
+
+def test_reset_password_flow(stand_in):
+    email = "reset@example.com"
+    stand_in.state.add_user("reset_user", email, "password")
+    with NotesRest(stand_in.url) as service:
+        service.post_users_forgot_password(email)
+        (token,) = [
+            key for key, owner in stand_in.state.reset_tokens.items() if owner == email
+        ]
+        response = service.post_users_verify_reset_password_token(token)
+        assert response["message"] == "The provided password reset token is valid"
+        response = service.post_users_reset_password(token, "new-password")
+        assert response["message"] == "The password has been reset successfully"
+        service.post_users_login(email, "new-password")
+
+
+def test_unknown_token_rejected(stand_in):
+    with NotesRest(stand_in.url) as service:
+        service._token = "invalid"
+        response = service.get_notes(expected_status_code=401)
+    assert response["message"] == (
+        "Access token is not valid or has expired, you will need to login"
+    )
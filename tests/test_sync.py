@@ -0,0 +1,73 @@
+import time
+from threading import Event, Thread
+
+from rest.sync import NotesMirror
+
+
+def test_incremental_sync(stand_in_service, tmp_path):
+    created = stand_in_service.create_notes_many(
+        {"title": f"Mirrored {i}", "description": "Mirror", "category": "Home"}
+        for i in range(5)
+    )
+    note_ids = [result.response["data"]["id"] for result in created.succeeded]
+
+    with NotesMirror(stand_in_service, tmp_path / "mirror.db") as mirror:
+        first = mirror.sync()
+        assert (first.added, first.updated, first.deleted) == (5, 0, 0)
+        assert mirror.synced_at is not None
+
+        time.sleep(0.002)
+        stand_in_service.patch_note_by_id(note_ids[0], True)
+        stand_in_service.delete_note_by_id(note_ids[1])
+        stand_in_service.post_notes("Mirrored new", "Mirror", "Work")
+        second = mirror.sync()
+        assert (second.added, second.updated, second.deleted) == (1, 1, 1)
+        assert second.unchanged == 3
+
+        requests_sent = stand_in_service.connection_stats["requests"]
+        assert mirror.count() == 5
+        assert mirror.get(note_ids[0])["completed"] is True
+        assert mirror.get(note_ids[1]) is None
+        assert [note["title"] for note in mirror.notes(category="Work")] == [
+            "Mirrored new"
+        ]
+        assert len(mirror.notes(category="Home", completed=False)) == 3
+        assert stand_in_service.connection_stats["requests"] == requests_sent
+
+    with NotesMirror(
+        stand_in_service, tmp_path / "mirror.db", user_id=mirror.user_id
+    ) as reopened:
+        assert reopened.count() == 5
+        assert reopened.sync().changed == 0
+
+
+class SlowListing:
+    """
+    Service whose list of notes downloads until `release` is set
+    """
+
+    def __init__(self):
+        self.downloading = Event()
+        self.release = Event()
+
+    def iter_notes(self):
+        self.downloading.set()
+        assert self.release.wait(5)
+        yield {"id": "1", "title": "Slow", "updated_at": "2024-01-01T00:00:00Z"}
+
+
+def test_reads_not_blocked_by_download():
+    service = SlowListing()
+    with NotesMirror(service, user_id="user") as mirror:
+        syncing = Thread(target=mirror.sync)
+        syncing.start()
+        assert service.downloading.wait(5)
+
+        started = time.monotonic()
+        assert mirror.count() == 0
+        assert mirror.synced_at is None
+        assert time.monotonic() - started < 1
+
+        service.release.set()
+        syncing.join()
+        assert mirror.get("1")["title"] == "Slow"
@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from rest.notes_rest import NotesRest
+from rest.token_store import TokenStore
+
+
+def test_login_once_per_credential(stand_in, stand_in_user, tmp_path):
+    store = TokenStore(tmp_path / "tokens.json")
+    services = [NotesRest(stand_in.url, token_store=store) for _ in range(8)]
+
+    with ThreadPoolExecutor(4) as executor:
+        tokens = set(
+            executor.map(lambda service: service.authenticate(*stand_in_user), services)
+        )
+
+    assert len(tokens) == 1
+    assert sum(service.connection_stats["requests"] for service in services) == 1
+    assert services[0].get_users_profile()["data"]["email"] == stand_in_user[0]
+
+
+def test_relogin_after_logout(stand_in, stand_in_user, tmp_path):
+    store = TokenStore(tmp_path / "tokens.json")
+    first = NotesRest(stand_in.url, token_store=store)
+    second = NotesRest(stand_in.url, token_store=store)
+    first.authenticate(*stand_in_user)
+    second.authenticate(*stand_in_user)
+    stale_token = second._token
+
+    first.delete_users_logout()
+    assert store.get(first, stand_in_user[0]) is None
+
+    response = second.get_notes()
+    assert response["message"] == "Notes successfully retrieved"
+    assert second._token != stale_token
+    assert store.get(second, stand_in_user[0]) == second._token
+
+
+def test_expected_unauthorized_not_retried(stand_in, stand_in_user, tmp_path):
+    store = TokenStore(tmp_path / "tokens.json")
+    service = NotesRest(stand_in.url, token_store=store)
+    service.authenticate(*stand_in_user)
+    service._token = "invalid"
+
+    service.get_notes(expected_status_code=401)
+
+    assert store.get(service, stand_in_user[0]) is not None
@@ -0,0 +1,143 @@
+from http.client import RemoteDisconnected
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+import pytest
+
+from benchmarks.transports import run
+from rest.notes_rest import NotesRest
+from rest.retry import RetryPolicy
+from rest.transport import TRANSPORTS, HttpClientTransport, encode_request
+
+
+def test_encode_request():
+    url, headers, body = encode_request(
+        "http://host/notes?a=1",
+        {"x-auth-token": None, "Accept": "*/*"},
+        params={"page": 2, "skip": None},
+        data={"title": "A & B", "category": None},
+    )
+    assert url == "http://host/notes?a=1&page=2"
+    assert headers == {
+        "Accept": "*/*",
+        "Content-Type": "application/x-www-form-urlencoded",
+    }
+    assert body == b"title=A+%26+B"
+
+    _, headers, body = encode_request("http://host/", json={"completed": True})
+    assert headers == {"Content-Type": "application/json"}
+    assert body == b'{"completed": true}'
+    assert encode_request("http://host/", data={}, json=None)[2] is None
+
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+def test_transport_round_trip(stand_in, stand_in_user, transport):
+    with NotesRest(stand_in.url, transport=transport) as service:
+        service.get_users_profile(expected_status_code=401)
+        service.post_users_login(*stand_in_user)
+        note = service.post_notes("Transport", "Form encoded", "Home")["data"]
+        service.put_note_by_id(note["id"], "Transport", "Json body", True, "Work")
+
+        notes = service.get_notes()["data"]
+        streamed = list(service.iter_notes(chunk_size=16))
+        service.get_health_check()
+
+        assert [n["description"] for n in notes] == ["Json body"]
+        assert streamed == notes
+        stats = service.connection_stats
+        assert stats["requests"] == 7
+        assert stats["new_connections"] == 1
+
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+def test_transport_keep_alive_disabled(stand_in, transport):
+    with NotesRest(stand_in.url, keep_alive=False, transport=transport) as service:
+        for _ in range(3):
+            service.get_health_check()
+        assert service.connection_stats["new_connections"] == 3
+
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+def test_transport_request_options(stand_in, transport):
+    with NotesRest(stand_in.url, transport=transport) as service:
+        if transport == "requests":
+            response = service._get("health-check", allow_redirects=False)
+            assert response["success"]
+        else:
+            with pytest.raises(TypeError, match="allow_redirects"):
+                service._get("health-check", allow_redirects=False)
+
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+def test_transport_connection_errors_retried(transport):
+    sleeps = []
+    policy = RetryPolicy(total=2, jitter=False, sleep=sleeps.append)
+    service = NotesRest(
+        "http://127.0.0.1:9/notes/api/", retry_policy=policy, transport=transport
+    )
+    with pytest.raises(service._transport.connection_errors):
+        service.get_health_check()
+    assert len(sleeps) == 2
+    assert service.retry_stats["gave_up"] == 1
+    service.close()
+
+
+class DroppingHandler(BaseHTTPRequestHandler):
+    """
+    Keeps connections alive but drops them without a response on /drop,
+    after reading the request
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def respond(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.received.append(f"{self.command} {self.path}")
+        if self.path == "/drop":
+            self.close_connection = True
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    do_GET = do_POST = respond
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def dropping_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DroppingHandler)
+    server.received = []
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize(
+    "method, received",
+    [("GET", ["GET /", "GET /drop", "GET /drop"]), ("POST", ["GET /", "POST /drop"])],
+)
+def test_http_client_resends_only_idempotent_requests(
+    dropping_server, method, received
+):
+    url = f"http://127.0.0.1:{dropping_server.server_port}/"
+    transport = HttpClientTransport()
+    transport.request("GET", url, {})
+    with pytest.raises(RemoteDisconnected):
+        transport.request(method, url + "drop", {}, b"{}")
+    transport.close()
+
+    assert dropping_server.received == received
+
+
+def test_transport_benchmark():
+    results = run(requests=20, concurrency=2, notes=2)
+
+    assert list(results) == list(TRANSPORTS)
+    for result in results.values():
+        assert result["requests"] == 20
+        assert result["cpu_us_per_request"] > 0
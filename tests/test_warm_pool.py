@@ -0,0 +1,87 @@
+import time
+from itertools import count
+from threading import Event, Timer
+from uuid import uuid4
+
+from rest.notes_rest import NotesRest
+from rest.warm_pool import WarmPool, size_for_workers
+
+
+def test_size_for_workers():
+    assert size_for_workers(8, workers=1) == 8
+    assert size_for_workers(8, workers=4) == 2
+    assert size_for_workers(2, workers=4) == 1
+
+
+def test_pool_hands_out_ready_resources_and_refills():
+    counter = count()
+    pool = WarmPool(lambda: next(counter), size=3)
+    while pool.stats["ready"] < 3:
+        time.sleep(0.001)
+    taken = [pool.take() for _ in range(3)]
+    while pool.stats["in_flight"]:
+        time.sleep(0.001)
+    stats = pool.stats
+
+    assert sorted(taken) == [0, 1, 2]
+    assert stats == {"ready": 3, "in_flight": 0, "hits": 3, "misses": 0, "failures": 0}
+    assert sorted(pool.close()) == [3, 4, 5]
+
+
+def test_pool_waits_for_resource_in_flight():
+    release = Event()
+    counter = count()
+
+    def slow():
+        release.wait()
+        return next(counter)
+
+    pool = WarmPool(slow, size=1)
+    Timer(0.02, release.set).start()
+    assert pool.take() == 0
+    assert pool.stats["misses"] == 1
+    pool.close()
+
+
+def test_pool_provisions_synchronously_after_failure():
+    calls = count()
+
+    def flaky():
+        if next(calls) == 0:
+            raise ConnectionError("down")
+        return "resource"
+
+    pool = WarmPool(flaky, size=1, concurrency=1)
+    assert pool.take() == "resource"
+    assert pool.stats["failures"] == 1
+    pool.close()
+
+
+def test_pools_of_notes_and_users(stand_in, stand_in_service):
+    def register():
+        email = f"{uuid4().hex}@example.com"
+        service = NotesRest(stand_in.url)
+        service.post_users_register("test_rest_api", email, "password")
+        service.post_users_login(email, "password")
+        return service
+
+    note_pool = WarmPool(
+        lambda: stand_in_service.post_notes("Test Title", "Test Description", "Home")[
+            "data"
+        ],
+        size=2,
+    )
+    user_pool = WarmPool(register, size=1)
+    note = note_pool.take()
+    user = user_pool.take()
+
+    assert note["title"] == "Test Title"
+    assert user.get_users_profile()["status"] == 200
+    assert note_pool.stats["hits"] + note_pool.stats["misses"] == 1
+    assert user_pool.stats["hits"] + user_pool.stats["misses"] == 1
+    for service in [user, *user_pool.close()]:
+        service.delete_users_delete_account()
+        service.close()
+    for leftover in [note, *note_pool.close()]:
+        stand_in_service.delete_note_by_id(leftover["id"])
+    assert stand_in_service.get_notes()["data"] == []
@@ -0,0 +1,91 @@
+import pytest
+
+from rest.write_behind import WriteBehindQueue
+
+
+class FakeService:
+    def __init__(self):
+        self.requests = []
+
+    def put_note_by_id(self, note_id, expected_status_code=200, **fields):
+        self.requests.append(("PUT", note_id, fields))
+        return {"status": 200, "data": {"id": note_id, **fields}}
+
+    def patch_note_by_id(self, note_id, completed, expected_status_code=200):
+        if note_id == "missing":
+            raise AssertionError("404")
+        self.requests.append(("PATCH", note_id, {"completed": completed}))
+        return {"status": 200, "data": {"id": note_id, "completed": completed}}
+
+
+def test_patches_collapse_into_last_patch():
+    service = FakeService()
+    with WriteBehindQueue(service, window=60) as queue:
+        futures = [queue.patch("a", completed) for completed in (True, False, True)]
+        assert queue.flush() == 1
+
+    assert service.requests == [("PATCH", "a", {"completed": True})]
+    assert {future.result()["data"]["completed"] for future in futures} == {True}
+    assert queue.stats == {"queued": 3, "sent": 1, "pending": 0}
+
+
+def test_patch_and_put_merge_into_put():
+    service = FakeService()
+    with WriteBehindQueue(service, window=60) as queue:
+        queue.patch("a", False)
+        queue.put("a", "Title", "Text", False, "Home")
+        queue.patch("a", True)
+        queue.patch("b", True)
+
+    assert sorted(service.requests) == [
+        (
+            "PATCH",
+            "b",
+            {"completed": True},
+        ),
+        (
+            "PUT",
+            "a",
+            {
+                "title": "Title",
+                "description": "Text",
+                "completed": True,
+                "category": "Home",
+            },
+        ),
+    ]
+
+
+def test_flushes_on_window_and_size():
+    service = FakeService()
+    with WriteBehindQueue(service, window=0.01) as queue:
+        assert queue.patch("a", True).result(timeout=5)["status"] == 200
+    with WriteBehindQueue(service, window=60, max_pending=2) as queue:
+        queue.patch("b", True)
+        assert queue.patch("c", True).result(timeout=5)["status"] == 200
+
+
+def test_failure_resolves_futures_with_error():
+    with WriteBehindQueue(FakeService(), window=60) as queue:
+        future = queue.patch("missing", True)
+    with pytest.raises(AssertionError):
+        future.result()
+    with pytest.raises(RuntimeError):
+        queue.patch("a", True)
+
+
+def test_write_behind_against_stand_in(stand_in_service):
+    note_id = stand_in_service.post_notes("Note", "Text", "Work")["data"]["id"]
+    with stand_in_service.write_behind(window=60) as queue:
+        for completed in (True, False, True):
+            queue.patch(note_id, completed)
+        future = queue.put(note_id, "Edited", "Edited text", False, "Home")
+        queue.patch(note_id, True)
+
+    note = future.result()["data"]
+    assert (note["title"], note["completed"], note["category"]) == (
+        "Edited",
+        True,
+        "Home",
+    )
+    assert stand_in_service.get_note_by_id(note_id)["data"]["completed"] is True